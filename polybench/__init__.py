@@ -1,5 +1,6 @@
 """Multivariate polynomial arithmetic benchmark tests."""
 
+from .api import Config, ResultTable, run
 from .version import __version__
 
-__all__ = ("__version__",)
+__all__ = ("Config", "ResultTable", "__version__", "run")
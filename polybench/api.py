@@ -0,0 +1,1456 @@
+"""Programmatic interface for running benchmarks."""
+
+import contextlib
+import csv
+import functools
+import logging
+import math
+import operator
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import (
+    AbstractSet,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .events import event, log_event, timed
+from .limits import ResourceLimits
+from .monitor import Environment, EnvironmentMonitor, combine_environments
+from .perf import PerfCounters, add_counters, perf_error
+from .poly import Polynomial
+from .prob import ExponentsDistribution, ProblemSet, ProblemTypeInput
+from .solver import (
+    DownloadOptions,
+    HarnessOptions,
+    InProcessSolver,
+    Outcome,
+    Result,
+    Solver,
+    SolverSetupError,
+)
+from .util import ResourceSample, bytes2human
+
+Logger = logging.Logger
+
+
+class Config(NamedTuple):
+    """Configuration of a benchmark run.
+
+    The fields correspond to the command-line options. Fields set to `None` take
+    the same defaults as the command-line interface; see `resolved`.
+    """
+
+    solvers: Sequence[str] = ()
+    problem_type: ProblemTypeInput = "nontrivial-gcd"
+    n_problems: int = 50
+    n_warmups: int = 10
+    adaptive_warmups: bool = False
+    exp_dist: ExponentsDistribution = "uniform"
+    n_vars: int = 5
+    min_n_terms: Optional[int] = None
+    max_n_terms: int = 30
+    min_degree: Optional[int] = None
+    max_degree: int = 30
+    min_coeff: Optional[int] = None
+    max_coeff: int = 2**14
+    seed: int = 42
+    timeout: int = 60 * 60
+    threads: Sequence[int] = (1,)
+    throughput: Sequence[int] = ()
+    harness: Optional[HarnessOptions] = None
+    cold_start: bool = False
+    max_memory: Optional[int] = None
+    cpus: Optional[float] = None
+    sample_interval: Optional[float] = None
+    rerun_outliers: bool = False
+    interleave: Optional[int] = None
+    perf_counters: bool = False
+    modulus: Optional[int] = None
+    build_dir: Optional[Path] = None
+    output_dir: Optional[Path] = None
+    download_cache: Optional[Path] = None
+    download_mirrors: Sequence[str] = ()
+    offline: bool = False
+    fail_on_setup_failure: bool = False
+    keep_temp: bool = False
+    debug: bool = False
+
+    def resolved(self) -> "Config":
+        """Return a copy with the default values filled in.
+
+        The output directory is left as it is because `run` uses a temporary
+        directory when it is `None`.
+        """
+        min_n_terms = self.min_n_terms
+        if min_n_terms is None:
+            min_n_terms = max(int(self.max_n_terms * 0.75), 1)
+
+        min_degree = self.min_degree
+        if min_degree is None:
+            if self.exp_dist == "uniform":
+                min_degree = max(int(self.max_degree * 0.75), 0)
+            else:
+                min_degree = 0
+
+        min_coeff = self.min_coeff
+        if min_coeff is None:
+            min_coeff = -self.max_coeff
+
+        build_dir = self.build_dir
+        if build_dir is None:
+            build_dir = Path(".") / "build"
+        build_dir = Path(build_dir).resolve()
+
+        output_dir = self.output_dir
+        if output_dir is not None:
+            output_dir = Path(output_dir).resolve()
+
+        download_cache = self.download_cache
+        if download_cache is not None:
+            download_cache = Path(download_cache).resolve()
+
+        return self._replace(
+            min_n_terms=min_n_terms,
+            min_degree=min_degree,
+            min_coeff=min_coeff,
+            build_dir=build_dir,
+            output_dir=output_dir,
+            download_cache=download_cache,
+        )
+
+    def download_options(self) -> DownloadOptions:
+        """Return the options for downloading files."""
+        return DownloadOptions(
+            cache_dir=self.download_cache,
+            mirrors=tuple(self.download_mirrors),
+            offline=self.offline,
+        )
+
+    def limits(self) -> Optional[ResourceLimits]:
+        """Return the resource limits for the solver processes, if any."""
+        if self.max_memory is None and self.cpus is None:
+            return None
+        return ResourceLimits(max_memory=self.max_memory, cpus=self.cpus)
+
+    def make_problems(self) -> ProblemSet:
+        """Create the set of problems for this configuration."""
+        config = self.resolved()
+        return ProblemSet(
+            problem_type=config.problem_type,
+            n_warmups=config.n_warmups,
+            n_problems=config.n_problems,
+            adaptive_warmups=config.adaptive_warmups,
+            seed=config.seed,
+            exp_dist=config.exp_dist,
+            n_vars=config.n_vars,
+            min_n_terms=config.min_n_terms,
+            max_n_terms=config.max_n_terms,
+            min_degree=config.min_degree,
+            max_degree=config.max_degree,
+            min_coeff=config.min_coeff,
+            max_coeff=config.max_coeff,
+            modulus=config.modulus,
+        )
+
+
+class Scaling(NamedTuple):
+    """Multi-threading performance of a solver for a number of threads."""
+
+    solver: str  # without the number of threads
+    threads: int
+    time: float  # total time for the problems (excluding warm-ups)
+    speedup: float  # relative to the run with the fewest threads
+    efficiency: float  # speedup per thread (relative to the fewest threads)
+
+
+class Throughput(NamedTuple):
+    """Performance of a solver in the throughput mode for a number of workers."""
+
+    solver: str  # without the number of workers
+    workers: int
+    time: float  # wall-clock time for the problems (excluding warm-ups)
+    problems_per_sec: float
+    latency_mean: float
+    latency_p50: float
+    latency_p90: float
+    latency_p99: float
+    latency_max: float
+
+
+class ColdStart(NamedTuple):
+    """Timings of a problem solved in a fresh process of a solver."""
+
+    solver: str
+    problem: int  # problem number (including warm-ups)
+    wall_time: float  # whole solver run, including writing the input
+    startup: float  # wall-clock time minus the times reported by the driver
+    cold_time: float  # computation in the fresh process
+    warm_time: float  # computation in the process solving all the problems
+
+
+class Rerun(NamedTuple):
+    """Timings of a problem re-run because the first timing may be disturbed."""
+
+    solver: str
+    problem: int  # problem number (including warm-ups)
+    reason: str  # "outlier", "noisy" or "outlier+noisy"
+    time: float  # in the first run
+    rerun_time: float
+    rerun_noisy: bool  # whether the re-run was also in a noisy environment
+
+
+class ExecutionStep(NamedTuple):
+    """Step of the interleaved execution, where a solver solves a chunk of problems."""
+
+    step: int
+    solver: str
+    first_problem: int  # problem number (including warm-ups)
+    last_problem: int
+    start: float  # in seconds since the epoch
+    time: float  # wall-clock time of the solver run, including the warm-ups
+
+
+class PerfStats(NamedTuple):
+    """Hardware performance counters of a solver run (`None` if not counted)."""
+
+    solver: str
+    instructions: Optional[int]
+    cycles: Optional[int]
+    cache_misses: Optional[int]
+    branch_misses: Optional[int]
+    ipc: Optional[float]  # instructions per cycle
+    cache_misses_per_term: Optional[float]  # per term of the answers
+    branch_misses_per_term: Optional[float]
+
+
+def terms_per_second(results: Sequence[Result], n_warmups: int) -> float:
+    """Return the number of output terms per second (excluding warm-ups)."""
+    results = results[n_warmups:]
+    total_time = sum(r.time for r in results)
+    n_terms = sum(len(p) for r in results for p in r.answer)
+    return n_terms / total_time if total_time > 0 else float("nan")
+
+
+def detect_warmup(
+    times: Sequence[float], *, window: int = 5, tolerance: float = 0.1
+) -> Optional[int]:
+    """Return the number of warm-up runs before the timings become steady.
+
+    `times` are the timings of repeated runs of the same problem. The steady state
+    is taken from the median of the second half of the runs, with the noise level
+    estimated from their median absolute deviation. The warm-up ends at the first
+    run from which the running medians over `window` runs all stay within the
+    relative `tolerance` (or three standard errors, if larger) of the steady
+    state, and which is itself within the tolerance (or three standard
+    deviations). `None` is returned if there are fewer than ``2 * window`` runs,
+    the timings still drift in the second half or the steady state is not reached
+    in the first half.
+    """
+    n = len(times)
+    if window < 1 or n < 2 * window:
+        return None
+    tail = times[n // 2 :]
+    steady = statistics.median(tail)
+    sigma = 1.4826 * statistics.median(abs(t - steady) for t in tail)
+    band = max(tolerance * steady, 3 * sigma / window**0.5)
+    h = len(tail) // 2
+    if abs(statistics.median(tail[:h]) - statistics.median(tail[h:])) > band:
+        return None  # still drifting
+    k = None
+    for i in reversed(range(n - window + 1)):
+        if abs(statistics.median(times[i : i + window]) - steady) > band:
+            break
+        k = i
+    if k is None:
+        return None
+    # The running median may already be steady before the last slow run.
+    band = max(tolerance * steady, 3 * sigma)
+    while k < n and abs(times[k] - steady) > band:
+        k += 1
+    if k > n // 2:
+        return None
+    return k
+
+
+def find_outliers(times: Sequence[float], *, threshold: float = 3.5) -> Sequence[int]:
+    """Return the indices of the timings that are unusually slow.
+
+    The timings of different problems spread over orders of magnitude, so they are
+    compared on the logarithmic scale. A timing is an outlier if its modified
+    z-score (based on the median absolute deviation) exceeds `threshold`. Zero
+    timings (below the resolution of the clock) are never outliers.
+    """
+    logs = [math.log(t) for t in times if t > 0]
+    if len(logs) < 3:
+        return ()
+    center = statistics.median(logs)
+    mad = statistics.median(abs(x - center) for x in logs)
+    if not mad > 0:
+        return ()
+    return tuple(
+        i
+        for i, t in enumerate(times)
+        if t > 0 and 0.6745 * (math.log(t) - center) / mad > threshold
+    )
+
+
+def _percentile(sorted_values: Sequence[float], p: float) -> float:
+    # Linear interpolation between the closest ranks.
+    if not sorted_values:
+        return float("nan")
+    x = (len(sorted_values) - 1) * p / 100
+    i = int(x)
+    if i + 1 >= len(sorted_values):
+        return sorted_values[-1]
+    return sorted_values[i] + (sorted_values[i + 1] - sorted_values[i]) * (x - i)
+
+
+class ResultTable:
+    """Results of a benchmark run, kept in memory."""
+
+    def __init__(
+        self,
+        problems: ProblemSet,
+        results: Mapping[str, Sequence[Result]],
+        *,
+        versions: Optional[Mapping[str, Optional[str]]] = None,
+        wrong: AbstractSet[str] = frozenset(),
+        threads: Optional[Mapping[str, Tuple[str, int]]] = None,
+        throughput: Optional[Mapping[str, Tuple[str, int, float]]] = None,
+        peak_memory: Optional[Mapping[str, int]] = None,
+        warmups: Optional[Mapping[str, Optional[int]]] = None,
+        cold_start: Optional[Mapping[str, Sequence[ColdStart]]] = None,
+        outcomes: Optional[Mapping[str, Outcome]] = None,
+        timelines: Optional[Mapping[str, Sequence[ResourceSample]]] = None,
+        environment: Optional[Mapping[str, Environment]] = None,
+        reruns: Optional[Mapping[str, Sequence[Rerun]]] = None,
+        order: Sequence[ExecutionStep] = (),
+        perf: Optional[Mapping[str, PerfStats]] = None,
+    ) -> None:
+        """Construct a result table.
+
+        `threads` maps solver names to their base names and numbers of threads,
+        for solvers run with various numbers of threads. `throughput` maps solver
+        names in the throughput mode to their base names, numbers of workers and
+        wall-clock times. `peak_memory` maps solver names to their peak memory
+        usage in bytes, if measured. `warmups` maps solver names to the numbers of
+        warm-up runs detected with adaptive warm-ups (`None` if not steady).
+        `cold_start` maps solver names to the timings of the problems solved in
+        fresh processes. `outcomes` maps solver names, including those that
+        failed, to the outcomes of their runs. `timelines` maps solver names to
+        the samples of their resource usage, if sampled. `environment` maps
+        solver names to the summaries of the environment during their runs.
+        `reruns` maps solver names to the timings of the re-run problems. `order`
+        is the order of the interleaved execution, if used. `perf` maps solver
+        names to their hardware performance counters, if counted.
+        """
+        self._problems = problems
+        self._results = dict(results)
+        self._versions = dict(versions) if versions else {}
+        self._wrong = frozenset(wrong)
+        self._threads = dict(threads) if threads else {}
+        self._throughput = dict(throughput) if throughput else {}
+        self._peak_memory = dict(peak_memory) if peak_memory else {}
+        self._warmups = dict(warmups) if warmups else {}
+        self._cold_start = dict(cold_start) if cold_start else {}
+        self._outcomes = dict(outcomes) if outcomes else {}
+        self._timelines = dict(timelines) if timelines else {}
+        self._environment = dict(environment) if environment else {}
+        self._reruns = dict(reruns) if reruns else {}
+        self._order = tuple(order)
+        self._perf = dict(perf) if perf else {}
+
+    def __len__(self) -> int:
+        """Return the number of solvers that gave results."""
+        return len(self._results)
+
+    def __iter__(self) -> Iterator[str]:
+        """Return the iterator over the solver names."""
+        return iter(self._results)
+
+    def __getitem__(self, name: str) -> Sequence[Result]:
+        """Return the results (including warm-ups) for the given solver."""
+        return self._results[name]
+
+    @property
+    def problems(self) -> ProblemSet:
+        """Return the problems."""
+        return self._problems
+
+    @property
+    def names(self) -> Sequence[str]:
+        """Return the names of the solvers that gave results."""
+        return tuple(self._results)
+
+    @property
+    def versions(self) -> Mapping[str, Optional[str]]:
+        """Return the versions of the solvers."""
+        return self._versions
+
+    @property
+    def wrong(self) -> AbstractSet[str]:
+        """Return the names of the solvers that gave wrong answers."""
+        return self._wrong
+
+    def times(self, name: str, *, include_warmups: bool = False) -> Sequence[float]:
+        """Return the timings for the given solver."""
+        start = 0 if include_warmups else self._problems.n_warmups
+        return tuple(r.time for r in self._results[name][start:])
+
+    def scaling(self) -> Sequence[Scaling]:
+        """Return the speedup and parallel efficiency of multi-threaded solvers.
+
+        Only solvers that gave results for two or more numbers of threads are
+        included.
+        """
+        groups: Dict[str, List[Tuple[int, float]]] = {}
+
+        for name in self._results:
+            base_name, n = self._threads.get(name, (name, 1))
+            groups.setdefault(base_name, []).append((n, sum(self.times(name))))
+
+        result = []
+
+        for base_name, entries in groups.items():
+            if len(entries) < 2:
+                continue
+            entries.sort()
+            n0, t0 = entries[0]
+            for n, t in entries:
+                speedup = t0 / t if t > 0 else float("nan")
+                result.append(Scaling(base_name, n, t, speedup, speedup * n0 / n))
+
+        return tuple(result)
+
+    def throughput(self) -> Sequence[Throughput]:
+        """Return the throughput and latency distribution in the throughput mode."""
+        result = []
+
+        for name in self._results:
+            if name not in self._throughput:
+                continue
+            base_name, workers, wall_time = self._throughput[name]
+            times = sorted(self.times(name))
+            result.append(
+                Throughput(
+                    base_name,
+                    workers,
+                    wall_time,
+                    len(times) / wall_time if wall_time > 0 else float("nan"),
+                    statistics.mean(times) if times else float("nan"),
+                    _percentile(times, 50),
+                    _percentile(times, 90),
+                    _percentile(times, 99),
+                    times[-1] if times else float("nan"),
+                )
+            )
+
+        return tuple(result)
+
+    def peak_memory(self, name: str) -> Optional[int]:
+        """Return the peak memory usage in bytes for the given solver, if measured."""
+        return self._peak_memory.get(name)
+
+    def outcome(self, name: str) -> Optional[Outcome]:
+        """Return the outcome of the run of the given solver, if known.
+
+        Solvers without results are ``failed``, ``timeout`` or ``out_of_memory``.
+        """
+        return self._outcomes.get(name)
+
+    def timelines(self) -> Mapping[str, Sequence[ResourceSample]]:
+        """Return the samples of the resource usage of the sampled solvers.
+
+        Solvers that failed are also included.
+        """
+        return dict(self._timelines)
+
+    def environment(self, name: str) -> Optional[Environment]:
+        """Return the summary of the environment during the run of the given solver."""
+        return self._environment.get(name)
+
+    def warmups(self, name: str) -> Optional[int]:
+        """Return the number of warm-up runs detected for the given solver.
+
+        This is `None` unless adaptive warm-ups are used and the timings of the
+        solver became steady during the calibration runs.
+        """
+        return self._warmups.get(name)
+
+    def cold_start(self) -> Sequence[ColdStart]:
+        """Return the timings of the problems solved in fresh processes."""
+        return tuple(
+            c for name in self._results for c in self._cold_start.get(name, ())
+        )
+
+    def reruns(self) -> Sequence[Rerun]:
+        """Return the timings of the problems re-run because of disturbances."""
+        return tuple(r for name in self._results for r in self._reruns.get(name, ()))
+
+    def perf_counters(self) -> Sequence[PerfStats]:
+        """Return the hardware performance counters of the solvers, if counted."""
+        return tuple(self._perf[name] for name in self._results if name in self._perf)
+
+    def order(self) -> Sequence[ExecutionStep]:
+        """Return the order of the interleaved execution (empty if not used)."""
+        return self._order
+
+    def terms_per_second(self, name: str) -> float:
+        """Return the number of output terms per second for the given solver.
+
+        This is meaningful mainly for `mul` problems.
+        """
+        return terms_per_second(self._results[name], self._problems.n_warmups)
+
+    def to_csv(self, csv_file: Path) -> None:
+        """Write the timings into a CSV file."""
+        from . import plot
+
+        plot.write_csv(csv_file, self._problems, self._results)
+
+    def scaling_to_csv(self, csv_file: Path) -> None:
+        """Write the speedup and parallel efficiency into a CSV file."""
+        with csv_file.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(Scaling._fields)
+            writer.writerows(self.scaling())
+
+    def throughput_to_csv(self, csv_file: Path) -> None:
+        """Write the throughput and latency distribution into a CSV file."""
+        with csv_file.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(Throughput._fields)
+            writer.writerows(self.throughput())
+
+    def cold_start_to_csv(self, csv_file: Path) -> None:
+        """Write the cold-start timings into a CSV file."""
+        with csv_file.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(ColdStart._fields)
+            writer.writerows(self.cold_start())
+
+    def reruns_to_csv(self, csv_file: Path) -> None:
+        """Write the timings of the re-run problems into a CSV file."""
+        with csv_file.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(Rerun._fields)
+            writer.writerows(self.reruns())
+
+    def perf_counters_to_csv(self, csv_file: Path) -> None:
+        """Write the hardware performance counters into a CSV file."""
+        with csv_file.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(PerfStats._fields)
+            writer.writerows(self.perf_counters())
+
+    def order_to_csv(self, csv_file: Path) -> None:
+        """Write the order of the interleaved execution into a CSV file."""
+        with csv_file.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(ExecutionStep._fields)
+            writer.writerows(self.order())
+
+    def timelines_to_csv(self, csv_file: Path) -> None:
+        """Write the samples of the resource usage into a CSV file."""
+        with csv_file.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("solver",) + ResourceSample._fields)
+            for name, samples in self.timelines().items():
+                for sample in samples:
+                    writer.writerow((name,) + tuple(sample))
+
+
+def next_job_id(output_dir: Path) -> str:
+    """Return the next job id."""
+    # The ids are of form "0001", "0002", ...
+    # Such ids are used for naming log files "0001.log" etc.
+    # We look for the first id that haven't been used in the output directory.
+
+    def make_job_id(n: int) -> str:
+        return f"{n:0>4}"
+
+    n = 1
+
+    if output_dir.is_dir():
+        existing_job_ids = {
+            f.name.split(".", maxsplit=1)[0] for f in output_dir.glob("*.*")
+        }
+        while make_job_id(n) in existing_job_ids:
+            n += 1
+
+    return make_job_id(n)
+
+
+def create_solvers(
+    names: Sequence[str],
+    *,
+    job_id: str,
+    build_dir: Path,
+    output_dir: Path,
+    logger: Logger,
+    timeout: int,
+    debug: Optional[bool] = None,
+    download_options: Optional[DownloadOptions] = None,
+    threads: Sequence[int] = (1,),
+    workers: Sequence[int] = (),
+    harness: Optional[HarnessOptions] = None,
+    limits: Optional[ResourceLimits] = None,
+    sample_interval: Optional[float] = None,
+    perf_counters: bool = False,
+) -> Sequence[Solver]:
+    """Construct the solvers with the given names (case-insensitive).
+
+    Only the modules of the selected solvers are imported. Solvers supporting
+    multi-threading are constructed for each of the numbers of `threads`, and
+    those supporting the throughput mode also for each of the numbers of `workers`.
+    Solvers supporting the steady-state harness mode run in the mode if `harness`
+    is given. `limits` are applied to the processes run by the solvers, and
+    their resource usage is sampled at `sample_interval` (in seconds), if given.
+    If `perf_counters` is true, the processes are run under ``perf stat``, and
+    `ValueError` is raised if it is not available.
+    """
+    if perf_counters:
+        error = perf_error()
+        if error is not None:
+            raise ValueError(f"hardware performance counters not available: {error}")
+    return Solver.create_solvers(
+        job_id=job_id,
+        build_dir=build_dir,
+        output_dir=output_dir,
+        logger=logger,
+        timeout=timeout,
+        debug=debug,
+        download_options=download_options,
+        names=names,
+        threads=threads,
+        workers=workers,
+        harness=harness,
+        limits=limits,
+        sample_interval=sample_interval,
+        perf_counters=perf_counters,
+    )
+
+
+def prepare_solvers(
+    solvers: Sequence[Solver],
+    problems: ProblemSet,
+    fail_on_setup_failure: bool,
+) -> Sequence[Solver]:
+    """Make the solvers prepare for the problems and return available solvers.
+
+    If `fail_on_setup_failure` is true, `SolverSetupError` is raised after all the
+    solvers have been tried when any of them failed.
+    """
+    available_solvers = []
+
+    failed = []
+
+    for s in solvers:
+        t1 = time.time()
+        try:
+            v = s.prepare(problems)
+            t2 = time.time()
+            if v:
+                available_solvers.append(s)
+                s.logger.info(
+                    v,
+                    extra=event(
+                        "prepare", solver=s.name, version=v, start=t1, time=t2 - t1
+                    ),
+                )
+            else:
+                s.logger.warning(
+                    "not available",
+                    extra=event(
+                        "prepare", solver=s.name, version=None, start=t1, time=t2 - t1
+                    ),
+                )
+        except SolverSetupError as e:
+            t2 = time.time()
+            failed.append(s.name)
+            extra = event(
+                "prepare", solver=s.name, error=str(e), start=t1, time=t2 - t1
+            )
+            if fail_on_setup_failure:
+                s.logger.error(e, extra=extra)
+            else:
+                s.logger.warning(e, extra=extra)
+
+    if fail_on_setup_failure and failed:
+        raise SolverSetupError(f"setup failed: {', '.join(failed)}")
+
+    return tuple(available_solvers)
+
+
+class SolverResult(NamedTuple):
+    """Result from a solver."""
+
+    name: str
+    res: Sequence[Result]
+    output_dir: Path
+
+
+def check_results(
+    results: Sequence[SolverResult], problems: ProblemSet, logger: Logger
+) -> Set[str]:
+    """Check the consistency of the results and return the solvers that failed."""
+    check_logger = logger.getChild("Check")
+
+    wrong: Set[str] = set()
+
+    # Problems over a prime field (if given), where any nonzero constant is a unit.
+    prime = problems.modulus
+
+    def is_unit(p: Polynomial) -> bool:
+        if prime is not None:
+            return p.is_constant and bool(p.reduce_mod(prime))
+        return p.is_unit
+
+    def equals_without_unit(p: Polynomial, q: Polynomial) -> bool:
+        if prime is not None:
+            return p.monic_mod(prime) == q.monic_mod(prime)
+        return p.equals_without_unit(q)
+
+    # Large results are checked by the values at a random point.
+    modulus = 2**61 - 1  # a Mersenne prime
+    rng = random.Random(problems.seed)
+    point = [rng.randrange(1, modulus) for _ in problems.variables]
+
+    def fingerprint(p: Polynomial) -> int:
+        return p.fingerprint(problems.variables, point, modulus)
+
+    def count_factors(pp: Sequence[Polynomial]) -> int:
+        n = 0
+        m = 0
+        for p in pp:
+            n_terms = len(p)
+            if n_terms == 0:
+                return 0
+            elif n_terms == 1:
+                if not is_unit(p):
+                    m += 1
+            else:
+                n += 1
+        if m >= 1:
+            n += 1
+        return n
+
+    if problems.problem_type == "gcd":
+        # The GCD must be given as a single polynomial.
+        for name, res, _ in results:
+            for i, ri in enumerate(res):
+                if len(ri.answer) != 1:
+                    check_logger.error(f"{name}:{i + 1}: wrong answer")
+                    wrong.add(name)
+        # The GCD must be the same up to a multiplicative unit.
+        if len(results) >= 2:
+            for i in range(len(problems)):
+                pp0 = results[0].res[i].answer
+                if len(pp0) != 1:
+                    continue
+                p0 = pp0[0]
+                for j in range(1, len(results)):
+                    ppj = results[j].res[i].answer
+                    if len(ppj) != 1:
+                        continue
+                    pj = ppj[0]
+                    if not equals_without_unit(p0, pj):
+                        name0 = results[0].name
+                        namej = results[j].name
+                        check_logger.error(
+                            f"{name0}:{namej}:{i + 1}: inconsistent answers"
+                        )
+                        wrong.add(name0)
+                        wrong.add(namej)
+    elif problems.problem_type == "mul":
+        # The product must be given as a single polynomial, whose value at a random
+        # point must agree with the product of the values of the factors.
+        expected = [
+            fingerprint(prob.p) * fingerprint(prob.q) % modulus for prob in problems
+        ]
+        for name, res, _ in results:
+            for i, ri in enumerate(res):
+                if len(ri.answer) != 1 or fingerprint(ri.answer[0]) != expected[i]:
+                    check_logger.error(f"{name}:{i + 1}: wrong answer")
+                    wrong.add(name)
+        # The number of terms must match.
+        if len(results) >= 2:
+            for i in range(len(problems)):
+                n0 = sum(len(p) for p in results[0].res[i].answer)
+                for j in range(1, len(results)):
+                    nj = sum(len(p) for p in results[j].res[i].answer)
+                    if n0 != nj:
+                        name0 = results[0].name
+                        namej = results[j].name
+                        check_logger.error(
+                            f"{name0}:{namej}:{i + 1}: inconsistent answers"
+                        )
+                        wrong.add(name0)
+                        wrong.add(namej)
+    elif problems.problem_type == "ratfun":
+        # The numerator and denominator must satisfy n/d = p/q + r/s, which is checked
+        # by cross-multiplying (at a random point).
+        inputs = [
+            [fingerprint(a) for a in (prob.p, prob.q, prob.r, prob.s)]
+            for prob in problems
+        ]
+        for name, res, _ in results:
+            for i, ri in enumerate(res):
+                if len(ri.answer) != 2:
+                    check_logger.error(f"{name}:{i + 1}: wrong answer")
+                    wrong.add(name)
+                    continue
+                n, d = (fingerprint(a) for a in ri.answer)
+                p, q, r, s = inputs[i]
+                if (
+                    not ri.answer[1]
+                    or n * q * s % modulus != d * (p * s + r * q) % modulus
+                ):
+                    check_logger.error(f"{name}:{i + 1}: wrong answer")
+                    wrong.add(name)
+        # The canonical forms must have the same numbers of terms.
+        if len(results) >= 2:
+            for i in range(len(problems)):
+                terms0 = [len(p) for p in results[0].res[i].answer]
+                for j in range(1, len(results)):
+                    termsj = [len(p) for p in results[j].res[i].answer]
+                    if terms0 != termsj:
+                        name0 = results[0].name
+                        namej = results[j].name
+                        check_logger.error(
+                            f"{name0}:{namej}:{i + 1}: inconsistent answers"
+                        )
+                        wrong.add(name0)
+                        wrong.add(namej)
+    elif problems.problem_type == "div":
+        # The quotient is known from the construction of the problem.
+        for name, res, _ in results:
+            for i, ri in enumerate(res):
+                if len(ri.answer) != 1 or ri.answer[0] != problems[i].quotient:
+                    check_logger.error(f"{name}:{i + 1}: wrong answer")
+                    wrong.add(name)
+    elif problems.problem_type == "divisible":
+        # The answer must be 1 (divisible) or 0 (not divisible), which is known from
+        # the construction of the problem.
+        for name, res, _ in results:
+            for i, ri in enumerate(res):
+                answer = 1 if problems[i].divisible else 0
+                if len(ri.answer) != 1 or ri.answer[0] != answer:
+                    check_logger.error(f"{name}:{i + 1}: wrong answer")
+                    wrong.add(name)
+    elif problems.problem_type == "factor":
+        # The product of the factorized polynomials must equal the original polynomial.
+        for name, res, _ in results:
+            for i, ri in enumerate(res):
+                product = functools.reduce(operator.mul, ri.answer, Polynomial(1))
+                if prime is not None:
+                    product = product.reduce_mod(prime)
+                if problems[i].p != product:
+                    check_logger.error(f"{name}:{i + 1}: wrong answer")
+                    wrong.add(name)
+        # The number of factorized polynomials must match,
+        # excluding any single-term polynomials.
+        if len(results) >= 2:
+            for i in range(len(problems)):
+                pp0 = results[0].res[i].answer
+                n0 = count_factors(pp0)
+                for j in range(1, len(results)):
+                    ppj = results[j].res[i].answer
+                    nj = count_factors(ppj)
+                    if n0 != nj:
+                        name0 = results[0].name
+                        namej = results[j].name
+                        check_logger.error(
+                            f"{name0}:{namej}:{i + 1}: inconsistent answers"
+                        )
+                        wrong.add(name0)
+                        wrong.add(namej)
+
+    return wrong
+
+
+def run_solvers(
+    solvers: Sequence[Solver],
+    problems: ProblemSet,
+    *,
+    job_id: str,
+    output_dir: Path,
+    logger: Logger,
+    keep_temp: bool = False,
+    cold_start: bool = False,
+    rerun_outliers: bool = False,
+    interleave: Optional[int] = None,
+) -> ResultTable:
+    """Run the solvers for the given set of problems.
+
+    If `cold_start` is true, each benchmark problem is also solved in a fresh
+    process of each solver running external programs, to measure the startup
+    cost and the latency of the first call (see `ColdStart`).
+
+    The system load, CPU frequency and steal time are monitored during each run.
+    If `rerun_outliers` is true, the benchmark problems whose timings are outliers
+    or which were solved in a noisy environment are solved again after the
+    warm-ups, and both the timings are kept (see `Rerun`).
+
+    If `interleave` is given, the benchmark problems are split into chunks of
+    that size, and the pairs of a solver and a chunk are run in a random order
+    (seeded by that of the problems), each solving the warm-ups followed by the
+    chunk, so that drifts of the environment are not confounded with solvers.
+    Solvers in the throughput mode run as usual after them. The order is recorded
+    (see `ExecutionStep`).
+    """
+    if interleave is not None and interleave < 1:
+        raise ValueError(f"invalid chunk size: {interleave}")
+
+    # Log for problems.
+
+    problem_file = output_dir / f"{job_id}.problems.log"
+
+    with timed(logger, "phase", phase="write_problems"):
+        with problem_file.open(mode="w") as f:
+            for p in problems:
+                print(p, file=f)
+    log_event(logger, "artifact", kind="problems", path=problem_file)
+
+    # Run solvers.
+
+    def get_timing_information(results: Sequence[Result], n_warmups: int) -> str:
+        """Return the timing information as a string."""
+        times = [r.time for r in results][n_warmups:]
+        if len(times) == 0:
+            return ""
+        if len(times) == 1:
+            return f" ({times[0]:.3f} sec)"
+        mean = statistics.mean(times)
+        stdev = statistics.stdev(times, mean)
+        max_t, max_i = max((t, i) for i, t in enumerate(times))
+        return (
+            f" (mean: {mean:.3f} sec,"
+            f" SD: {stdev:.3f} sec,"
+            f" slowest: {max_t:.3f} sec on Prob. {max_i + 1 + n_warmups})"
+        )
+
+    results: List[SolverResult] = []
+    warmups: Dict[str, Optional[int]] = {}
+    peak_memory: Dict[str, int] = {}
+    cold: Dict[str, Sequence[ColdStart]] = {}
+    outcomes: Dict[str, Outcome] = {}
+    timelines: Dict[str, Sequence[ResourceSample]] = {}
+    environment: Dict[str, Environment] = {}
+    reruns: Dict[str, Sequence[Rerun]] = {}
+    interleaved: Dict[str, _SolverRun] = {}
+    perf: Dict[str, PerfStats] = {}
+    order: Sequence[ExecutionStep] = ()
+
+    if interleave is not None:
+        with timed(logger, "solver_phase", phase="interleave"):
+            interleaved, order = _solve_interleaved(
+                [s for s in solvers if s.workers == 0], problems, interleave
+            )
+
+    for s in solvers:
+        s._problem_file = problem_file  # Yes, this is ugly.
+        if s.name in interleaved:
+            run = interleaved[s.name]
+        else:
+            run = _solve(s, problems)
+        r = run.results
+        env = run.environment
+        if env is not None:
+            environment[s.name] = env
+        if run.peak_memory is not None:
+            peak_memory[s.name] = run.peak_memory
+        if run.timeline:
+            timelines[s.name] = run.timeline
+        fields = {
+            "solver": s.name,
+            "start": run.start,
+            "time": run.time,
+            "threads": s.threads,
+            "workers": s.workers,
+            "peak_memory": run.peak_memory,
+            "clocks": dict(run.clocks),
+            "environment": env._asdict() if env is not None else None,
+        }
+        outcome = run.outcome
+        outcomes[s.name] = outcome
+        fields["outcome"] = outcome
+        if r and outcome == "ok":
+            results.append(SolverResult(s.name, r, s._output_dir))
+            if run.clocks:
+                s.logger.debug(
+                    ", ".join(f"{k} = {v}" for k, v in sorted(run.clocks.items()))
+                )
+            for i, ri in enumerate(r):
+                log_event(
+                    s.logger,
+                    "result",
+                    solver=s.name,
+                    problem=i + 1,
+                    warmup=i < problems.n_warmups,
+                    time=ri.time,
+                    parse_time=ri.parse_time,
+                    output_time=ri.output_time,
+                    cpu_time=ri.cpu_time,
+                    n_terms=[len(a) for a in ri.answer],
+                )
+            info = get_timing_information(r, problems.n_warmups)
+            if problems.problem_type == "mul":
+                rate = terms_per_second(r, problems.n_warmups)
+                info += f" ({rate:.4g} terms/sec)"
+                fields["terms_per_sec"] = rate
+            if run.peak_memory is not None:
+                info += f" (peak memory: {bytes2human(run.peak_memory)}B)"
+            if run.perf is not None:
+                ps = _perf_stats(s.name, run.perf, run.n_terms)
+                perf[s.name] = ps
+                fields["perf"] = ps._asdict()
+                if ps.ipc is not None:
+                    info += f" (IPC: {ps.ipc:.2f})"
+            times = [ri.time for ri in r][problems.n_warmups :]
+            fields["total"] = sum(times)
+            if len(times) >= 1:
+                fields["mean"] = statistics.mean(times)
+            if len(times) >= 2:
+                fields["stdev"] = statistics.stdev(times)
+            s.logger.info(f"{run.time:.3f} sec{info}", extra=event("solve", **fields))
+            if env is not None and env.noisy:
+                steal = env.steal_percent
+                s.logger.warning(
+                    f"noisy environment (load per CPU: {env.load:.2f}"
+                    + ("" if steal is None else f", steal: {steal:.1f}%")
+                    + ")"
+                )
+            if problems.adaptive_warmups:
+                n = problems.n_warmups
+                k = detect_warmup([ri.time for ri in r[:n]])
+                warmups[s.name] = k
+                extra = event("warmup", solver=s.name, calibration_runs=n, warmups=k)
+                if k is None:
+                    s.logger.warning(
+                        f"timings not steady in {n} calibration runs", extra=extra
+                    )
+                else:
+                    s.logger.info(
+                        f"timings steady after {k} of {n} calibration runs",
+                        extra=extra,
+                    )
+            if cold_start:
+                c = _run_cold_start(s, problems, r, keep_temp)
+                if c is not None:
+                    cold[s.name] = c
+            if rerun_outliers:
+                n = problems.n_warmups
+                reasons: Dict[int, List[str]] = {}
+                for i in find_outliers([ri.time for ri in r[n:]]):
+                    reasons.setdefault(n + i, []).append("outlier")
+                for i in run.noisy:
+                    if i >= n:
+                        reasons.setdefault(i, []).append("noisy")
+                if reasons:
+                    rr = _rerun(s, problems, r, reasons, keep_temp)
+                    if rr is not None:
+                        reruns[s.name] = rr
+        else:
+            message = {"timeout": "timed out", "out_of_memory": "out of memory"}
+            s.logger.error(
+                f"failed ({message[outcome]})" if outcome in message else "failed",
+                extra=event("solve", failed=True, **fields),
+            )
+
+    # Check the consistency of the obtained results.
+
+    with timed(logger, "phase", phase="check"):
+        wrong = check_results(results, problems, logger)
+    for name, _, _ in results:
+        log_event(logger, "check", solver=name, wrong=name in wrong)
+
+    # Remove the solver's output directory only if succeeded.
+
+    if not keep_temp:
+        for name, _, path in results:
+            if name not in wrong and path.exists():
+                shutil.rmtree(path)
+
+    versions: Dict[str, Optional[str]] = {s.name: s.version for s in solvers}
+    threads = {s.name: (s.base_name, s.threads) for s in solvers if s.workers == 0}
+    throughput = {
+        s.name: (s.base_name, s.workers, s.wall_time)
+        for s in solvers
+        if s.workers > 0 and s.wall_time is not None
+    }
+
+    table = ResultTable(
+        problems,
+        {name: res for name, res, _ in results},
+        versions=versions,
+        wrong=wrong,
+        threads=threads,
+        throughput=throughput,
+        peak_memory=peak_memory,
+        warmups=warmups,
+        cold_start=cold,
+        outcomes=outcomes,
+        timelines=timelines,
+        environment=environment,
+        reruns=reruns,
+        order=order,
+        perf=perf,
+    )
+
+    # Log the multi-threading performance.
+
+    for sc in table.scaling():
+        logger.info(
+            f"{sc.solver} with {sc.threads} threads: {sc.time:.3f} sec"
+            f" (speedup: {sc.speedup:.2f}, efficiency: {sc.efficiency:.2f})",
+            extra=event("scaling", **sc._asdict()),
+        )
+
+    for tp in table.throughput():
+        logger.info(
+            f"{tp.solver} with {tp.workers} workers: {tp.problems_per_sec:.3f} prob/sec"
+            f" (latency p50: {tp.latency_p50:.3f} sec, p90: {tp.latency_p90:.3f} sec,"
+            f" p99: {tp.latency_p99:.3f} sec, max: {tp.latency_max:.3f} sec)",
+            extra=event("throughput", **tp._asdict()),
+        )
+
+    return table
+
+
+class _SolverRun(NamedTuple):
+    # Outcome of solving a set of problems by a solver, possibly in chunks.
+    results: Optional[Sequence[Result]]
+    outcome: Outcome
+    start: float
+    time: float
+    peak_memory: Optional[int]
+    timeline: Sequence[ResourceSample]
+    clocks: Mapping[str, str]
+    environment: Optional[Environment]
+    noisy: Sequence[int]  # indices of the problems solved in a noisy environment
+    perf: Optional[PerfCounters]
+    n_terms: int  # total number of the terms in the answers
+
+
+def _perf_stats(name: str, counters: PerfCounters, n_terms: int) -> PerfStats:
+    def per_term(count: Optional[int]) -> Optional[float]:
+        return count / n_terms if count is not None and n_terms > 0 else None
+
+    return PerfStats(
+        name,
+        *counters,
+        counters.ipc,
+        per_term(counters.cache_misses),
+        per_term(counters.branch_misses),
+    )
+
+
+def _solve(s: Solver, problems: ProblemSet) -> _SolverRun:
+    progress_file = s.output_dir / s._progress_file
+    t1 = time.time()
+    with EnvironmentMonitor(progress_file=progress_file) as monitor:
+        r = s.solve(problems)
+    t2 = time.time()
+    outcome: Outcome = "ok" if r and len(r) == len(problems) else "failed"
+    if s.outcome != "ok":
+        outcome = s.outcome
+    return _SolverRun(
+        r,
+        outcome,
+        t1,
+        t2 - t1,
+        s.peak_memory,
+        s.timeline,
+        dict(s.clocks),
+        monitor.summary(),
+        monitor.noisy_problems(len(problems)),
+        s.perf_counters,
+        sum(len(a) for ri in r or () for a in ri.answer),
+    )
+
+
+def _solve_interleaved(
+    solvers: Sequence[Solver], problems: ProblemSet, chunk_size: int
+) -> Tuple[Dict[str, _SolverRun], Sequence[ExecutionStep]]:
+    # Run the pairs of a solver and a chunk of problems in a random order. A solver
+    # failing on a chunk skips the rest.
+    n = problems.n_warmups
+    chunks = [
+        list(range(i, min(i + chunk_size, len(problems))))
+        for i in range(n, len(problems), chunk_size)
+    ]
+    pairs = [(s, chunk) for s in solvers for chunk in chunks]
+    random.Random(problems.seed).shuffle(pairs)
+
+    runs: Dict[str, List[Tuple[Sequence[int], _SolverRun]]] = {
+        s.name: [] for s in solvers
+    }
+    order: List[ExecutionStep] = []
+
+    for s, chunk in pairs:
+        if any(run.outcome != "ok" for _, run in runs[s.name]):
+            continue
+        subset = problems.subset(chunk)
+        s._problem_file = s.output_dir / "problems.log"
+        with s.problem_file.open(mode="w") as f:
+            for p in subset:
+                print(p, file=f)
+        run = _solve(s, subset)
+        runs[s.name].append((chunk, run))
+        step = ExecutionStep(
+            len(order) + 1, s.name, chunk[0] + 1, chunk[-1] + 1, run.start, run.time
+        )
+        s.logger.debug(
+            f"step {step.step}: Prob. {step.first_problem}-{step.last_problem}"
+            f" ({run.time:.3f} sec)",
+            extra=event("interleave", **step._asdict()),
+        )
+        order.append(step)
+
+    return (
+        {name: _merge_runs(problems, r) for name, r in runs.items() if r},
+        tuple(order),
+    )
+
+
+def _merge_runs(
+    problems: ProblemSet, runs: Sequence[Tuple[Sequence[int], _SolverRun]]
+) -> _SolverRun:
+    # Merge the runs of chunks into one, taking the warm-ups from the first run.
+    n = problems.n_warmups
+    first = runs[0][1]
+    failed = [run for _, run in runs if run.outcome != "ok"]
+    results: Optional[List[Result]] = None
+    if not failed and first.results is not None:
+        results = list(first.results[:n])
+        by_index: Dict[int, Result] = {}
+        for chunk, run in runs:
+            assert run.results is not None  # noqa: S101  # not failed
+            by_index.update(zip(chunk, run.results[n:]))
+        results.extend(by_index[i] for i in range(n, len(problems)))
+    peaks = [run.peak_memory for _, run in runs if run.peak_memory is not None]
+    perfs = [run.perf for _, run in runs if run.perf is not None]
+    envs = [run.environment for _, run in runs if run.environment is not None]
+    return _SolverRun(
+        results,
+        failed[0].outcome if failed else "ok",
+        first.start,
+        sum(run.time for _, run in runs),
+        max(peaks) if peaks else None,
+        tuple(
+            sample._replace(time=sample.time + run.start - first.start)
+            for _, run in runs
+            for sample in run.timeline
+        ),
+        first.clocks,
+        combine_environments(envs) if envs else None,
+        tuple(sorted(chunk[j - n] for chunk, run in runs for j in run.noisy if j >= n)),
+        functools.reduce(add_counters, perfs) if perfs else None,
+        sum(run.n_terms for _, run in runs),
+    )
+
+
+def _run_cold_start(
+    s: Solver, problems: ProblemSet, warm_results: Sequence[Result], keep_temp: bool
+) -> Optional[Sequence[ColdStart]]:
+    # Solve each benchmark problem in a fresh process of the solver. The startup
+    # cost is the wall-clock time of the whole run not accounted for by the times
+    # reported by the driver.
+    if isinstance(s, InProcessSolver) or s.workers > 0 or s.harness is not None:
+        s.logger.info("cold start not measured (no process per run)")
+        return None
+
+    # The runs use a separate output directory, which keeps the files of the warm
+    # run. Yes, this is also ugly.
+    warm_problem_file = s._problem_file
+    warm_output_dir = s._output_dir
+    s._output_dir = warm_output_dir.with_name(f"{warm_output_dir.name}.cold")
+    s._problem_file = s.output_dir / "problems.log"
+    result = []
+
+    try:
+        with timed(s.logger, "solver_phase", phase="cold_start", solver=s.name):
+            for i in range(problems.n_warmups, len(problems)):
+                with s.problem_file.open(mode="w") as f:
+                    print(problems[i], file=f)
+                t1 = time.time()
+                r = s.solve(problems.select(i))
+                t2 = time.time()
+                if not r or len(r) != 1:
+                    s.logger.warning(f"cold start failed on Prob. {i + 1}")
+                    return None
+                r0 = r[0]
+                reported = r0.time + (r0.parse_time or 0) + (r0.output_time or 0)
+                c = ColdStart(
+                    s.name,
+                    i + 1,
+                    t2 - t1,
+                    t2 - t1 - reported,
+                    r0.time,
+                    warm_results[i].time,
+                )
+                log_event(s.logger, "cold_start", **c._asdict())
+                result.append(c)
+        if not keep_temp:
+            shutil.rmtree(s.output_dir)
+    finally:
+        s._problem_file = warm_problem_file
+        s._output_dir = warm_output_dir
+
+    if result:
+        startup = statistics.median(c.startup for c in result)
+        cold_time = statistics.mean(c.cold_time for c in result)
+        warm_time = statistics.mean(c.warm_time for c in result)
+        s.logger.info(
+            f"cold start: {startup:.3f} sec startup (median),"
+            f" {cold_time:.3f} sec per problem (mean; warm: {warm_time:.3f} sec)",
+            extra=event(
+                "cold_start_summary",
+                solver=s.name,
+                startup=startup,
+                cold_time=cold_time,
+                warm_time=warm_time,
+            ),
+        )
+
+    return tuple(result)
+
+
+def _rerun(
+    s: Solver,
+    problems: ProblemSet,
+    first_results: Sequence[Result],
+    reasons: Mapping[int, Sequence[str]],
+    keep_temp: bool,
+) -> Optional[Sequence[Rerun]]:
+    # Solve the problems again after the warm-ups, in a separate output directory
+    # as for the cold start.
+    if s.workers > 0:
+        s.logger.info("problems not re-run (throughput mode)")
+        return None
+
+    indices = sorted(reasons)
+    subset = problems.subset(indices)
+    first_problem_file = s._problem_file
+    first_output_dir = s._output_dir
+    s._output_dir = first_output_dir.with_name(f"{first_output_dir.name}.rerun")
+    s._problem_file = s.output_dir / "problems.log"
+    result = []
+
+    try:
+        with timed(s.logger, "solver_phase", phase="rerun", solver=s.name):
+            with s.problem_file.open(mode="w") as f:
+                for p in subset:
+                    print(p, file=f)
+            run = _solve(s, subset)
+            r = run.results
+            if not r or run.outcome != "ok":
+                s.logger.warning("re-run failed")
+                return None
+            noisy = set(run.noisy)
+            for k, i in enumerate(indices):
+                j = subset.n_warmups + k
+                rerun = Rerun(
+                    s.name,
+                    i + 1,
+                    "+".join(reasons[i]),
+                    first_results[i].time,
+                    r[j].time,
+                    j in noisy,
+                )
+                s.logger.info(
+                    f"Prob. {i + 1} re-run ({rerun.reason}): {rerun.time:.3f} sec"
+                    f" -> {rerun.rerun_time:.3f} sec",
+                    extra=event("rerun", **rerun._asdict()),
+                )
+                result.append(rerun)
+        if not keep_temp:
+            shutil.rmtree(s.output_dir)
+    finally:
+        s._problem_file = first_problem_file
+        s._output_dir = first_output_dir
+
+    return tuple(result)
+
+
+@contextlib.contextmanager
+def _output_directory(output_dir: Optional[Path]) -> Iterator[Path]:
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        yield output_dir
+    else:
+        with tempfile.TemporaryDirectory(prefix="polybench-") as d:
+            yield Path(d).resolve()
+
+
+def run(config: Config, *, logger: Optional[Logger] = None) -> ResultTable:
+    """Run benchmarks for the given configuration and return the results.
+
+    Unlike the command-line interface, this function leaves the global state alone:
+    it installs no logging handlers, does not reseed the `random` module and writes
+    neither CSV files nor plots. If ``config.output_dir`` is `None`, the solvers
+    run in a temporary directory that is removed afterwards.
+
+    Solvers that fail to set up are skipped unless
+    ``config.fail_on_setup_failure`` is set, in which case `SolverSetupError`
+    is raised.
+    """
+    if not config.solvers:
+        raise ValueError("no solvers specified")
+
+    config = config.resolved()
+
+    if logger is None:
+        logger = logging.getLogger(__name__)
+
+    assert config.build_dir is not None  # noqa: S101  # resolved above
+
+    with timed(logger, "phase", phase="make_problems"):
+        problems = config.make_problems()
+
+    with _output_directory(config.output_dir) as output_dir:
+        job_id = next_job_id(output_dir)
+
+        solvers = create_solvers(
+            config.solvers,
+            job_id=job_id,
+            build_dir=config.build_dir,
+            output_dir=output_dir,
+            logger=logger,
+            timeout=config.timeout,
+            debug=config.debug,
+            download_options=config.download_options(),
+            threads=config.threads,
+            workers=config.throughput,
+            harness=config.harness,
+            limits=config.limits(),
+            sample_interval=config.sample_interval,
+            perf_counters=config.perf_counters,
+        )
+
+        solvers = prepare_solvers(solvers, problems, config.fail_on_setup_failure)
+
+        return run_solvers(
+            solvers,
+            problems,
+            job_id=job_id,
+            output_dir=output_dir,
+            logger=logger,
+            keep_temp=config.keep_temp,
+            cold_start=config.cold_start,
+            rerun_outliers=config.rerun_outliers,
+            interleave=config.interleave,
+        )
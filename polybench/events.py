@@ -0,0 +1,193 @@
+"""Structured event log.
+
+Events are log records carrying an event name and a mapping of fields, written
+as one JSON object per line by `JsonLinesHandler` in parallel with the text log.
+An event can be attached to an ordinary log message via ``extra=event(...)``, or
+emitted alone by `log_event` at the `EVENT` level, which is below ``DEBUG`` so
+that the text log is not affected. Events for time intervals have the fields
+``start`` (in seconds since the epoch) and ``time`` (the duration in seconds),
+from which `ChromeTraceHandler` makes a timeline of the run.
+"""
+
+import contextlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from .profiler import profile_phase
+
+Logger = logging.Logger
+
+EVENT = 5  # The logging level for event-only records.
+
+logging.addLevelName(EVENT, "EVENT")
+
+
+def event(name: str, **fields: Any) -> Dict[str, Any]:
+    """Return the ``extra`` argument to attach an event to a log message."""
+    return {"event": name, "event_fields": fields}
+
+
+def log_event(logger: Logger, name: str, **fields: Any) -> None:
+    """Emit an event without a log message."""
+    logger.log(EVENT, name, extra=event(name, **fields))
+
+
+@contextlib.contextmanager
+def timed(logger: Logger, name: str, **fields: Any) -> Iterator[None]:
+    """Emit an event with the start time and duration of the block.
+
+    Blocks for ``phase`` events are profiled if a profiler is active. Blocks
+    running solvers use ``solver_phase`` events instead, which are not profiled so
+    as not to disturb the timings (nor hide the phases inside them).
+    """
+    with contextlib.ExitStack() as stack:
+        if name == "phase":
+            stack.enter_context(profile_phase(fields["phase"]))
+        start = time.time()
+        try:
+            yield
+        finally:
+            log_event(logger, name, start=start, time=time.time() - start, **fields)
+
+
+class JsonLinesHandler(logging.FileHandler):
+    """Handler to write events as JSON lines.
+
+    Records without events are ignored. Each line has the timestamp (in seconds
+    since the epoch), the event name and the logger name, followed by the fields of
+    the event. Values not representable in JSON are converted into strings.
+    """
+
+    def __init__(self, filename: Path) -> None:
+        """Construct a handler writing into the given file."""
+        super().__init__(filename, mode="w", encoding="utf-8")
+        self.setLevel(EVENT)
+        self.addFilter(lambda record: hasattr(record, "event"))
+
+    def format(self, record: logging.LogRecord) -> str:  # noqa: A003
+        """Return the JSON representation of the event."""
+        obj = {
+            "timestamp": record.created,
+            "event": record.event,  # type: ignore[attr-defined]
+            "logger": record.name,
+        }
+        obj.update(getattr(record, "event_fields", {}))
+        return json.dumps(obj, default=str)
+
+
+class ChromeTraceHandler(logging.Handler):
+    """Handler to write events as a timeline in the Chrome trace-event format.
+
+    Events with ``start`` and ``time`` become spans, which nest by their time
+    ranges, and the other events become instants. The per-problem ``result``
+    events become spans in a separate track for each solver, laid out from the
+    start of the solver run; the gaps between them are not known, so only their
+    durations are meaningful. The file, which can be viewed in Perfetto or
+    ``chrome://tracing``, is written when the handler is closed.
+    """
+
+    def __init__(self, filename: Path) -> None:
+        """Construct a handler writing into the given file."""
+        super().__init__(EVENT)
+        self.addFilter(lambda record: hasattr(record, "event"))
+        self._filename = filename
+        self._trace_events: List[Dict[str, Any]] = []
+        self._results: Dict[str, List[Dict[str, Any]]] = {}
+        self._tracks: Dict[str, int] = {}
+        self._trace_events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": 1,
+                "args": {"name": "polybench"},
+            }
+        )
+
+    def _track(self, solver: str) -> int:
+        # The thread id for the per-problem spans of the solver.
+        if solver not in self._tracks:
+            tid = len(self._tracks) + 2
+            self._tracks[solver] = tid
+            self._trace_events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "tid": tid,
+                    "args": {"name": f"{solver} (driver timings)"},
+                }
+            )
+        return self._tracks[solver]
+
+    def _span(self, name: str, start: float, duration: float, **kwargs: Any) -> None:
+        self._trace_events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": 1,
+                "tid": 1,
+                **kwargs,
+            }
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Record the event."""
+        name: str = record.event  # type: ignore[attr-defined]
+        fields: Dict[str, Any] = getattr(record, "event_fields", {})
+        solver = fields.get("solver")
+
+        if name == "result" and solver is not None:
+            self._results.setdefault(solver, []).append(fields)
+            return
+
+        if "start" in fields and "time" in fields:
+            label = fields.get("phase", name)
+            if name == "run":
+                label = f"run {Path(fields['command'][0]).name}"
+            if solver is not None:
+                label += f" ({solver})"
+            self._span(label, fields["start"], fields["time"], cat=name, args=fields)
+            if name == "solve" and solver is not None:
+                # The per-problem spans from the timings reported by the solver.
+                t = fields["start"]
+                for r in self._results.pop(solver, []):
+                    self._span(
+                        f"Prob. {r['problem']}",
+                        t,
+                        r["time"],
+                        cat="result",
+                        tid=self._track(solver),
+                        args=r,
+                    )
+                    t += r["time"]
+        else:
+            self._trace_events.append(
+                {
+                    "name": name,
+                    "cat": name,
+                    "ph": "i",
+                    "s": "p",
+                    "ts": record.created * 1e6,
+                    "pid": 1,
+                    "tid": 1,
+                    "args": fields,
+                }
+            )
+
+    def close(self) -> None:
+        """Write the trace file and close the handler."""
+        if len(self._trace_events) > 1:
+            with self._filename.open("w", encoding="utf-8") as f:
+                json.dump(
+                    {"traceEvents": self._trace_events, "displayTimeUnit": "ms"},
+                    f,
+                    default=str,
+                )
+            self._trace_events = []
+        super().close()
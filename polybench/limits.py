@@ -0,0 +1,191 @@
+"""Resource limits for solver processes.
+
+Each process run by a solver is placed in a transient cgroup (v2) with the limits,
+if this process is in a cgroup where the controllers are enabled for child cgroups
+(e.g., at the root of a container). Otherwise, the memory limit is applied to
+each process as ``RLIMIT_DATA`` (the descendants inherit the limit, but each of
+them has its own budget) and the CPU limit as the CPU affinity.
+"""
+
+import math
+import os
+import signal
+import uuid
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # pragma: no cover  # not on Windows
+    resource = None  # type: ignore[assignment]
+
+# Messages in the standard error of programs running out of memory.
+OUT_OF_MEMORY_MESSAGES = (
+    "out of memory",
+    "outofmemoryerror",  # Java
+    "could not reserve enough space",  # Java
+    "memory allocation of",  # Rust
+    "std::bad_alloc",  # C++
+    "memoryerror",  # Python
+    "cannot allocate memory",
+    "failed to allocate memory",  # the FLINT driver
+    "unable to allocate memory",  # FLINT
+    "no memory while allocating",  # FORM
+    "no more memory",  # Mathematica, Singular
+)
+
+
+class ResourceLimits(NamedTuple):
+    """Limits on the resources of each process run by a solver."""
+
+    max_memory: Optional[int] = None  # in bytes
+    cpus: Optional[float] = None  # number of CPUs (may be fractional with cgroups)
+
+
+def _cgroup_dir() -> Optional[Path]:
+    # Return the cgroup v2 directory of this process, if any.
+    try:
+        mounts = Path("/proc/self/mounts").read_text().splitlines()
+        lines = Path("/proc/self/cgroup").read_text().splitlines()
+    except OSError:
+        return None
+    mount_point = None
+    for m in mounts:
+        fields = m.split()
+        if len(fields) >= 3 and fields[2] == "cgroup2":
+            mount_point = Path(fields[1])
+            break
+    if mount_point is None:
+        return None
+    for line in lines:
+        if line.startswith("0::"):
+            return mount_point / line[3:].strip().lstrip("/")
+    return None
+
+
+def _write(path: Path, value: str) -> None:
+    with path.open("w") as f:
+        f.write(value)
+
+
+class LimitedRun:
+    """Context to apply resource limits to the processes started in it.
+
+    The process must be started with `preexec_fn` (only on POSIX systems). After
+    the process ends, `out_of_memory` tells whether it ran out of memory.
+    """
+
+    def __init__(self, limits: ResourceLimits) -> None:
+        """Construct a context with the given limits."""
+        self._limits = limits
+        self._cgroup: Optional[Path] = None
+        self._max_data: Optional[int] = None
+        self._cpu_set: Sequence[int] = ()
+
+    def __enter__(self) -> "LimitedRun":
+        """Create a transient cgroup if available."""
+        limits = self._limits
+        parent = _cgroup_dir()
+        if parent is not None:
+            try:
+                controllers = (parent / "cgroup.subtree_control").read_text().split()
+                needed = ["memory"] if limits.max_memory is not None else []
+                if limits.cpus is not None:
+                    needed.append("cpu")
+                if all(c in controllers for c in needed):
+                    cgroup = parent / f"polybench-{uuid.uuid4().hex[:12]}"
+                    cgroup.mkdir()
+                    self._cgroup = cgroup
+                    # Check here, as failures in the child only tell that
+                    # `preexec_fn` failed.
+                    if not os.access(str(cgroup / "cgroup.procs"), os.W_OK):
+                        raise PermissionError(f"{cgroup / 'cgroup.procs'}")
+                    if limits.max_memory is not None:
+                        _write(cgroup / "memory.max", str(limits.max_memory))
+                        if (cgroup / "memory.swap.max").exists():
+                            _write(cgroup / "memory.swap.max", "0")
+                    if limits.cpus is not None:
+                        period = 100000
+                        _write(
+                            cgroup / "cpu.max", f"{int(limits.cpus * period)} {period}"
+                        )
+            except OSError:
+                self._remove_cgroup()
+        if self._cgroup is None and limits.max_memory is not None:
+            # The soft limit cannot be raised above the hard limit, which is
+            # anyway in force.
+            _, hard = resource.getrlimit(resource.RLIMIT_DATA)
+            if hard != resource.RLIM_INFINITY:
+                self._max_data = min(limits.max_memory, hard)
+            else:
+                self._max_data = limits.max_memory
+        if (
+            self._cgroup is None
+            and limits.cpus is not None
+            and hasattr(os, "sched_getaffinity")
+        ):
+            cpus = sorted(os.sched_getaffinity(0))
+            self._cpu_set = cpus[: max(math.ceil(limits.cpus), 1)]
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Remove the cgroup."""
+        self._remove_cgroup()
+
+    def _remove_cgroup(self) -> None:
+        if self._cgroup is not None:
+            try:
+                self._cgroup.rmdir()
+            except OSError:
+                pass  # processes left; removed by the system when they end
+            self._cgroup = None
+
+    @property
+    def uses_cgroup(self) -> bool:
+        """Return `True` if the processes are placed in a transient cgroup."""
+        return self._cgroup is not None
+
+    @property
+    def preexec_fn(self) -> Callable[[], None]:
+        """Return the function to be called in the child process before exec."""
+        cgroup = self._cgroup
+        max_memory = self._max_data
+        cpu_set = self._cpu_set
+
+        def preexec() -> None:
+            if cgroup is not None:
+                fd = os.open(str(cgroup / "cgroup.procs"), os.O_WRONLY)
+                try:
+                    os.write(fd, str(os.getpid()).encode())
+                finally:
+                    os.close(fd)
+                return
+            if max_memory is not None:
+                resource.setrlimit(resource.RLIMIT_DATA, (max_memory, max_memory))
+            if cpu_set:
+                os.sched_setaffinity(0, cpu_set)
+
+        return preexec
+
+    def out_of_memory(self, returncode: int, stderr: str = "") -> bool:
+        """Return `True` if the process ended with the given code ran out of memory.
+
+        In the cgroup, the kernel counts the processes killed by the OOM killer.
+        Otherwise, allocation failures are recognised from the messages in the
+        standard error, if captured, and processes killed by ``SIGKILL`` are
+        assumed to be killed by the OOM killer.
+        """
+        if returncode == 0 or self._limits.max_memory is None:
+            return False
+        if self._cgroup is not None:
+            try:
+                for line in (self._cgroup / "memory.events").read_text().splitlines():
+                    key, _, value = line.partition(" ")
+                    if key == "oom_kill" and int(value) > 0:
+                        return True
+            except (OSError, ValueError):
+                pass
+        if returncode == -signal.SIGKILL:
+            return True
+        text = stderr.lower()
+        return any(m in text for m in OUT_OF_MEMORY_MESSAGES)
@@ -1,34 +1,33 @@
 """Main routines."""
 
 import argparse
-import functools
 import logging
-import operator
+import os
 import platform
 import re
-import shutil
-import statistics
 import sys
 import time
 from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Set, cast
+from typing import Any, Callable, Dict, List, Optional, Sequence, cast
 
 import colorama
 import cpuinfo
 import psutil
 
 from . import plot
-from .poly import Polynomial
+from .api import Config, create_solvers, next_job_id, prepare_solvers, run_solvers
+from .events import EVENT, ChromeTraceHandler, JsonLinesHandler, event, log_event, timed
+from .perf import perf_error
 from .prob import (
     ExponentsDistribution,
-    ProblemSet,
     ProblemTypeInput,
     get_exponents_distribution_args,
     get_problem_type_input_args,
 )
-from .solver import Result, Solver, SolverSetupError
-from .util import bytes2human
+from .profiler import PhaseProfiler, profile_phase, set_active_profiler
+from .solver import HarnessOptions, Solver, SolverSetupError
+from .util import bytes2human, human2bytes, user_cache_dir
 
 Logger = logging.Logger
 
@@ -39,39 +38,30 @@ colorama.deinit()
 
 import colorlog  # noqa: E402
 
-
-def next_job_id(output_dir: Path) -> str:
-    """Return the next job id."""
-    # The ids are of form "0001", "0002", ...
-    # Such ids are used for naming log files "0001.log" etc.
-    # We look for the first id that haven't been used in the output directory.
-
-    def make_job_id(n: int) -> str:
-        return f"{n:0>4}"
-
-    n = 1
-
-    if output_dir.is_dir():
-        existing_job_ids = {
-            f.name.split(".", maxsplit=1)[0] for f in output_dir.glob("*.*")
-        }
-        while make_job_id(n) in existing_job_ids:
-            n += 1
-
-    return make_job_id(n)
+# Defaults of the options for each problem profile. Options given explicitly on
+# the command line take precedence.
+PROBLEM_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    # A few variables with high powers: the exponents in the problems and answers
+    # exceed 255, beyond 8-bit packed exponents.
+    "high-degree": {"nvars": 3, "max_nterms": 10, "max_degree": 600},
+}
 
 
 def config_log(logger: Logger, **kwargs: Any) -> None:
     """Log the configurations."""
     env_logger = logger.getChild("Environment")
+    env: Dict[str, Any] = {}
 
-    env_logger.info(f"platform = {platform.platform()}")
+    env["platform"] = platform.platform()
+    env_logger.info(f"platform = {env['platform']}")
 
     cpu_info = cpuinfo.get_cpu_info()
     fields = [("python_version", ""), ("brand_raw", "cpu_brand")]
     for key, display_name in fields:
         if key in cpu_info:
             value = re.sub(r"\s\s+", " ", cpu_info[key])
+            env[display_name or key] = value
             if display_name:
                 env_logger.info(f"{display_name} = {value}")
             else:
@@ -81,214 +71,78 @@ def config_log(logger: Logger, **kwargs: Any) -> None:
     logical_cpu_count = psutil.cpu_count(logical=True)
 
     if isinstance(cpu_count, int) and isinstance(logical_cpu_count, int):
+        env["cpu_count"] = cpu_count
+        env["logical_cpu_count"] = logical_cpu_count
         if cpu_count == logical_cpu_count:
             env_logger.info(f"cpu_count = {cpu_count}")
         else:
             env_logger.info(f"cpu_count = {cpu_count} (logical: {logical_cpu_count})")
 
-    env_logger.info(f"total_memory = {bytes2human(psutil.virtual_memory().total)}B")
+    env["total_memory"] = psutil.virtual_memory().total
+    env_logger.info(f"total_memory = {bytes2human(env['total_memory'])}B")
+
+    log_event(env_logger, "environment", **env)
 
     config_logger = logger.getChild("Config")
     for key, value in kwargs.items():
         config_logger.info(f"{key} = {value}")
 
-
-def prepare_solvers(
-    solvers: Sequence[Solver],
-    problems: ProblemSet,
-    fail_on_setup_failure: bool,
-) -> Sequence[Solver]:
-    """Make the solvers prepare for the problems and return available solvers."""
-    available_solvers = []
-
-    failed = False
-
-    for s in solvers:
-        try:
-            v = s.prepare(problems)
-            if v:
-                available_solvers.append(s)
-                s.logger.info(v)
-            else:
-                s.logger.warning("not available")
-        except SolverSetupError as e:
-            failed = True
-            if fail_on_setup_failure:
-                s.logger.error(e)
-            else:
-                s.logger.warning(e)
-
-    if fail_on_setup_failure and failed:
-        sys.exit(1)
-
-    return tuple(available_solvers)
-
-
-class SolverResult(NamedTuple):
-    """Result from a solver."""
-
-    name: str
-    res: Sequence[Result]
-    output_dir: Path
-
-
-def run_solvers(
-    solvers: Sequence[Solver],
-    problems: ProblemSet,
-    *,
-    job_id: str,
-    output_dir: Path,
-    plot_title: str,
-    plot_suffixes: Sequence[str],
-    logger: Logger,
-    keep_temp: bool = False,
-) -> None:
-    """Run the solvers for the given set of problems."""
-    # Log for problems.
-
-    problem_file = output_dir / f"{job_id}.problems.log"
-
-    with problem_file.open(mode="w") as f:
-        for p in problems:
-            print(p, file=f)
-
-    # Run solvers.
-
-    def get_timing_information(results: Sequence[Result], n_warmups: int) -> str:
-        """Return the timing information as a string."""
-        times = [r.time for r in results][n_warmups:]
-        if len(times) == 0:
-            return ""
-        if len(times) == 1:
-            return f" ({times[0]:.3f} sec)"
-        mean = statistics.mean(times)
-        stdev = statistics.stdev(times, mean)
-        max_t, max_i = max((t, i) for i, t in enumerate(times))
-        return (
-            f" (mean: {mean:.3f} sec,"
-            f" SD: {stdev:.3f} sec,"
-            f" slowest: {max_t:.3f} sec on Prob. {max_i + 1 + n_warmups})"
-        )
-
-    results: List[SolverResult] = []
-
-    for s in solvers:
-        s._problem_file = problem_file  # Yes, this is ugly.
-        t1 = time.time()
-        r = s.solve(problems)
-        t2 = time.time()
-        if r and len(r) == len(problems):
-            results.append(SolverResult(s.name, r, s._output_dir))
-            s.logger.info(
-                f"{t2 - t1:.3f} sec{get_timing_information(r, problems.n_warmups)}"
-            )
-        else:
-            s.logger.error("failed")
-
-    # Check the consistency of the obtained results.
-
-    check_logger = logger.getChild("Check")
-
-    wrong: Set[str] = set()
-
-    def count_factors(pp: Sequence[Polynomial]) -> int:
-        n = 0
-        m = 0
-        for p in pp:
-            n_terms = len(p)
-            if n_terms == 0:
-                return 0
-            elif n_terms == 1:
-                if not p.is_unit:
-                    m += 1
-            else:
-                n += 1
-        if m >= 1:
-            n += 1
-        return n
-
-    if problems.problem_type == "gcd":
-        # The GCD must be given as a single polynomial.
-        for name, res, _ in results:
-            for i, ri in enumerate(res):
-                if len(ri.answer) != 1:
-                    check_logger.error(f"{name}:{i + 1}: wrong answer")
-                    wrong.add(name)
-        # The GCD must be the same up to a multiplicative unit.
-        if len(results) >= 2:
-            for i in range(len(problems)):
-                pp0 = results[0].res[i].answer
-                if len(pp0) != 1:
-                    continue
-                p0 = pp0[0]
-                for j in range(1, len(results)):
-                    ppj = results[j].res[i].answer
-                    if len(ppj) != 1:
-                        continue
-                    pj = ppj[0]
-                    if not p0.equals_without_unit(pj):
-                        name0 = results[0].name
-                        namej = results[j].name
-                        check_logger.error(
-                            f"{name0}:{namej}:{i + 1}: inconsistent answers"
-                        )
-                        wrong.add(name0)
-                        wrong.add(namej)
-    elif problems.problem_type == "factor":
-        # The product of the factorized polynomials must equal the original polynomial.
-        for name, res, _ in results:
-            for i, ri in enumerate(res):
-                product = functools.reduce(operator.mul, ri.answer, Polynomial(1))
-                if problems[i].p != product:
-                    check_logger.error(f"{name}:{i + 1}: wrong answer")
-                    wrong.add(name)
-        # The number of factorized polynomials must match,
-        # excluding any single-term polynomials.
-        if len(results) >= 2:
-            for i in range(len(problems)):
-                pp0 = results[0].res[i].answer
-                n0 = count_factors(pp0)
-                for j in range(1, len(results)):
-                    ppj = results[j].res[i].answer
-                    nj = count_factors(ppj)
-                    if n0 != nj:
-                        name0 = results[0].name
-                        namej = results[j].name
-                        check_logger.error(
-                            f"{name0}:{namej}:{i + 1}: inconsistent answers"
-                        )
-                        wrong.add(name0)
-                        wrong.add(namej)
-
-    # Remove the solver's output directory only if succeeded.
-
-    if not keep_temp:
-        for name, _, path in results:
-            if name not in wrong and path.exists():
-                shutil.rmtree(path)
-
-    if results:
-        # Write the timings into a CSV file.
-
-        output_csv_file = output_dir / f"{job_id}.csv"
-
-        plot.write_csv(
-            output_csv_file, problems, {name: res for name, res, _ in results}
-        )
-
-        logger.info(f"output_csv_file = {output_csv_file}")
-
-        # Generate plots.
-
-        plot_output_dir = output_csv_file.with_suffix(".figures")
-
-        if plot_suffixes:
-            for suffix in plot_suffixes:
-                plot.make_plots(
-                    output_csv_file, plot_output_dir, "." + suffix, title=plot_title
-                )
-
-            logger.info(f"figures are in {plot_output_dir}")
+    log_event(config_logger, "config", **kwargs)
+
+
+def parse_threads(s: str) -> List[int]:
+    """Parse a comma separated list of the numbers of threads."""
+    try:
+        result = sorted({int(x) for x in s.split(",") if x.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid numbers of threads: {s}")
+    if not result or result[0] < 1:
+        raise argparse.ArgumentTypeError(f"invalid numbers of threads: {s}")
+    return result
+
+
+def parse_harness(s: str) -> HarnessOptions:
+    """Parse the options for the harness mode."""
+    try:
+        values = [int(x) for x in s.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid harness options: {s}")
+    if len(values) != 3 or values[0] < 0 or values[1] < 1 or values[2] < 1:
+        raise argparse.ArgumentTypeError(f"invalid harness options: {s}")
+    return HarnessOptions(*values)
+
+
+def parse_memory_size(s: str) -> int:
+    """Parse a memory size with an optional suffix (K, M, G, ...)."""
+    try:
+        result = human2bytes(s)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    if result <= 0:
+        raise argparse.ArgumentTypeError(f"invalid size: {s}")
+    return result
+
+
+def parse_cpus(s: str) -> float:
+    """Parse a positive number of CPUs."""
+    try:
+        result = float(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of CPUs: {s}")
+    if not result > 0:
+        raise argparse.ArgumentTypeError(f"invalid number of CPUs: {s}")
+    return result
+
+
+def parse_interval(s: str) -> float:
+    """Parse a positive interval in seconds."""
+    try:
+        result = float(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid interval: {s}")
+    if not result > 0:
+        raise argparse.ArgumentTypeError(f"invalid interval: {s}")
+    return result
 
 
 def main(
@@ -313,11 +167,25 @@ def main(
         help="set the type of the problems:"
         " trivial-gcd [gcd(a*b,c*d)],"
         " nontrivial-gcd [gcd(a*g,b*g)],"
-        " trivial-factor [factor(a*b+c)]"
-        " or nontrivial-factor [factor(a*b)]"
+        " trivial-factor [factor(a*b+c)],"
+        " nontrivial-factor [factor(a*b)],"
+        " dense-mul [expand(a*b) for a and b with all the monomials up to a total"
+        " degree],"
+        " sparse-mul [expand(a*b) for random a and b],"
+        " division [div(a*g,g)],"
+        " divisibility [whether g divides a*g or a*g+1]"
+        " or ratfun [a*c/(g*c)+b/(g*h) normalised]"
         " (default: nontrivial-gcd)",
         metavar="TYPE",
     )
+    parser.add_argument(
+        "--problem-profile",
+        default="default",
+        choices=tuple(PROBLEM_PROFILES),
+        help="set the defaults of the problem size options: default or high-degree"
+        " [--nvars 3 --max-nterms 10 --max-degree 600] (default: default)",
+        metavar="PROFILE",
+    )
     parser.add_argument(
         "--nproblems",
         default=50,
@@ -332,6 +200,12 @@ def main(
         help="set the number of warm-up problems (default: 10)",
         metavar="N",
     )
+    parser.add_argument(
+        "--adaptive-warmups",
+        action="store_true",
+        help="use the warm-ups as calibration runs of the same problem and detect "
+        "when the timings become steady for each solver",
+    )
     parser.add_argument(
         "--exp-dist",
         default="uniform",
@@ -405,6 +279,29 @@ def main(
         help="set the output directory (default: output)",
         metavar="DIR",
     )
+    parser.add_argument(
+        "--download-cache",
+        default=None,
+        type=str,
+        help="set the cache directory for downloaded files shared among build"
+        f" directories (default: {user_cache_dir() / 'downloads'})",
+        metavar="DIR",
+    )
+    parser.add_argument(
+        "--download-mirror",
+        action="append",
+        default=[],
+        type=str,
+        help="look for downloaded files in the given local directory or URL prefix"
+        " before the original URL (can be given multiple times)",
+        metavar="DIR_OR_URL",
+        dest="download_mirrors",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="never download files from the original URLs",
+    )
     parser.add_argument(
         "--plot-suffixes",
         default="pdf",
@@ -427,6 +324,113 @@ def main(
         help="set the timeout in seconds (default: 1 hour)",
         metavar="N",
     )
+    parser.add_argument(
+        "--threads",
+        default=[1],
+        type=parse_threads,
+        help="set the number of threads for solvers supporting multi-threading;"
+        " a comma separated list runs them with each number of threads"
+        " and reports speedup and efficiency (default: 1)",
+        metavar="N1,N2,...",
+    )
+    parser.add_argument(
+        "--modulus",
+        default=None,
+        type=int,
+        help="solve gcd and factor problems over the prime field of the given order,"
+        " with the coefficients reduced modulo P (default: over the integers)",
+        metavar="P",
+    )
+    parser.add_argument(
+        "--throughput",
+        default=[],
+        type=parse_threads,
+        help="also run solvers supporting the throughput mode, where the problems are"
+        " solved concurrently by a pool of N worker threads, for each of the given"
+        " numbers and report problems/sec and the latency distribution",
+        metavar="N1,N2,...",
+    )
+    parser.add_argument(
+        "--harness",
+        default=None,
+        type=parse_harness,
+        help="run solvers supporting the steady-state harness mode (Rings) in the"
+        " mode, where each problem is solved W times for warm-up and then I times"
+        " for measurement in each of F forked processes, and report the score and"
+        " error of each problem",
+        metavar="W,I,F",
+    )
+    parser.add_argument(
+        "--cold-start",
+        action="store_true",
+        help="also solve each problem in a fresh process of each solver and report"
+        " the startup cost and the computation time in the fresh process together"
+        " with that in the warm process",
+    )
+    parser.add_argument(
+        "--max-memory",
+        default=None,
+        type=parse_memory_size,
+        help="limit the memory of each solver run, in a transient cgroup if"
+        " available or otherwise by RLIMIT_DATA of each process (POSIX only);"
+        " runs exceeding it fail as out of memory (e.g., 4G)",
+        metavar="SIZE",
+    )
+    parser.add_argument(
+        "--cpus",
+        default=None,
+        type=parse_cpus,
+        help="limit the CPUs of each solver run, by the CPU quota in a transient"
+        " cgroup if available or otherwise by the CPU affinity (POSIX only)",
+        metavar="N",
+    )
+    parser.add_argument(
+        "--resource-interval",
+        default=None,
+        type=parse_interval,
+        help="sample the memory, CPU usage and threads of each solver run at the"
+        " given interval in seconds, report the peak memory usage, and write the"
+        " timeline with the progress of the problems and plot the memory usage"
+        " over time (default: not sampled)",
+        metavar="SEC",
+    )
+    parser.add_argument(
+        "--rerun-outliers",
+        action="store_true",
+        help="solve again the problems whose timings are outliers or which ran"
+        " under high load or steal time (monitored during each solver run), and"
+        " report both the timings",
+    )
+    parser.add_argument(
+        "--interleave",
+        default=None,
+        type=int,
+        help="run the pairs of a solver and a chunk of N problems (after the"
+        " warm-ups) in a random order seeded by --seed, instead of each solver"
+        " over all the problems in turn, and record the order",
+        metavar="N",
+    )
+    parser.add_argument(
+        "--perf-counters",
+        action="store_true",
+        help="run the solver programs under `perf stat` (Linux) and report the"
+        " instructions, cycles, cache misses and branch misses of each solver,"
+        " with the IPC and the misses per term",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        type=str,
+        help="write a timeline of the run in the Chrome trace-event format"
+        " (viewable in Perfetto) into the given file",
+        metavar="FILE",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile the phases of the benchmark program itself with cProfile"
+        " and write the summary and .pstats files into the output directory",
+    )
     parser.add_argument(
         "--color",
         default="auto",
@@ -457,10 +461,34 @@ def main(
     )
 
     class SolverSelectionAction(argparse.Action):
-        def __init__(self, *args: Any, **kwargs: Any) -> None:
+        def __init__(
+            self, *args: Any, solver_name: Optional[str] = None, **kwargs: Any
+        ) -> None:
             kwargs["nargs"] = 0
+            self._solver_name = solver_name
             super().__init__(*args, **kwargs)
 
+        # The help message for each solver is made only when it is displayed
+        # because it requires the solver module to be loaded.
+
+        @property
+        def help(self) -> Optional[str]:  # noqa: A003
+            if self._solver_name is None:
+                return self._help
+            try:
+                c = Solver.load_solver_class(self._solver_name)
+            except RuntimeError:
+                return f"run/skip {self._solver_name} solver (failed to load)"
+            if c._env_var:
+                extra_info = f" (environment variable: {c._env_var})"
+            else:
+                extra_info = ""
+            return f"run/skip {c._name} solver{extra_info}"
+
+        @help.setter
+        def help(self, value: Optional[str]) -> None:  # noqa: A003
+            self._help = value
+
         def __call__(
             self,
             parser: argparse.ArgumentParser,
@@ -476,8 +504,7 @@ def main(
                 setattr(namespace, self.dest, solvers)
             option_string = option_string[2:]
             if option_string == "all":
-                for c in Solver.get_solver_classes():
-                    s = c._name.lower()
+                for s in Solver.get_solver_names():
                     if s not in solvers:
                         solvers.append(s)
             elif option_string.startswith("no-"):
@@ -494,22 +521,30 @@ def main(
         help="run all solvers",
         dest="solvers",
     )
-    for c in Solver.get_solver_classes():
-        name = c._name
-        if c._env_var:
-            extra_info = f" (environment variable: {c._env_var})"
-        else:
-            extra_info = ""
+    for name in Solver.get_solver_names():
         parser.add_argument(
-            f"--{name.lower()}",
-            f"--no-{name.lower()}",
+            f"--{name}",
+            f"--no-{name}",
             action=SolverSelectionAction,
-            help=f"run/skip {name} solver{extra_info}",
             dest="solvers",
+            solver_name=name,
         )
 
+    opts, _ = parser.parse_known_args(args=args)
+    parser.set_defaults(**PROBLEM_PROFILES[opts.problem_profile])
     opts = parser.parse_args(args=args)
 
+    if (opts.max_memory is not None or opts.cpus is not None) and os.name != "posix":
+        parser.error("--max-memory and --cpus are supported only on POSIX systems")
+
+    if opts.interleave is not None and opts.interleave < 1:
+        parser.error(f"invalid chunk size for --interleave: {opts.interleave}")
+
+    if opts.perf_counters:
+        error = perf_error()
+        if error is not None:
+            parser.error(f"--perf-counters not available: {error}")
+
     # Initialise colours in the terminal before other things.
     color = cast(str, opts.color)
     strip: Optional[bool] = None  # for "auto"
@@ -523,52 +558,56 @@ def main(
     if stderr_color_hook:
         stderr_color_hook(old_stderr == sys.stderr)
 
-    problem_type = cast(ProblemTypeInput, opts.type)
-    n_problems = cast(int, opts.nproblems)
-    n_warmups = cast(int, opts.nwarmups)
-    exp_dist = cast(ExponentsDistribution, opts.exp_dist)
-    n_vars = cast(int, opts.nvars)
-    max_n_terms = cast(int, opts.max_nterms)
-    max_degree = cast(int, opts.max_degree)
-    max_coeff = cast(int, opts.max_coeff)
-    seed = cast(int, opts.seed)
-    timeout = cast(int, opts.timeout)
     build_only = cast(bool, opts.build_only)
-    fail_on_setup_failure = cast(bool, opts.fail_on_setup_failure)
-    keep_temp = cast(bool, opts.keep_temp)
-    debug = cast(bool, opts.debug)
-
-    if opts.min_nterms is not None:
-        min_n_terms = cast(int, opts.min_nterms)
-    else:
-        min_n_terms = max(int(max_n_terms * 0.75), 1)
-
-    if opts.min_degree is not None:
-        min_degree = cast(int, opts.min_degree)
-    else:
-        if exp_dist == "uniform":
-            min_degree = max(int(max_degree * 0.75), 0)
-        else:
-            min_degree = 0
-
-    if opts.min_coeff is not None:
-        min_coeff = cast(int, opts.min_coeff)
-    else:
-        min_coeff = -max_coeff
-
-    if opts.build_directory is not None:
-        build_dir = Path(opts.build_directory)
-    else:
-        build_dir = Path(".") / "build"
-
-    build_dir = build_dir.resolve()
 
     if opts.output_directory is not None:
         output_dir = Path(opts.output_directory)
     else:
         output_dir = Path(".") / "output"
 
-    output_dir = output_dir.resolve()
+    config = Config(
+        solvers=cast(List[str], opts.solvers or []),
+        problem_type=cast(ProblemTypeInput, opts.type),
+        n_problems=cast(int, opts.nproblems),
+        n_warmups=cast(int, opts.nwarmups),
+        adaptive_warmups=cast(bool, opts.adaptive_warmups),
+        exp_dist=cast(ExponentsDistribution, opts.exp_dist),
+        n_vars=cast(int, opts.nvars),
+        min_n_terms=cast(Optional[int], opts.min_nterms),
+        max_n_terms=cast(int, opts.max_nterms),
+        min_degree=cast(Optional[int], opts.min_degree),
+        max_degree=cast(int, opts.max_degree),
+        min_coeff=cast(Optional[int], opts.min_coeff),
+        max_coeff=cast(int, opts.max_coeff),
+        seed=cast(int, opts.seed),
+        timeout=cast(int, opts.timeout),
+        threads=cast(List[int], opts.threads),
+        throughput=cast(List[int], opts.throughput),
+        harness=cast(Optional[HarnessOptions], opts.harness),
+        cold_start=cast(bool, opts.cold_start),
+        max_memory=cast(Optional[int], opts.max_memory),
+        cpus=cast(Optional[float], opts.cpus),
+        sample_interval=cast(Optional[float], opts.resource_interval),
+        rerun_outliers=cast(bool, opts.rerun_outliers),
+        interleave=cast(Optional[int], opts.interleave),
+        perf_counters=cast(bool, opts.perf_counters),
+        modulus=cast(Optional[int], opts.modulus),
+        build_dir=(
+            Path(opts.build_directory) if opts.build_directory is not None else None
+        ),
+        output_dir=output_dir,
+        download_cache=(
+            Path(opts.download_cache) if opts.download_cache is not None else None
+        ),
+        download_mirrors=cast(List[str], opts.download_mirrors),
+        offline=cast(bool, opts.offline),
+        fail_on_setup_failure=cast(bool, opts.fail_on_setup_failure),
+        keep_temp=cast(bool, opts.keep_temp),
+        debug=cast(bool, opts.debug),
+    ).resolved()
+
+    build_dir = cast(Path, config.build_dir)
+    output_dir = cast(Path, config.output_dir)
 
     plot_suffixes = cast(str, opts.plot_suffixes).split(",")
     plot_suffixes = list(OrderedDict.fromkeys(plot_suffixes))  # remove duplicates
@@ -579,7 +618,7 @@ def main(
         unsupported_suffixes = [s for s in plot_suffixes if s not in supported_suffixes]
         raise ValueError(f"unsupported file format: {', '.join(unsupported_suffixes)}")
 
-    if not opts.solvers:
+    if not config.solvers:
         raise ValueError(
             "no solvers specified. You need to specify at least one solver to be run. "
             "You can use --all option to run all solvers available"
@@ -587,20 +626,15 @@ def main(
 
     # Create problems.
 
-    problems = ProblemSet(
-        problem_type=problem_type,
-        n_warmups=n_warmups,
-        n_problems=n_problems,
-        seed=seed,
-        exp_dist=exp_dist,
-        n_vars=n_vars,
-        min_n_terms=min_n_terms,
-        max_n_terms=max_n_terms,
-        min_degree=min_degree,
-        max_degree=max_degree,
-        min_coeff=min_coeff,
-        max_coeff=max_coeff,
-    )
+    profiler = None
+    if opts.profile:
+        profiler = PhaseProfiler()
+        set_active_profiler(profiler)
+
+    t1 = time.time()
+    with profile_phase("make_problems"):
+        problems = config.make_problems()
+    t2 = time.time()
 
     # Set up the logger.
 
@@ -610,21 +644,21 @@ def main(
 
     logger = logging.getLogger(__name__).getChild("Bench")
 
-    if debug:
-        logger.setLevel(logging.DEBUG)
-        Solver.debug = True
-    else:
-        logger.setLevel(logging.INFO)
+    # The logger passes events to the event log, while the text log takes
+    # only the messages at the given level.
+    log_level = logging.DEBUG if config.debug else logging.INFO
+    logger.setLevel(EVENT)
 
     def name_filter(record: logging.LogRecord) -> bool:
         record.name = record.name.split(".")[-1]
         return True
 
     stream_handler = colorlog.StreamHandler()
+    stream_handler.setLevel(log_level)
     stream_handler.addFilter(name_filter)
     stream_handler.setFormatter(
         colorlog.ColoredFormatter(
-            "{log_color}[{levelname:^8}] {name:12}{reset}{message_log_color}{message}",
+            "{log_color}[{levelname:^8}] {name:12}{reset} {message_log_color}{message}",
             style="{",
             log_colors={
                 "DEBUG": "cyan",
@@ -643,84 +677,246 @@ def main(
     logger.info(f"log_file = {log_file}")  # Before the log file is opened.
 
     log_file_handler = logging.FileHandler(log_file)
+    log_file_handler.setLevel(log_level)
     log_file_handler.addFilter(name_filter)
     log_file_handler.setFormatter(
         logging.Formatter(
-            "{asctime} [{levelname:^8}] {name:12}{message}",
+            "{asctime} [{levelname:^8}] {name:12} {message}",
             style="{",
             datefmt="%Y-%m-%d %H:%M:%S",
         )
     )
     logger.addHandler(log_file_handler)
 
+    event_file = output_dir / f"{job_id}.events.jsonl"
+    event_file_handler = JsonLinesHandler(event_file)
+    event_file_handler.addFilter(name_filter)
+    logger.addHandler(event_file_handler)
+
+    trace_handler = None
+    if opts.trace is not None:
+        trace_handler = ChromeTraceHandler(Path(opts.trace).resolve())
+        trace_handler.addFilter(name_filter)
+        logger.addHandler(trace_handler)
+
+    log_event(logger, "artifact", kind="log", path=log_file)
+    logger.info(
+        f"event_file = {event_file}",
+        extra=event("artifact", kind="events", path=event_file),
+    )
+    log_event(logger, "phase", phase="make_problems", start=t1, time=t2 - t1)
+
     # Create solvers.
 
-    solvers = Solver.create_solvers(
+    solvers = create_solvers(
+        config.solvers,
         job_id=job_id,
         build_dir=build_dir,
         output_dir=output_dir,
         logger=logger,
-        timeout=timeout,
+        timeout=config.timeout,
+        debug=config.debug,
+        download_options=config.download_options(),
+        threads=config.threads,
+        workers=config.throughput,
+        harness=config.harness,
+        limits=config.limits(),
+        sample_interval=config.sample_interval,
+        perf_counters=config.perf_counters,
     )
 
-    unknown_solvers = [
-        s for s in opts.solvers if all(s.lower() != t.name.lower() for t in solvers)
-    ]
-
-    if unknown_solvers:
-        raise ValueError(f"unknown solvers specified: {unknown_solvers}")
-
-    solvers = [
-        s for s in solvers if any(s.name.lower() == t.lower() for t in opts.solvers)
-    ]
-
     # Title for plots.
 
     plot_title = (
-        f"{problem_type} ({exp_dist}, # vars = {n_vars}, "
-        f"max degrees = {max_degree}, max # terms = {max_n_terms})"
+        f"{config.problem_type} ({config.exp_dist}, # vars = {config.n_vars}, "
+        f"max degrees = {config.max_degree}, max # terms = {config.max_n_terms})"
     )
+    if config.modulus is not None:
+        plot_title += f" mod {config.modulus}"
 
     # Do benchmarks.
 
     config_log(
         logger,
-        problem_type=problem_type,
-        n_warmups=n_warmups,
-        n_problems=n_problems,
-        exp_dist=exp_dist,
-        n_vars=n_vars,
-        min_n_terms=min_n_terms,
-        max_n_terms=max_n_terms,
-        min_degree=min_degree,
-        max_degree=max_degree,
-        min_coeff=min_coeff,
-        max_coeff=max_coeff,
+        problem_type=config.problem_type,
+        problem_profile=opts.problem_profile,
+        n_warmups=config.n_warmups,
+        adaptive_warmups=config.adaptive_warmups,
+        n_problems=config.n_problems,
+        exp_dist=config.exp_dist,
+        n_vars=config.n_vars,
+        min_n_terms=config.min_n_terms,
+        max_n_terms=config.max_n_terms,
+        min_degree=config.min_degree,
+        max_degree=config.max_degree,
+        min_coeff=config.min_coeff,
+        max_coeff=config.max_coeff,
+        degree_bound=problems.degree_bound,
+        modulus=config.modulus,
         build_dir=build_dir,
         output_dir=output_dir,
+        download_cache=config.download_cache,
+        download_mirrors=config.download_mirrors,
+        offline=config.offline,
         job_id=job_id,
-        seed=seed,
-        timeout=timeout,
+        seed=config.seed,
+        timeout=config.timeout,
+        threads=",".join(str(n) for n in config.threads),
+        throughput=",".join(str(n) for n in config.throughput),
+        harness=",".join(str(n) for n in config.harness) if config.harness else None,
+        cold_start=config.cold_start,
+        max_memory=config.max_memory,
+        cpus=config.cpus,
+        resource_interval=config.sample_interval,
+        rerun_outliers=config.rerun_outliers,
+        interleave=config.interleave,
+        perf_counters=config.perf_counters,
         build_only=build_only,
-        fail_on_setup_failure=fail_on_setup_failure,
-        keep_temp=keep_temp,
-        debug=debug,
+        fail_on_setup_failure=config.fail_on_setup_failure,
+        keep_temp=config.keep_temp,
+        debug=config.debug,
     )
 
-    solvers = prepare_solvers(
-        solvers,
-        problems,
-        fail_on_setup_failure,
-    )
+    try:
+        solvers = prepare_solvers(
+            solvers,
+            problems,
+            config.fail_on_setup_failure,
+        )
+    except SolverSetupError:
+        sys.exit(1)
 
     if solvers and not build_only:
-        run_solvers(
+        table = run_solvers(
             solvers,
             problems,
             job_id=job_id,
             output_dir=output_dir,
-            plot_title=plot_title,
-            plot_suffixes=plot_suffixes,
             logger=logger,
-            keep_temp=keep_temp,
+            keep_temp=config.keep_temp,
+            cold_start=config.cold_start,
+            rerun_outliers=config.rerun_outliers,
+            interleave=config.interleave,
+        )
+
+        if table:
+            # Write the timings into a CSV file.
+
+            output_csv_file = output_dir / f"{job_id}.csv"
+
+            with timed(logger, "phase", phase="write_csv"):
+                table.to_csv(output_csv_file)
+
+            logger.info(
+                f"output_csv_file = {output_csv_file}",
+                extra=event("artifact", kind="csv", path=output_csv_file),
+            )
+
+            if table.scaling():
+                scaling_csv_file = output_dir / f"{job_id}.scaling.csv"
+                table.scaling_to_csv(scaling_csv_file)
+                logger.info(
+                    f"scaling_csv_file = {scaling_csv_file}",
+                    extra=event("artifact", kind="scaling_csv", path=scaling_csv_file),
+                )
+
+            if table.throughput():
+                throughput_csv_file = output_dir / f"{job_id}.throughput.csv"
+                table.throughput_to_csv(throughput_csv_file)
+                logger.info(
+                    f"throughput_csv_file = {throughput_csv_file}",
+                    extra=event(
+                        "artifact", kind="throughput_csv", path=throughput_csv_file
+                    ),
+                )
+
+            if table.cold_start():
+                cold_start_csv_file = output_dir / f"{job_id}.coldstart.csv"
+                table.cold_start_to_csv(cold_start_csv_file)
+                logger.info(
+                    f"cold_start_csv_file = {cold_start_csv_file}",
+                    extra=event(
+                        "artifact", kind="cold_start_csv", path=cold_start_csv_file
+                    ),
+                )
+
+            if table.reruns():
+                rerun_csv_file = output_dir / f"{job_id}.rerun.csv"
+                table.reruns_to_csv(rerun_csv_file)
+                logger.info(
+                    f"rerun_csv_file = {rerun_csv_file}",
+                    extra=event("artifact", kind="rerun_csv", path=rerun_csv_file),
+                )
+
+            if table.perf_counters():
+                perf_csv_file = output_dir / f"{job_id}.perf.csv"
+                table.perf_counters_to_csv(perf_csv_file)
+                logger.info(
+                    f"perf_csv_file = {perf_csv_file}",
+                    extra=event("artifact", kind="perf_csv", path=perf_csv_file),
+                )
+
+            if table.order():
+                order_csv_file = output_dir / f"{job_id}.order.csv"
+                table.order_to_csv(order_csv_file)
+                logger.info(
+                    f"order_csv_file = {order_csv_file}",
+                    extra=event("artifact", kind="order_csv", path=order_csv_file),
+                )
+
+            resources_csv_file: Optional[Path] = None
+
+            if table.timelines():
+                resources_csv_file = output_dir / f"{job_id}.resources.csv"
+                table.timelines_to_csv(resources_csv_file)
+                logger.info(
+                    f"resources_csv_file = {resources_csv_file}",
+                    extra=event(
+                        "artifact", kind="resources_csv", path=resources_csv_file
+                    ),
+                )
+
+            # Generate plots.
+
+            plot_output_dir = output_csv_file.with_suffix(".figures")
+
+            if plot_suffixes:
+                with timed(logger, "phase", phase="make_plots"):
+                    for suffix in plot_suffixes:
+                        plot.make_plots(
+                            output_csv_file,
+                            plot_output_dir,
+                            "." + suffix,
+                            title=plot_title,
+                        )
+                        if resources_csv_file is not None:
+                            plot.make_memory_plot(
+                                resources_csv_file,
+                                plot_output_dir / f"memory.{suffix}",
+                                title=plot_title,
+                            )
+
+                logger.info(
+                    f"figures are in {plot_output_dir}",
+                    extra=event("artifact", kind="figures", path=plot_output_dir),
+                )
+
+    if profiler is not None:
+        set_active_profiler(None)
+        profile_dir = output_dir / f"{job_id}.profile"
+        profiler.write(profile_dir)
+        for pp in profiler.summary():
+            logger.info(
+                f"{pp.phase}: {pp.time:.3f} sec in {pp.calls} call(s)"
+                f" (peak memory: {bytes2human(pp.peak_memory)}B)",
+                extra=event("profile", **pp._asdict()),
+            )
+        logger.info(
+            f"profiles are in {profile_dir}",
+            extra=event("artifact", kind="profile", path=profile_dir),
         )
+
+    if trace_handler is not None:
+        logger.removeHandler(trace_handler)
+        trace_handler.close()  # writes the trace file
+        logger.info(f"trace_file = {opts.trace}")
@@ -0,0 +1,237 @@
+"""Monitoring of the environment during solver runs.
+
+Timings on shared hosts are disturbed by other processes, frequency scaling and,
+on virtual machines, the time stolen by the hypervisor. `EnvironmentMonitor`
+samples the system load, the CPU frequency and the steal time in a background
+thread while a solver runs, so that results measured in a noisy environment can
+be identified.
+
+The load is the CPU time used by other processes over each sampling interval,
+per logical CPU, i.e., the CPU time of this process and its descendants (the
+solver and its threads) is excluded, and it does not lag behind like the load
+average.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+import psutil
+
+from .util import ProgressCounter
+
+LOAD_THRESHOLD = 0.5  # CPU use of other processes per logical CPU regarded as high
+STEAL_THRESHOLD = 5.0  # percentage of steal time regarded as high
+
+
+def is_noisy(load: float, steal_percent: Optional[float]) -> bool:
+    """Return `True` if the load or the steal time is high.
+
+    >>> is_noisy(0.2, 0.0)
+    False
+    >>> is_noisy(0.8, None)
+    True
+    >>> is_noisy(0.2, 10.0)
+    True
+    """
+    return load > LOAD_THRESHOLD or (steal_percent or 0.0) > STEAL_THRESHOLD
+
+
+class EnvironmentSample(NamedTuple):
+    """Sample of the environment."""
+
+    time: float  # in seconds since the start of monitoring
+    load: float  # CPU use of other processes per logical CPU since the previous one
+    cpu_freq: Optional[float]  # current CPU frequency in MHz
+    steal_percent: Optional[float]  # since the previous sample
+    results: Optional[int]  # rows written into the progress file so far
+
+
+class Environment(NamedTuple):
+    """Summary of the environment during a solver run."""
+
+    load: float  # maximum CPU use of other processes per logical CPU
+    cpu_freq: Optional[float]  # mean CPU frequency in MHz
+    cpu_freq_min: Optional[float]  # minimum CPU frequency in MHz
+    steal_percent: Optional[float]  # percentage of steal time over the run
+
+    @property
+    def noisy(self) -> bool:
+        """Return `True` if the run was under high load or with high steal time."""
+        return is_noisy(self.load, self.steal_percent)
+
+
+def combine_environments(environments: Sequence[Environment]) -> Environment:
+    """Return the summary of the environment over several runs.
+
+    The CPU frequency and the steal time are averaged over the runs.
+
+    >>> combine_environments(
+    ...     [Environment(0.2, 2000.0, 1800.0, 1.0), Environment(0.8, None, None, 3.0)]
+    ... )
+    Environment(load=0.8, cpu_freq=2000.0, cpu_freq_min=1800.0, steal_percent=2.0)
+    """
+    freqs = [e.cpu_freq for e in environments if e.cpu_freq is not None]
+    freq_mins = [e.cpu_freq_min for e in environments if e.cpu_freq_min is not None]
+    steals = [e.steal_percent for e in environments if e.steal_percent is not None]
+    return Environment(
+        max(e.load for e in environments),
+        sum(freqs) / len(freqs) if freqs else None,
+        min(freq_mins) if freq_mins else None,
+        sum(steals) / len(steals) if steals else None,
+    )
+
+
+def _cpu_freq() -> Optional[float]:
+    try:
+        freq = psutil.cpu_freq()
+    except (NotImplementedError, OSError):
+        return None
+    if freq is None or not freq.current > 0:
+        return None
+    return float(freq.current)
+
+
+def _busy(cpu_times: Any) -> float:
+    # Return the busy time in `cpu_times()`. The guest time is included in the
+    # user time on Linux.
+    idle = sum(
+        getattr(cpu_times, f, 0.0)
+        for f in ("idle", "iowait", "steal", "guest", "guest_nice")
+    )
+    return float(sum(cpu_times) - idle)
+
+
+def _total(cpu_times: Any) -> float:
+    # Return the total time in `cpu_times()`.
+    guest = sum(getattr(cpu_times, f, 0.0) for f in ("guest", "guest_nice"))
+    return float(sum(cpu_times) - guest)
+
+
+def _own_cpu_time() -> float:
+    # Return the CPU time of this process and its descendants. The descendants
+    # that have ended are counted in the children times of their parents.
+    total = 0.0
+    this = psutil.Process()
+    for p in [this, *this.children(recursive=True)]:
+        try:
+            t = p.cpu_times()
+        except psutil.Error:
+            continue  # ended
+        total += t.user + t.system + t.children_user + t.children_system
+    return total
+
+
+def _load(prev: Any, curr: Any, prev_own: float, curr_own: float) -> float:
+    # Return the CPU use of other processes per logical CPU between two
+    # `cpu_times()`, given the CPU time of this process tree at them. The times
+    # are counted in clock ticks (usually 10 ms), so too short intervals tell
+    # nothing.
+    total = _total(curr) - _total(prev)
+    if not total >= 0.1:
+        return 0.0
+    others = _busy(curr) - _busy(prev) - (curr_own - prev_own)
+    return min(max(others / total, 0.0), 1.0)
+
+
+def _steal(prev: Any, curr: Any) -> Optional[float]:
+    # Return the percentage of the steal time between two `cpu_times()`.
+    if not hasattr(curr, "steal"):
+        return None
+    total = sum(curr) - sum(prev)
+    if not total > 0:
+        return None
+    return float(max(curr.steal - prev.steal, 0.0) / total * 100)
+
+
+class EnvironmentMonitor:
+    """Sample the system load, CPU frequency and steal time while in the context.
+
+    If `progress_file` is given, the number of rows written into it so far is also
+    recorded, which tells which problem was being solved at each sample.
+    """
+
+    def __init__(
+        self, interval: float = 0.5, *, progress_file: Optional[Path] = None
+    ) -> None:
+        """Construct a monitor."""
+        self._interval = interval
+        self._progress = ProgressCounter(progress_file) if progress_file else None
+        self._samples: List[EnvironmentSample] = []
+        self._start = 0.0
+        self._first_cpu_times: Any = None
+        self._last_cpu_times: Any = None
+        self._last_own = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self) -> "EnvironmentMonitor":
+        """Start monitoring."""
+        self._start = time.time()
+        self._first_cpu_times = self._last_cpu_times = psutil.cpu_times()
+        self._last_own = _own_cpu_time()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop monitoring."""
+        self._stop.set()
+        self._thread.join()
+        self._record()  # the final state
+
+    @property
+    def samples(self) -> Sequence[EnvironmentSample]:
+        """Return the samples."""
+        return tuple(self._samples)
+
+    def summary(self) -> Optional[Environment]:
+        """Return the summary of the samples (`None` if not sampled)."""
+        samples = self._samples
+        if not samples:
+            return None
+        freqs = [s.cpu_freq for s in samples if s.cpu_freq is not None]
+        return Environment(
+            max(s.load for s in samples),
+            sum(freqs) / len(freqs) if freqs else None,
+            min(freqs) if freqs else None,
+            _steal(self._first_cpu_times, self._last_cpu_times),
+        )
+
+    def noisy_problems(self, n_problems: int) -> Sequence[int]:
+        """Return the indices of the problems solved in a noisy environment.
+
+        The problem being solved at each sample is inferred from the number of
+        rows in the progress file. If the progress is not observed (e.g., the
+        driver writes all the results at the end), a noisy sample makes all the
+        problems noisy.
+        """
+        noisy = [s for s in self._samples if is_noisy(s.load, s.steal_percent)]
+        if not noisy:
+            return ()
+        if not any(0 < (s.results or 0) < n_problems for s in self._samples):
+            return tuple(range(n_problems))
+        return tuple(
+            sorted({s.results or 0 for s in noisy if (s.results or 0) < n_problems})
+        )
+
+    def _sample(self) -> None:
+        while True:
+            self._record()
+            if self._stop.wait(self._interval):
+                break
+
+    def _record(self) -> None:
+        own = _own_cpu_time()
+        cpu_times = psutil.cpu_times()
+        self._samples.append(
+            EnvironmentSample(
+                time.time() - self._start,
+                _load(self._last_cpu_times, cpu_times, self._last_own, own),
+                _cpu_freq(),
+                _steal(self._last_cpu_times, cpu_times),
+                self._progress.count() if self._progress else None,
+            )
+        )
+        self._last_cpu_times = cpu_times
+        self._last_own = own
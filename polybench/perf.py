@@ -0,0 +1,114 @@
+"""Hardware performance counters of solver processes via ``perf stat``.
+
+Each process run by a solver is wrapped with ``perf stat``, which counts the
+events of the process and its descendants from the start to the end, including
+the startup of the program and the warm-ups.
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Sequence
+
+PERF_EVENTS = ("instructions", "cycles", "cache-misses", "branch-misses")
+
+
+class PerfCounters(NamedTuple):
+    """Counts of the hardware events (`None` if not counted)."""
+
+    instructions: Optional[int] = None
+    cycles: Optional[int] = None
+    cache_misses: Optional[int] = None
+    branch_misses: Optional[int] = None
+
+    @property
+    def ipc(self) -> Optional[float]:
+        """Return the instructions per cycle."""
+        if self.instructions is None or not self.cycles:
+            return None
+        return self.instructions / self.cycles
+
+
+def add_counters(a: PerfCounters, b: PerfCounters) -> PerfCounters:
+    """Return the sum of the counts.
+
+    >>> add_counters(PerfCounters(1, 2, None, None), PerfCounters(3, None, None, 4))
+    PerfCounters(instructions=4, cycles=2, cache_misses=None, branch_misses=4)
+    """
+    return PerfCounters(
+        *(
+            None if x is None and y is None else (x or 0) + (y or 0)
+            for x, y in zip(a, b)
+        )
+    )
+
+
+def perf_command(output_file: Path) -> Sequence[str]:
+    """Return the command prefix to count the events into the given file."""
+    return (
+        "perf",
+        "stat",
+        "-x",
+        ",",
+        "-e",
+        ",".join(PERF_EVENTS),
+        "-o",
+        str(output_file),
+        "--",
+    )
+
+
+def parse_perf_stat(text: str) -> PerfCounters:
+    r"""Parse the output of ``perf stat -x ,``.
+
+    Events with modifiers (``cycles:u``) or of each type of cores on hybrid CPUs
+    (``cpu_core/cycles/``) are summed up.
+
+    >>> parse_perf_stat(
+    ...     "# started on Mon Oct 19 12:00:00 2026\n"
+    ...     "\n"
+    ...     "1000,,instructions:u,500,100.00,2.00,insn per cycle\n"
+    ...     "300,,cpu_core/cycles/,500,100.00,,\n"
+    ...     "200,,cpu_atom/cycles/,500,100.00,,\n"
+    ...     "<not supported>,,cache-misses,0,100.00,,\n"
+    ...     "7,,branch-misses,500,100.00,,\n"
+    ... )
+    PerfCounters(instructions=1000, cycles=500, cache_misses=None, branch_misses=7)
+    """
+    counts: Dict[str, int] = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        fields = line.split(",")
+        if len(fields) < 3:
+            continue
+        value, _, name = fields[:3]
+        if "/" in name:
+            name = name.split("/")[1]
+        name = name.split(":")[0]
+        try:
+            counts[name] = counts.get(name, 0) + int(value)
+        except ValueError:
+            pass  # <not counted> or <not supported>
+    return PerfCounters(*(counts.get(e) for e in PERF_EVENTS))
+
+
+def perf_error() -> Optional[str]:
+    """Return the reason why ``perf stat`` is unavailable, or `None` if available."""
+    perf = shutil.which("perf")
+    if perf is None:
+        return "perf not found"
+    try:
+        p = subprocess.run(  # noqa: S603
+            [perf, "stat", "-x", ",", "-e", ",".join(PERF_EVENTS), "--", "true"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return str(e)
+    if p.returncode != 0:
+        lines = p.stderr.strip().splitlines()
+        return f"perf stat failed: {lines[0] if lines else p.returncode}"
+    return None
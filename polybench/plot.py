@@ -2,7 +2,7 @@
 
 import itertools
 from pathlib import Path
-from typing import Dict, Optional, Sequence, Union
+from typing import Dict, Optional, Sequence, Union, cast
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -21,12 +21,19 @@ def write_csv(
     data.update(
         {"problem_number": list(range(problems.n_warmups + 1, len(problems) + 1))}
     )
-    data.update(
-        {
-            name: [r.time for r in res[problems.n_warmups :]]
-            for name, res in results.items()
-        }
-    )
+    for name, res in results.items():
+        res = res[problems.n_warmups :]
+        data[name] = [r.time for r in res]
+        # The times for parsing and output, if reported for all the problems.
+        if all(r.parse_time is not None and r.output_time is not None for r in res):
+            data[f"{name}:parse"] = [cast(float, r.parse_time) for r in res]
+            data[f"{name}:output"] = [cast(float, r.output_time) for r in res]
+        # The CPU times, if reported for all the problems.
+        if all(r.cpu_time is not None for r in res):
+            data[f"{name}:cpu"] = [cast(float, r.cpu_time) for r in res]
+        # The errors of the scores in the harness mode.
+        if all(r.error is not None for r in res):
+            data[f"{name}:error"] = [cast(float, r.error) for r in res]
     df = pd.DataFrame(data)
 
     df.to_csv(csv_file, index=False)
@@ -47,13 +54,18 @@ def make_plots(
     """Create comparison plots from the given CSV file."""
     df = pd.read_csv(csv_file)
 
-    names = [s for s in df.columns if s != "problem_number"]
+    # Columns other than the computation times are "<name>:parse" etc.
+    names = [s for s in df.columns if s != "problem_number" and ":" not in s]
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
     output_file = output_dir / f"summary{suffix}"
     make_summary_plot(df, names, output_file, title=title)
 
+    if any(f"{name}:parse" in df.columns for name in names):
+        output_file = output_dir / f"breakdown{suffix}"
+        make_breakdown_plot(df, names, output_file, title=title)
+
     for x, y in itertools.combinations(names, 2):
         output_file = output_dir / f"{x}_vs_{y}{suffix}"
         make_comparison_plot(df, x, y, output_file, title=title)
@@ -99,6 +111,43 @@ def make_summary_plot(
     plt.close()
 
 
+def make_breakdown_plot(
+    df: DataFrame,
+    names: Sequence[str],
+    output_file: Path,
+    *,
+    title: Optional[str] = None,
+) -> None:
+    """Create a stacked bar plot of the mean parse, compute and output times."""
+    x = np.arange(len(names))
+    bottom = np.zeros(len(names))
+
+    fig, ax = plt.subplots()
+
+    for column, label in (("", "compute"), (":parse", "parse"), (":output", "output")):
+        heights = np.array(
+            [
+                df[name + column].mean() if name + column in df.columns else 0
+                for name in names
+            ]
+        )
+        ax.bar(x, heights, bottom=bottom, label=label)
+        bottom += heights
+
+    if title:
+        ax.set_title(title, fontsize=10)
+
+    ax.set_xticks(x)
+    ax.set_xticklabels(names, rotation=45)
+    ax.set_ylabel("Mean elapsed time (s)")
+    ax.yaxis.grid()
+    ax.legend()
+
+    fig.tight_layout()
+    fig.savefig(output_file)
+    plt.close()
+
+
 def make_comparison_plot(
     df: DataFrame,
     x_name: str,
@@ -139,3 +188,40 @@ def make_comparison_plot(
     fig.tight_layout()
     fig.savefig(output_file)
     plt.close()
+
+
+def make_memory_plot(
+    csv_file: Path,
+    output_file: Path,
+    *,
+    title: Optional[str] = None,
+) -> None:
+    """Create a plot of the memory usage over time from the given timeline CSV file.
+
+    The points where the solvers wrote results are marked, to show the problems
+    during which the memory grows.
+    """
+    df = pd.read_csv(csv_file)
+
+    fig, ax = plt.subplots()
+
+    for name, g in df.groupby("solver", sort=False):
+        t = g["time"]
+        rss = g["rss"] / 2**20
+        (line,) = ax.plot(t, rss, label=name)
+        results = g["results"]
+        if results.notna().any():
+            marks = results.fillna(0).diff().fillna(results.fillna(0)) > 0
+            ax.plot(t[marks], rss[marks], ".", color=line.get_color())
+
+    if title:
+        ax.set_title(title, fontsize=10)
+
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel("Resident set size (MiB)")
+    ax.grid()
+    ax.legend()
+
+    fig.tight_layout()
+    fig.savefig(output_file)
+    plt.close()
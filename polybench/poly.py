@@ -1,37 +1,135 @@
 """Capsulize polynomial operations."""
 
-from typing import Union
+import re
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
 
 import symengine
 
+# A monomial as a sorted tuple of (variable, exponent) pairs.
+_Monomial = Tuple[Tuple[str, int], ...]
+
+_FACTOR_PATTERN = re.compile(r"(?:(\d+)|([A-Za-z_]\w*)(?:\^(\d+))?)\Z")
+
+
+def _parse_expanded(expr: str) -> Dict[_Monomial, int]:
+    """Parse a sum of monomials into the mapping from monomials to coefficients."""
+    s = "".join(expr.split())  # removes whitespace
+    if not s:
+        raise ValueError(f"not a sum of monomials: {expr!r}")
+
+    result: Dict[_Monomial, int] = {}
+
+    for term in re.split(r"(?=[+-])", s):
+        if not term:
+            continue
+        coeff = 1
+        if term[0] in "+-":
+            if term[0] == "-":
+                coeff = -1
+            term = term[1:]
+        powers: Dict[str, int] = {}
+        for factor in term.split("*"):
+            m = _FACTOR_PATTERN.match(factor)
+            if not m:
+                raise ValueError(f"not a sum of monomials: {expr!r}")
+            number, x, n = m.groups()
+            if number is not None:
+                coeff *= int(number)
+            else:
+                powers[x] = powers.get(x, 0) + (int(n) if n is not None else 1)
+        monomial = tuple(sorted((x, n) for x, n in powers.items() if n != 0))
+        c = result.get(monomial, 0) + coeff
+        if c == 0:
+            result.pop(monomial, None)
+        else:
+            result[monomial] = c
+
+    return result
+
 
 class Polynomial:
     """Polynomial wrapper class."""
 
-    __slots__ = ("_raw",)
+    __slots__ = ("_raw_value", "_terms")
 
     def __init__(self, expr: Union[str, int, "Polynomial"] = 0) -> None:
         """Construct a polynomial."""
+        self._terms: Optional[Dict[_Monomial, int]] = None
         if isinstance(expr, str):
             p = symengine.sympify(expr)
-            self._raw = symengine.expand(p)
+            self._raw_value = symengine.expand(p)
         elif isinstance(expr, int):
-            self._raw = symengine.sympify(expr)
+            self._raw_value = symengine.sympify(expr)
         elif isinstance(expr, Polynomial):
-            self._raw = expr._raw
+            self._raw_value = expr._raw_value
+            self._terms = expr._terms
         else:
             raise ValueError(f"unexpected expr: {expr}")
 
+    @classmethod
+    def from_expanded(cls, expr: str) -> "Polynomial":
+        """Construct a polynomial from a sum of monomials, e.g., ``3*x^2*y-5``.
+
+        This only splits the string into terms, which is much faster than
+        the constructor for large polynomials; the conversion into the symbolic
+        form is deferred until needed. Counting terms (`len`) and `fingerprint` do
+        not need the conversion. Raise `ValueError` if the string is not a sum of
+        monomials with integer coefficients.
+        """
+        result = super().__new__(cls)
+        result._terms = _parse_expanded(expr)
+        result._raw_value = None
+        return result
+
+    @classmethod
+    def _from_raw(cls, raw: Any) -> "Polynomial":
+        result = super().__new__(cls)
+        result._raw_value = raw
+        result._terms = None
+        return result
+
+    @classmethod
+    def _from_terms(cls, terms: Dict[_Monomial, int]) -> "Polynomial":
+        result = super().__new__(cls)
+        result._terms = terms
+        result._raw_value = None
+        return result
+
+    @property
+    def _raw(self) -> Any:
+        # The symbolic form, converted from the terms if deferred.
+        if self._raw_value is None:
+            assert self._terms is not None  # noqa: S101
+            self._raw_value = symengine.expand(
+                symengine.sympify(self._terms_to_str(self._terms))
+            )
+        return self._raw_value
+
+    @staticmethod
+    def _terms_to_str(terms: Dict[_Monomial, int]) -> str:
+        if not terms:
+            return "0"
+        s = ""
+        for monomial, coeff in terms.items():
+            s += f"+{coeff}" if coeff > 0 else f"{coeff}"
+            for x, n in monomial:
+                s += f"*{x}" if n == 1 else f"*{x}^{n}"
+        return s
+
     def __str__(self) -> str:
         """Return the string representation."""
         return str(self._raw).replace(" ", "").replace("**", "^")
 
     def __bool__(self) -> bool:
         """Return ``bool(self)``."""
+        if self._terms is not None:
+            return bool(self._terms)
         return not self._raw.is_zero
 
     def __len__(self) -> int:
         """Return the number of terms in the polynomial."""
+        if self._terms is not None:
+            return len(self._terms)
         raw = self._raw
         if raw.is_Add:
             return len(raw.args)
@@ -54,27 +152,19 @@ class Polynomial:
 
     def __neg__(self) -> "Polynomial":
         """Return ``- self``."""
-        result = super().__new__(Polynomial)
-        result._raw = symengine.expand(-self._raw)
-        return result
+        return self._from_raw(symengine.expand(-self._raw))
 
     def __add__(self, other: "Polynomial") -> "Polynomial":
         """Return ``self + other``."""
-        result = super().__new__(Polynomial)
-        result._raw = symengine.expand(self._raw + other._raw)
-        return result
+        return self._from_raw(symengine.expand(self._raw + other._raw))
 
     def __sub__(self, other: "Polynomial") -> "Polynomial":
         """Return ``self - other``."""
-        result = super().__new__(Polynomial)
-        result._raw = symengine.expand(self._raw - other._raw)
-        return result
+        return self._from_raw(symengine.expand(self._raw - other._raw))
 
     def __mul__(self, other: "Polynomial") -> "Polynomial":
         """Return ``self * other``."""
-        result = super().__new__(Polynomial)
-        result._raw = symengine.expand(self._raw * other._raw)
-        return result
+        return self._from_raw(symengine.expand(self._raw * other._raw))
 
     def equals_without_unit(self, other: "Polynomial") -> bool:
         """Return `True` if ``self == other`` up to a unit."""
@@ -84,3 +174,90 @@ class Polynomial:
     def is_unit(self) -> bool:
         """True if the polynomial is 1 or -1."""
         return len(self) == 1 and (self == 1 or self == -1)
+
+    @property
+    def is_constant(self) -> bool:
+        """True if the polynomial has no variables."""
+        if self._terms is not None:
+            return all(not monomial for monomial in self._terms)
+        return bool(self._raw.is_Number)
+
+    @property
+    def max_exponent(self) -> int:
+        """The largest exponent of any variable in the polynomial (0 if constant)."""
+        return max((n for monomial in self._to_terms() for _, n in monomial), default=0)
+
+    def _to_terms(self) -> Dict[_Monomial, int]:
+        # The mapping from monomials to coefficients.
+        if self._terms is not None:
+            return self._terms
+        result: Dict[_Monomial, int] = {}
+        for monomial, coeff in self._raw.as_coefficients_dict().items():
+            c = int(coeff)
+            if monomial.is_Number:
+                c *= int(monomial)
+                m: _Monomial = ()
+            else:
+                m = tuple(
+                    sorted(
+                        (str(x), int(n)) for x, n in monomial.as_powers_dict().items()
+                    )
+                )
+            if c != 0:
+                result[m] = c
+        return result
+
+    def to_dict(self, variables: Sequence[str]) -> Dict[Tuple[int, ...], int]:
+        """Return the mapping from exponent vectors to coefficients.
+
+        The exponent vectors are given with respect to `variables`, which must
+        include all the variables appearing in the polynomial.
+        """
+        index = {x: i for i, x in enumerate(variables)}
+        result = {}
+        for monomial, c in self._to_terms().items():
+            exponents = [0] * len(variables)
+            for x, n in monomial:
+                exponents[index[x]] = n
+            result[tuple(exponents)] = c
+        return result
+
+    def reduce_mod(self, modulus: int) -> "Polynomial":
+        """Return the polynomial with the coefficients reduced into ``[0, modulus)``."""
+        terms = {}
+        for monomial, c in self._to_terms().items():
+            c %= modulus
+            if c != 0:
+                terms[monomial] = c
+        return self._from_terms(terms)
+
+    def monic_mod(self, modulus: int) -> "Polynomial":
+        """Return the normalized polynomial modulo a prime `modulus`.
+
+        The coefficients are reduced and then multiplied by a constant such that
+        the coefficient of a fixed (though arbitrary) term becomes 1. Polynomials
+        that are equal up to a unit modulo `modulus` have the same normal form.
+        """
+        terms = self.reduce_mod(modulus)._to_terms()
+        if not terms:
+            return self._from_terms(terms)
+        inverse = pow(terms[max(terms)], modulus - 2, modulus)
+        return self._from_terms({m: c * inverse % modulus for m, c in terms.items()})
+
+    def fingerprint(
+        self, variables: Sequence[str], point: Sequence[int], modulus: int
+    ) -> int:
+        """Return the value at the given point modulo `modulus`.
+
+        The values in `point` are given for `variables`, which must include all
+        the variables appearing in the polynomial. This is cheap compared to
+        multiplying polynomials, so it can be used for checking products.
+        """
+        result = 0
+        for exponents, coeff in self.to_dict(variables).items():
+            term = coeff % modulus
+            for x, n in zip(point, exponents):
+                if n:
+                    term = term * pow(x, n, modulus) % modulus
+            result = (result + term) % modulus
+        return result
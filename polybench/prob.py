@@ -1,10 +1,11 @@
 """Problems for benchmarking."""
 
+import copy
 import functools
 import itertools
 import math
 import random
-from typing import Any, Iterator, Sequence
+from typing import Any, Iterator, Optional, Sequence, cast
 
 from typing_extensions import Literal
 
@@ -17,6 +18,33 @@ def variables(n_vars: int) -> Sequence[str]:
     return tuple(f"x{i + 1}" for i in range(n_vars))
 
 
+def is_prime(n: int) -> bool:
+    """Return `True` if `n` is a prime number (deterministic for ``n < 3.3e24``)."""
+    if n < 2:
+        return False
+    small_primes = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+    for a in small_primes:
+        if n % a == 0:
+            return n == a
+    # Miller-Rabin test with the small primes as the bases.
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in small_primes:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
 ExponentsDistribution = Literal["uniform", "sharp"]
 
 
@@ -37,8 +65,13 @@ def random_polynomial(
     max_degree: int,
     min_coeff: int,
     max_coeff: int,
+    rng: Optional[random.Random] = None,
 ) -> Polynomial:
-    """Return a random polynomial."""
+    """Return a random polynomial.
+
+    The random numbers are drawn from `rng` if given, otherwise from the global
+    generator of the `random` module.
+    """
     coeff_max_trial = 10
     poly_max_trial = 100
 
@@ -73,6 +106,9 @@ def random_polynomial(
     if min_coeff > max_coeff:
         raise ValueError(f"min_coeff ({min_coeff}) must be <= max_coeff ({max_coeff})")
 
+    if rng is None:
+        rng = cast(random.Random, random)
+
     xx = variables(n_vars)
     indices = tuple(range(n_vars))
     cum_weights = None
@@ -85,7 +121,7 @@ def random_polynomial(
             a = max(min_degree, 0.1)  # avoids max_degree / 0
             b = 1 / (n_vars - 1) * math.log(max_degree / a)
             weight = [a * math.exp(b * i) for i in range(n_vars)]
-            random.shuffle(weight)
+            rng.shuffle(weight)
             cum_weights = tuple(itertools.accumulate(weight))
     else:
         raise ValueError(f"unknown exp_dist: {exp_dist}")
@@ -93,7 +129,7 @@ def random_polynomial(
     def random_coeff() -> int:
         """Return a coefficient randomly."""
         for _ in range(coeff_max_trial):
-            n = random.randint(min_coeff, max_coeff)
+            n = rng.randint(min_coeff, max_coeff)
             if n != 0:
                 return n
         return 1
@@ -106,8 +142,8 @@ def random_polynomial(
         else:
             result = f"+{c}"
 
-        n = random.randint(min_degree, max_degree)
-        exponents = random.choices(indices, cum_weights=cum_weights, k=n)
+        n = rng.randint(min_degree, max_degree)
+        exponents = rng.choices(indices, cum_weights=cum_weights, k=n)
         exponents.sort()
         for i, group in itertools.groupby(exponents):
             x = xx[i]
@@ -118,7 +154,7 @@ def random_polynomial(
 
         return result
 
-    n_terms = random.randint(min_n_terms, max_n_terms)
+    n_terms = rng.randint(min_n_terms, max_n_terms)
 
     for _ in range(poly_max_trial):
         poly_str = "".join(random_monomial() for _ in range(n_terms))
@@ -131,19 +167,105 @@ def random_polynomial(
     raise RuntimeError("failed to generate a random polynomial")
 
 
+def dense_polynomial(
+    *,
+    n_vars: int,
+    min_n_terms: int,
+    max_n_terms: int,
+    max_degree: int,
+    min_coeff: int,
+    max_coeff: int,
+    rng: Optional[random.Random] = None,
+    **kwargs: Any,
+) -> Polynomial:
+    """Return a random dense polynomial.
+
+    The polynomial contains all the monomials up to a total degree, which is
+    the largest one (but at least 1 and at most `max_degree`) such that the number of
+    terms does not exceed a random number between `min_n_terms` and `max_n_terms`.
+    The other keyword arguments for `random_polynomial` are ignored.
+    """
+    if n_vars < 1:
+        raise ValueError(f"n_vars ({n_vars}) must be >= 1")
+
+    if min_n_terms > max_n_terms:
+        raise ValueError(
+            f"min_n_terms ({min_n_terms}) must be <= max_n_terms ({max_n_terms})"
+        )
+
+    if min_coeff > max_coeff:
+        raise ValueError(f"min_coeff ({min_coeff}) must be <= max_coeff ({max_coeff})")
+
+    if rng is None:
+        rng = cast(random.Random, random)
+
+    xx = variables(n_vars)
+
+    n_terms = rng.randint(min_n_terms, max_n_terms)
+
+    def count_terms(degree: int) -> int:
+        """Return the number of monomials up to the given total degree."""
+        # binomial(degree + n_vars, n_vars); math.comb is not in Python 3.6.
+        return math.factorial(degree + n_vars) // (
+            math.factorial(degree) * math.factorial(n_vars)
+        )
+
+    degree = 1
+    while degree < max_degree and count_terms(degree + 1) <= n_terms:
+        degree += 1
+
+    def random_coeff() -> int:
+        """Return a non-zero coefficient randomly."""
+        for _ in range(10):
+            n = rng.randint(min_coeff, max_coeff)
+            if n != 0:
+                return n
+        return 1
+
+    terms = []
+    for d in range(degree + 1):
+        for exponents in itertools.combinations_with_replacement(range(n_vars), d):
+            c = random_coeff()
+            term = f"-{-c}" if c < 0 else f"+{c}"
+            for i, group in itertools.groupby(exponents):
+                p = len(tuple(group))
+                term += f"*{xx[i]}" if p == 1 else f"*{xx[i]}^{p}"
+            terms.append(term)
+
+    return Polynomial("".join(terms))
+
+
 ProblemTypeInput = Literal[
-    "trivial-gcd", "nontrivial-gcd", "trivial-factor", "nontrivial-factor"
+    "trivial-gcd",
+    "nontrivial-gcd",
+    "trivial-factor",
+    "nontrivial-factor",
+    "dense-mul",
+    "sparse-mul",
+    "division",
+    "divisibility",
+    "ratfun",
 ]
 
 
-ProblemType = Literal["gcd", "factor"]
+ProblemType = Literal["gcd", "factor", "mul", "div", "divisible", "ratfun"]
 
 
 # Unfortunately {typing/typing_extensions}.get_args is not available in Python 3.6.
 # Instead, we make a function to extract the members.
 def get_problem_type_input_args() -> Sequence[str]:
     """Return ``typing.get_args(ProblemTypeInput)``."""
-    return ("trivial-gcd", "nontrivial-gcd", "trivial-factor", "nontrivial-factor")
+    return (
+        "trivial-gcd",
+        "nontrivial-gcd",
+        "trivial-factor",
+        "nontrivial-factor",
+        "dense-mul",
+        "sparse-mul",
+        "division",
+        "divisibility",
+        "ratfun",
+    )
 
 
 def problem_type_from_input(type_input: ProblemTypeInput) -> ProblemType:
@@ -152,6 +274,14 @@ def problem_type_from_input(type_input: ProblemTypeInput) -> ProblemType:
         return "gcd"
     if type_input in ("trivial-factor", "nontrivial-factor"):
         return "factor"
+    if type_input in ("dense-mul", "sparse-mul"):
+        return "mul"
+    if type_input == "division":
+        return "div"
+    if type_input == "divisibility":
+        return "divisible"
+    if type_input == "ratfun":
+        return "ratfun"
     raise ValueError(f"type_input: {type_input}")
 
 
@@ -159,17 +289,37 @@ class Problem:
     """Problem.
 
     A problem to be solved, which is:
-    a `gcd` problem to solve ``PolynomialGCD(problem.p, problem.q)`` or
-    a `factor` problem to solve `Factor(problem.p)`.
+    a `gcd` problem to solve ``PolynomialGCD(problem.p, problem.q)``,
+    a `factor` problem to solve `Factor(problem.p)`,
+    a `mul` problem to solve ``Expand(problem.p * problem.q)``,
+    a `div` problem to solve the exact division ``problem.p / problem.q``,
+    a `divisible` problem to test whether `problem.q` divides `problem.p` or
+    a `ratfun` problem to normalize ``problem.p / problem.q + problem.r / problem.s``
+    into the canonical numerator and denominator.
+
+    The expected answers are known for `div` problems (`quotient`) and `divisible`
+    problems (`divisible`) from the construction.
+
+    If `modulus` is given, the coefficients are reduced into ``[0, modulus)`` and
+    the problem is to be solved over the prime field of that order.
     """
 
-    def __init__(self, *, problem_type: ProblemTypeInput, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        *,
+        problem_type: ProblemTypeInput,
+        modulus: Optional[int] = None,
+        **kwargs: Any,
+    ) -> None:
         """Construct a problem."""
 
         def rand_poly() -> Polynomial:
             # We assume that all required parameters are given in `kwargs`.
             return random_polynomial(**kwargs)
 
+        self.quotient: Optional[Polynomial] = None
+        self.divisible: Optional[bool] = None
+
         if problem_type == "trivial-gcd":
             a = rand_poly()
             b = rand_poly()
@@ -192,15 +342,81 @@ class Problem:
             a = rand_poly()
             b = rand_poly()
             self.p = a * b  # factored as a and b
+        elif problem_type == "dense-mul":
+            self.p = dense_polynomial(**kwargs)
+            self.q = dense_polynomial(**kwargs)
+        elif problem_type == "sparse-mul":
+            self.p = rand_poly()
+            self.q = rand_poly()
+        elif problem_type == "division":
+            a = rand_poly()
+            g = rand_poly()
+            self.p = a * g  # the same construction as nontrivial-gcd
+            self.q = g
+            self.quotient = a
+        elif problem_type == "divisibility":
+            rng = cast(random.Random, kwargs.get("rng") or random)
+            a = rand_poly()
+            g = rand_poly()
+            while g.is_constant:
+                # A constant could divide a * g + 1 over the rationals.
+                g = rand_poly()
+            self.divisible = rng.random() < 0.5
+            if self.divisible:
+                self.p = a * g
+            else:
+                self.p = a * g + Polynomial(1)  # not divisible unless g is a unit
+            self.q = g
+        elif problem_type == "ratfun":
+            a = rand_poly()
+            b = rand_poly()
+            c = rand_poly()
+            g = rand_poly()
+            h = rand_poly()
+            self.p = a * c  # c cancels in p/q
+            self.q = g * c
+            self.r = b
+            self.s = g * h  # g is common in the denominators
+            # The result is expected to be (a * h + b) / (g * h).
 
         self.problem_type = problem_type_from_input(problem_type)
 
+        if modulus is not None:
+            self.p = self.p.reduce_mod(modulus)
+            if hasattr(self, "q"):
+                self.q = self.q.reduce_mod(modulus)
+
+    @property
+    def degree_bound(self) -> int:
+        """Return an upper bound on the exponent of each variable.
+
+        The bound covers the input polynomials and the expected answer, so drivers
+        can use it to choose the width of packed exponents.
+        """
+        if self.problem_type == "mul":
+            return self.p.max_exponent + self.q.max_exponent
+        if self.problem_type == "ratfun":
+            # Bounds for the cross products p * s, r * q and q * s.
+            p, q, r, s = (a.max_exponent for a in (self.p, self.q, self.r, self.s))
+            return max(p + s, r + q, q + s)
+        if self.problem_type == "factor":
+            return self.p.max_exponent
+        return max(self.p.max_exponent, self.q.max_exponent)
+
     def __str__(self) -> str:
         """Return the string representation."""
         if self.problem_type == "gcd":
             return f"gcd({self.p},{self.q})"
         if self.problem_type == "factor":
             return f"factor({self.p})"
+        if self.problem_type == "mul":
+            return f"mul({self.p},{self.q})"
+        if self.problem_type == "div":
+            return f"div({self.p},{self.q})"
+        if self.problem_type == "divisible":
+            return f"divisible({self.p},{self.q})"
+        if self.problem_type == "ratfun":
+            return f"ratfun({self.p},{self.q},{self.r},{self.s})"
         return repr(self)
 
 
@@ -214,25 +430,54 @@ class ProblemSet:
         n_warmups: int,
         n_problems: int,
         seed: int,
+        modulus: Optional[int] = None,
+        adaptive_warmups: bool = False,
         **kwargs: Any,
     ):
-        """Construct a set of problems."""
+        """Construct a set of problems.
+
+        If `modulus` is given, which must be a prime number, the problems are over
+        the prime field of that order (only for `gcd` and `factor` problems).
+
+        If `adaptive_warmups` is true, the warm-up problems are copies of the first
+        one, which serve as calibration runs to detect when the timings of each
+        solver become steady. The other problems are the same as without it.
+        """
         assert "n_vars" in kwargs  # noqa: S101  # We assume this.
         n_vars = int(kwargs["n_vars"])
 
         self._problem_type = problem_type_from_input(problem_type)
+
+        if modulus is not None:
+            if self._problem_type not in ("gcd", "factor"):
+                raise ValueError(
+                    f"modulus is not supported for {self._problem_type} problems"
+                )
+            if not 2 <= modulus < 2**63:
+                raise ValueError(f"modulus ({modulus}) must be in [2, 2^63)")
+            if not is_prime(modulus):
+                raise ValueError(f"modulus ({modulus}) must be a prime number")
+
+        self._modulus = modulus
         self._n_vars = n_vars
         self._n_warmups = n_warmups
         self._n_problems = n_problems
+        self._adaptive_warmups = adaptive_warmups
         self._seed = seed
+        self._degree_bound: Optional[int] = None
 
-        random.seed(seed)  # Fix the seed here for reproducibility.
+        # Fix the seed here for reproducibility. We use our own generator so as not
+        # to disturb the global state of the `random` module.
+        rng = random.Random(seed)
 
         self._problems = [
-            Problem(problem_type=problem_type, **kwargs)
+            Problem(problem_type=problem_type, modulus=modulus, rng=rng, **kwargs)
             for _ in range(n_warmups + n_problems)
         ]
 
+        if adaptive_warmups:
+            self._problems[:n_warmups] = [self._problems[0]] * n_warmups
+
     def __len__(self) -> int:
         """Return the total number of the problems (including warm-ups)."""
         return len(self._problems)
@@ -245,6 +490,34 @@ class ProblemSet:
         """Return a result."""
         return self._problems[i]
 
+    def select(self, i: int) -> "ProblemSet":
+        """Return the set of only the i-th problem, without warm-ups.
+
+        The degree bound is that of the whole set, so that solvers choose the same
+        representation as for the whole set.
+        """
+        result = copy.copy(self)
+        result._problems = [self._problems[i]]
+        result._n_warmups = 0
+        result._n_problems = 1
+        result._adaptive_warmups = False
+        result._degree_bound = self.degree_bound
+        return result
+
+    def subset(self, indices: Sequence[int]) -> "ProblemSet":
+        """Return the set of the warm-ups followed by the problems at the indices.
+
+        The indices are of the whole set, including the warm-ups. The degree bound
+        is that of the whole set, as in `select`.
+        """
+        result = copy.copy(self)
+        result._problems = self._problems[: self._n_warmups] + [
+            self._problems[i] for i in indices
+        ]
+        result._n_problems = len(indices)
+        result._degree_bound = self.degree_bound
+        return result
+
     @property
     def problem_type(self) -> ProblemType:
         """Return the problem type."""
@@ -265,6 +538,11 @@ class ProblemSet:
         """Return the number of warm-ups."""
         return self._n_warmups
 
+    @property
+    def adaptive_warmups(self) -> bool:
+        """Return `True` if the warm-ups are calibration runs of the same problem."""
+        return self._adaptive_warmups
+
     @property
     def n_problems(self) -> int:
         """Return the number of problems."""
@@ -274,3 +552,15 @@ class ProblemSet:
     def seed(self) -> int:
         """Return the random seed."""
         return self._seed
+
+    @property
+    def degree_bound(self) -> int:
+        """Return an upper bound on the exponent of each variable in the problems."""
+        if self._degree_bound is None:
+            self._degree_bound = max((p.degree_bound for p in self), default=0)
+        return self._degree_bound
+
+    @property
+    def modulus(self) -> Optional[int]:
+        """Return the prime modulus, or `None` for problems over the integers."""
+        return self._modulus
@@ -0,0 +1,91 @@
+"""Profiling of the orchestrator phases."""
+
+import contextlib
+import cProfile
+import csv
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional, Sequence
+
+
+class PhaseProfile(NamedTuple):
+    """Summary of the profiled runs of a phase."""
+
+    phase: str
+    calls: int
+    time: float  # total wall-clock time in seconds
+    peak_memory: int  # peak memory allocated by Python in bytes (tracemalloc)
+
+
+class PhaseProfiler:
+    """Profiler running each phase of the orchestrator under cProfile.
+
+    Phases with the same name (e.g., ``parse_csv_log`` for each solver) are
+    accumulated. Phases do not nest: a phase started while another one is being
+    profiled is included in the outer one.
+    """
+
+    def __init__(self) -> None:
+        """Construct a profiler."""
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._summary: Dict[str, PhaseProfile] = {}
+        self._running = False
+
+    @contextlib.contextmanager
+    def profile(self, phase: str) -> Iterator[None]:
+        """Profile the block as the given phase."""
+        if self._running:
+            yield
+            return
+
+        prof = self._profiles.setdefault(phase, cProfile.Profile())
+        self._running = True
+        tracemalloc.start()
+        start = time.perf_counter()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._running = False
+            s = self._summary.get(phase, PhaseProfile(phase, 0, 0.0, 0))
+            self._summary[phase] = PhaseProfile(
+                phase, s.calls + 1, s.time + elapsed, max(s.peak_memory, peak)
+            )
+
+    def summary(self) -> Sequence[PhaseProfile]:
+        """Return the summary of the phases in the order of their first run."""
+        return tuple(self._summary.values())
+
+    def write(self, output_dir: Path) -> None:
+        """Write ``summary.csv`` and ``<phase>.pstats`` files into the directory."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with (output_dir / "summary.csv").open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(PhaseProfile._fields)
+            writer.writerows(self.summary())
+        for phase, prof in self._profiles.items():
+            prof.dump_stats(str(output_dir / f"{phase}.pstats"))
+
+
+_active_profiler: Optional[PhaseProfiler] = None
+
+
+def set_active_profiler(profiler: Optional[PhaseProfiler]) -> None:
+    """Set the profiler used by `profile_phase` (`None` to disable profiling)."""
+    global _active_profiler
+    _active_profiler = profiler
+
+
+@contextlib.contextmanager
+def profile_phase(phase: str) -> Iterator[None]:
+    """Profile the block as the given phase with the active profiler, if any."""
+    if _active_profiler is None:
+        yield
+    else:
+        with _active_profiler.profile(phase):
+            yield
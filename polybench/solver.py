@@ -1,36 +1,181 @@
 """Solver."""
 
-import filecmp
+import contextlib
+import gc
 import hashlib
+import json
+import math
 import os
 import shutil
 import subprocess
+import tempfile
+import time
 import urllib
 import urllib.error
+import urllib.parse
 import urllib.request
 import uuid
+from collections import OrderedDict
+from importlib import import_module
 from logging import Logger
 from pathlib import Path
-from typing import List, NamedTuple, Optional, Sequence, Type, Union
-
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+import importlib_metadata
 import importlib_resources
+from typing_extensions import Literal
 
+from .events import event, log_event, timed
+from .limits import LimitedRun, ResourceLimits
+from .perf import PerfCounters, add_counters, parse_perf_stat, perf_command
 from .poly import Polynomial
-from .prob import ProblemSet
-from .util import pushd
+from .prob import Problem, ProblemSet
+from .util import (
+    ResourceSample,
+    ResourceSampler,
+    kill_descendants,
+    perf_counter_ns,
+    process_time_ns,
+    pushd,
+    user_cache_dir,
+)
 
 
 class Result(NamedTuple):
-    """Result of a problem."""
+    """Result of a problem.
+
+    `time` is the wall-clock time for the computation only. Drivers may also report
+    the times for parsing the input and converting the answer into the output
+    format, and the CPU time for the computation. In the harness mode, `time` is
+    the score of the measurement iterations and `error` is its error (see
+    `score_and_error`).
+    """
 
     time: float  # in seconds
     answer: Sequence[Polynomial]
+    parse_time: Optional[float] = None  # in seconds
+    output_time: Optional[float] = None  # in seconds
+    cpu_time: Optional[float] = None  # in seconds
+    error: Optional[float] = None  # in seconds
+
+
+class HarnessOptions(NamedTuple):
+    """Options for the steady-state harness mode.
+
+    The driver solves each problem `warmups` times without measurement and then
+    `iterations` times with measurement, in each of `forks` separate runs.
+    """
+
+    warmups: int = 5
+    iterations: int = 10
+    forks: int = 2
+
+
+# The 99.95% quantiles of Student's t-distribution for 1, 2 and 3 degrees of
+# freedom, for which the Cornish-Fisher expansion is inaccurate.
+_T_QUANTILES_999 = (636.619, 31.599, 12.924)
+
+
+def _t_quantile_999(dof: int) -> float:
+    # Return the critical value for the two-sided 99.9% confidence interval with
+    # the given degrees of freedom, by the Cornish-Fisher expansion around the
+    # normal quantile for dof >= 4 (accurate within 1.5%).
+    if dof <= len(_T_QUANTILES_999):
+        return _T_QUANTILES_999[dof - 1]
+    z = 3.2905267314919255
+    v = float(dof)
+    return (
+        z
+        + (z**3 + z) / (4 * v)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * v**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * v**3)
+        + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z)
+        / (92160 * v**4)
+    )
+
+
+def score_and_error(samples: Sequence[float]) -> Tuple[float, float]:
+    """Return the score and error of the samples of a measurement, as in JMH.
+
+    The score is the mean, and the error is the half-width of its 99.9% confidence
+    interval from Student's t-distribution, which is NaN for a single sample.
+    """
+    n = len(samples)
+    if n == 0:
+        raise ValueError("no samples")
+    mean = math.fsum(samples) / n
+    if n == 1:
+        return mean, math.nan
+    var = math.fsum((x - mean) ** 2 for x in samples) / (n - 1)
+    return mean, _t_quantile_999(n - 1) * math.sqrt(var / n)
+
+
+# Outcome of solving a set of problems: ``failed`` for crashes and errors.
+Outcome = Literal["ok", "failed", "timeout", "out_of_memory"]
 
 
 class SolverSetupError(RuntimeError):
     """Error raised when solver setup fails."""
 
 
+class DownloadOptions(NamedTuple):
+    """Options for downloading files."""
+
+    # Directory for downloaded files shared among build directories.
+    # If `None`, the user-level cache directory is used.
+    cache_dir: Optional[Path] = None
+    # Local directories or URL prefixes looked up before the original URLs.
+    mirrors: Sequence[str] = ()
+    # If true, files are never downloaded from the original URLs.
+    offline: bool = False
+
+
+def compute_resource_manifest(src_dir: Path) -> Dict[str, str]:
+    """Return the mapping from the files in the given directory to their hashes.
+
+    The file names are relative to `src_dir`, in the POSIX style.
+    """
+    result = {}
+    for p in sorted(src_dir.rglob("*")):
+        if p.is_file() and "__pycache__" not in p.parts:
+            result[p.relative_to(src_dir).as_posix()] = Solver.sha256(p)
+    return result
+
+
+def _is_source_tree() -> bool:
+    # True if the package is used in the source tree (not installed from a wheel or
+    # sdist), where resource files may be edited after the manifests were made.
+    return (Path(__file__).resolve().parent.parent / "pyproject.toml").exists()
+
+
+def get_resource_manifest(src_dir: Path, manifest_file: Path) -> Dict[str, str]:
+    """Return the manifest of the resource files in the given directory.
+
+    The precomputed manifest is used if available, except in the source tree.
+    """
+    if manifest_file.is_file() and not _is_source_tree():
+        try:
+            data = json.loads(manifest_file.read_text())
+            if isinstance(data, dict):
+                return {str(k): str(v) for k, v in data.items()}
+        except ValueError:
+            pass
+    return compute_resource_manifest(src_dir)
+
+
 class Solver:
     """Abstract solver."""
 
@@ -40,6 +185,11 @@ class Solver:
 
     _name = "None"  # Must be a unique name (without spaces).
     _env_var = ""  # Environment variable to be used (optional).
+    _supports_threads = False  # Whether `threads` is taken into account (optional).
+    _supports_throughput = False  # Whether `workers` is taken into account (optional).
+    _supports_modulus = False  # Whether problems over prime fields are supported.
+    _supports_harness = False  # Whether `harness` is taken into account (optional).
+    _progress_file = "output.csv"  # File in `output_dir` for results (optional).
 
     def _prepare(self, problems: ProblemSet) -> Optional[str]:
         # Prepare this solver for the given problems and return the version string
@@ -69,34 +219,219 @@ class Solver:
         output_dir: Path,
         logger: Logger,
         timeout: int,
+        *,
+        debug: Optional[bool] = None,
+        download_options: Optional[DownloadOptions] = None,
+        threads: int = 1,
+        workers: int = 0,
+        harness: Optional[HarnessOptions] = None,
+        limits: Optional[ResourceLimits] = None,
+        sample_interval: Optional[float] = None,
+        perf_counters: bool = False,
     ) -> None:
-        """Construct a solver."""
+        """Construct a solver.
+
+        Solvers running with `threads` > 1 are named like ``FLINT-4t``; they share
+        the build directory with the single-threaded one. Similarly, solvers in the
+        throughput mode, where the problems are solved concurrently by a pool of
+        `workers` (> 0) threads, are named like ``FLINT-4w``. If `harness` is given,
+        the solver runs in the steady-state harness mode (not in the throughput
+        mode), keeping its name. `limits` are applied to the processes run for
+        solving problems (not for the setup) on POSIX systems. If `sample_interval`
+        is given, the resource usage of these processes is sampled at the interval
+        (in seconds) and recorded as `timeline`. If `perf_counters` is true, these
+        processes are run under ``perf stat`` to count the hardware events
+        (see `perf_counters`).
+        """
+        if threads < 1:
+            raise ValueError(f"invalid number of threads: {threads}")
+        if threads > 1 and not self._supports_threads:
+            raise ValueError(f"{self._name} does not support multi-threading")
+        if workers < 0:
+            raise ValueError(f"invalid number of workers: {workers}")
+        if workers > 0 and not self._supports_throughput:
+            raise ValueError(f"{self._name} does not support the throughput mode")
+        if harness is not None:
+            if not self._supports_harness:
+                raise ValueError(f"{self._name} does not support the harness mode")
+            if workers > 0:
+                raise ValueError("harness mode not available in the throughput mode")
+            if harness.warmups < 0 or harness.iterations < 1 or harness.forks < 1:
+                raise ValueError(f"invalid harness options: {tuple(harness)}")
+        self._threads = threads
+        self._workers = workers
+        self._harness = harness
+        self._limits = limits if os.name == "posix" else None
+        if sample_interval is not None and not sample_interval > 0:
+            raise ValueError(f"invalid sample interval: {sample_interval}")
+        self._sample_interval = sample_interval
+        self._timeline: List[ResourceSample] = []  # set by solve()
+        self._perf_counters = perf_counters
+        self._perf: Optional[PerfCounters] = None  # set by solve()
+        self._solve_start = 0.0  # set by solve()
+        self._wall_time: Optional[float] = None  # set by solve() in throughput mode
+        self._peak_memory: Optional[int] = None  # set by solve()
+        self._clocks: Dict[str, str] = {}  # set by solve()
+        self._outcome: Outcome = "ok"  # set by solve()
+        self._solving = False
         self._job_id = job_id
-        self._build_dir = build_dir / self.name.lower()
+        self._build_dir = build_dir / self._name.lower()
         self._output_dir = output_dir / f"{job_id}.{self.name.lower()}"
         self._logger = logger.getChild(self.name)
         self._timeout = timeout
+        if debug is not None:
+            self.debug = debug  # overrides the class default
+        self._download_options = download_options or DownloadOptions()
 
         self._problem_file = Path("undefined")  # set later
+        self._version: Optional[str] = None  # set by prepare()
 
     def prepare(self, problems: ProblemSet) -> Optional[str]:
         """Prepare for the problems and return the version string if available."""
-        with pushd(self.build_dir):
-            result = self._prepare(problems)
+        if problems.modulus is not None and not self._supports_modulus:
+            result: Optional[str] = None
+        else:
+            with pushd(self.build_dir):
+                result = self._prepare(problems)
         if result:
             result = result.strip()
+        self._version = result
         return result
 
     def solve(self, problems: ProblemSet) -> Optional[Sequence[Result]]:
         """Solve the given set of problems."""
-        with pushd(self.output_dir):
-            return self._solve(problems)
+        self._wall_time = None
+        self._peak_memory = None
+        self._clocks = {}
+        self._outcome = "ok"
+        self._timeline = []
+        self._perf = None
+        self._solve_start = time.time()
+        self._solving = True
+        try:
+            with pushd(self.output_dir):
+                results = self._solve(problems)
+        finally:
+            self._solving = False
+        if results is None and self._outcome == "ok":
+            self._outcome = "failed"
+        return results
 
     @property
     def name(self) -> str:
         """Return the solver name."""
+        name = self._name
+        if self._threads > 1:
+            name += f"-{self._threads}t"
+        if self._workers > 0:
+            name += f"-{self._workers}w"
+        return name
+
+    @property
+    def base_name(self) -> str:
+        """Return the solver name without the number of threads."""
         return self._name
 
+    @property
+    def threads(self) -> int:
+        """Return the number of threads that the solver may use."""
+        return self._threads
+
+    @classmethod
+    def supports_threads(cls) -> bool:
+        """Return `True` if the solver can run with multiple threads."""
+        return cls._supports_threads
+
+    @classmethod
+    def supports_modulus(cls) -> bool:
+        """Return `True` if the solver can solve problems over prime fields."""
+        return cls._supports_modulus
+
+    @property
+    def workers(self) -> int:
+        """Return the number of worker threads in the throughput mode, or 0."""
+        return self._workers
+
+    @property
+    def harness(self) -> Optional[HarnessOptions]:
+        """Return the options for the harness mode, or `None` if not in the mode."""
+        return self._harness
+
+    @classmethod
+    def supports_harness(cls) -> bool:
+        """Return `True` if the solver has the steady-state harness mode."""
+        return cls._supports_harness
+
+    @property
+    def wall_time(self) -> Optional[float]:
+        """Return the wall-clock time of the last `solve` in the throughput mode.
+
+        The time is for the problems excluding the warm-ups.
+        """
+        return self._wall_time
+
+    @property
+    def peak_memory(self) -> Optional[int]:
+        """Return the peak memory usage in bytes during the last `solve`.
+
+        This is the largest resident set size (sampled) of the processes run by
+        the solver, including their descendants. `None` unless the sample interval
+        is given or if no process was run, e.g., for in-process solvers.
+        """
+        return self._peak_memory
+
+    @property
+    def outcome(self) -> Outcome:
+        """Return the outcome of the last `solve`.
+
+        ``timeout`` and ``out_of_memory`` are for processes killed by the timeout
+        and those that ran out of memory under the limit; ``failed`` is for any
+        other failure.
+        """
+        return self._outcome
+
+    @property
+    def perf_counters(self) -> Optional[PerfCounters]:
+        """Return the hardware event counts during the last `solve`.
+
+        This is the sum over the processes run by the solver, including their
+        startup, and `None` unless the counters are enabled and counted.
+        """
+        return self._perf
+
+    @property
+    def timeline(self) -> Sequence[ResourceSample]:
+        """Return the samples of the resource usage during the last `solve`.
+
+        The time is measured from the start of `solve`. The samples are recorded
+        only if the sample interval is given, for the processes run by the solver.
+        """
+        return tuple(self._timeline)
+
+    @property
+    def limits(self) -> Optional[ResourceLimits]:
+        """Return the resource limits, or `None` if not limited."""
+        return self._limits
+
+    @property
+    def clocks(self) -> Mapping[str, str]:
+        """Return the clocks used for the timings in the last `solve`.
+
+        The keys are ``wall_clock`` and ``cpu_clock``, if reported by the driver
+        (see `parse_csv_log`).
+        """
+        return self._clocks
+
+    @classmethod
+    def supports_throughput(cls) -> bool:
+        """Return `True` if the solver has the throughput mode."""
+        return cls._supports_throughput
+
+    @property
+    def version(self) -> Optional[str]:
+        """Return the version string obtained by the last `prepare` call."""
+        return self._version
+
     @property
     def job_id(self) -> str:
         """Return the job id."""
@@ -131,19 +466,72 @@ class Solver:
 
     # Solver registration.
 
+    # Solver classes can be provided by other packages via entry points of this
+    # group: the name must be the lower-cased solver name and the object reference
+    # must point to the class, e.g., ``mycas = "mypackage.solver:MyCasSolver"``.
+    ENTRY_POINT_GROUP = "polybench.solvers"
+
     _solver_classes: List[Type["Solver"]] = []
 
+    _solver_entries: Optional["OrderedDict[str, str]"] = None
+
     @classmethod
     def register_solver(cls, solver_class: Type["Solver"]) -> None:
         """Register a solver class."""
-        cls._solver_classes.append(solver_class)
+        if solver_class not in cls._solver_classes:
+            cls._solver_classes.append(solver_class)
 
     @classmethod
-    def get_solver_classes(cls) -> Sequence[Type["Solver"]]:
-        """Return all the solver classes."""
-        from . import solvers  # noqa: F401
+    def _get_solver_entries(cls) -> "OrderedDict[str, str]":
+        # Return the mapping from the (lower-cased) solver names to the object
+        # references, without importing the solver modules.
+        if Solver._solver_entries is None:
+            from .solvers import BUILTIN_SOLVERS
+
+            entries = OrderedDict(BUILTIN_SOLVERS)
+            for ep in importlib_metadata.entry_points(group=cls.ENTRY_POINT_GROUP):
+                entries.setdefault(ep.name.lower(), ep.value)
+            Solver._solver_entries = entries
+
+        entries = OrderedDict(Solver._solver_entries)
+        for c in cls._solver_classes:
+            entries.setdefault(c._name.lower(), f"{c.__module__}:{c.__qualname__}")
+        return entries
 
-        return tuple(cls._solver_classes)
+    @classmethod
+    def get_solver_names(cls) -> Sequence[str]:
+        """Return the (lower-cased) names of all the solvers, without loading them."""
+        return tuple(cls._get_solver_entries())
+
+    @classmethod
+    def load_solver_class(cls, name: str) -> Type["Solver"]:
+        """Return the solver class of the given name, importing it if needed."""
+        name = name.lower()
+
+        for c in cls._solver_classes:
+            if c._name.lower() == name:
+                return c
+
+        target = cls._get_solver_entries().get(name)
+        if target is None:
+            raise ValueError(f"unknown solver: {name}")
+
+        module_name, _, attrs = target.partition(":")
+        try:
+            obj = import_module(module_name)
+            for a in attrs.split("."):
+                obj = getattr(obj, a)
+        except (ImportError, AttributeError) as e:
+            raise RuntimeError(f"failed to load solver {name} ({target}): {e}") from e
+
+        solver_class = cast(Type["Solver"], obj)
+        cls.register_solver(solver_class)
+        return solver_class
+
+    @classmethod
+    def get_solver_classes(cls) -> Sequence[Type["Solver"]]:
+        """Return all the solver classes (this imports all the solver modules)."""
+        return tuple(cls.load_solver_class(name) for name in cls.get_solver_names())
 
     @classmethod
     def create_solvers(
@@ -154,14 +542,92 @@ class Solver:
         output_dir: Path,
         logger: Logger,
         timeout: int,
+        debug: Optional[bool] = None,
+        download_options: Optional[DownloadOptions] = None,
+        names: Optional[Sequence[str]] = None,
+        threads: Sequence[int] = (1,),
+        workers: Sequence[int] = (),
+        harness: Optional[HarnessOptions] = None,
+        limits: Optional[ResourceLimits] = None,
+        sample_interval: Optional[float] = None,
+        perf_counters: bool = False,
     ) -> Sequence["Solver"]:
-        """Construct defined solvers."""
-        from . import solvers  # noqa: F401
+        """Construct solvers.
+
+        If `names` is given, only the solvers with these names (case-insensitive)
+        are loaded and constructed; otherwise all the solvers are.
+
+        A solver supporting multi-threading is constructed for each of the numbers
+        of threads given by `threads`, while the others only single-threaded.
+        In addition, a solver supporting the throughput mode is constructed for each
+        of the numbers of worker threads given by `workers`. If `harness` is given,
+        solvers supporting the harness mode run in the mode, except in the
+        throughput mode. `limits`, `sample_interval` and `perf_counters` are passed
+        to all the solvers.
+        """
+        thread_counts = sorted(set(threads))
+        if not thread_counts or thread_counts[0] < 1:
+            raise ValueError(f"invalid numbers of threads: {list(threads)}")
 
-        return tuple(
-            c(job_id, build_dir, output_dir, logger, timeout)
-            for c in cls._solver_classes
-        )
+        worker_counts = sorted(set(workers))
+        if worker_counts and worker_counts[0] < 1:
+            raise ValueError(f"invalid numbers of workers: {list(workers)}")
+
+        all_names = cls.get_solver_names()
+
+        if names is not None:
+            selected = {s.lower() for s in names}
+            unknown_names = [s for s in names if s.lower() not in all_names]
+            if unknown_names:
+                raise ValueError(f"unknown solvers specified: {unknown_names}")
+            all_names = tuple(s for s in all_names if s in selected)
+
+        solvers = []
+
+        for name in all_names:
+            c = cls.load_solver_class(name)
+            if c.supports_threads():
+                solver_threads = thread_counts
+            else:
+                solver_threads = [1]
+                if thread_counts != [1]:
+                    logger.getChild(c._name).warning(
+                        "multi-threading not supported; using a single thread"
+                    )
+            if c.supports_throughput():
+                solver_workers = worker_counts
+            else:
+                solver_workers = []
+                if worker_counts:
+                    logger.getChild(c._name).warning("throughput mode not supported")
+            if c.supports_harness():
+                solver_harness = harness
+            else:
+                solver_harness = None
+                if harness is not None:
+                    logger.getChild(c._name).warning("harness mode not supported")
+            for n, w in [(n, 0) for n in solver_threads] + [
+                (1, w) for w in solver_workers
+            ]:
+                solvers.append(
+                    c(
+                        job_id,
+                        build_dir,
+                        output_dir,
+                        logger,
+                        timeout,
+                        debug=debug,
+                        download_options=download_options,
+                        threads=n,
+                        workers=w,
+                        harness=solver_harness if w == 0 else None,
+                        limits=limits,
+                        sample_interval=sample_interval,
+                        perf_counters=perf_counters,
+                    )
+                )
+
+        return tuple(solvers)
 
     # Helper methods for subclasses.
 
@@ -178,29 +644,126 @@ class Solver:
         else:
             new_args = [str(args)]
 
+        start = time.time()
+
         try:
             if self.debug:
                 redirect = None
             else:
                 redirect = subprocess.DEVNULL
 
-            p = subprocess.run(  # noqa: S603
-                new_args,
-                input=input,
-                stdout=subprocess.PIPE if capture_output else redirect,
-                stderr=redirect,
-                universal_newlines=True,
-                timeout=timeout,
+            # Same as subprocess.run, but with the memory usage sampled and the
+            # resource limits applied in `solve`.
+            with contextlib.ExitStack() as stack:
+                popen_args = new_args
+                perf_file = None
+                if self._perf_counters and self._solving:
+                    perf_dir = stack.enter_context(tempfile.TemporaryDirectory())
+                    perf_file = Path(perf_dir) / "perf.csv"
+                    popen_args = [*perf_command(perf_file), *new_args]
+                limited = None
+                stderr: Any = redirect
+                if self._limits is not None and self._solving:
+                    limited = stack.enter_context(LimitedRun(self._limits))
+                    if redirect is not None:
+                        # Captured to recognise allocation failures.
+                        stderr = stack.enter_context(tempfile.TemporaryFile())
+                proc = stack.enter_context(
+                    subprocess.Popen(  # noqa: S603
+                        popen_args,
+                        stdin=subprocess.PIPE if input is not None else None,
+                        stdout=subprocess.PIPE if capture_output else redirect,
+                        stderr=stderr,
+                        universal_newlines=True,
+                        preexec_fn=limited.preexec_fn if limited else None,
+                    )
+                )
+                # Sampling is opt-in: polling the processes adds noise to the
+                # timings.
+                sampler = None
+                if self._solving and self._sample_interval is not None:
+                    sampler = ResourceSampler(
+                        proc.pid,
+                        self._sample_interval,
+                        origin=self._solve_start,
+                        progress_file=self._output_dir / self._progress_file,
+                    )
+                    stack.enter_context(sampler)
+                try:
+                    stdout, _ = proc.communicate(input, timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    if perf_file is not None:
+                        kill_descendants(proc.pid)  # perf does not kill them
+                    proc.kill()
+                    proc.communicate()
+                    raise
+                if perf_file is not None and perf_file.exists():
+                    counters = parse_perf_stat(perf_file.read_text())
+                    if self._perf is not None:
+                        counters = add_counters(self._perf, counters)
+                    self._perf = counters
+                out_of_memory = False
+                limited_by = None
+                if limited is not None:
+                    limited_by = "cgroup" if limited.uses_cgroup else "rlimit"
+                    stderr_text = ""
+                    if stderr is not redirect:
+                        stderr.seek(0)
+                        stderr_text = stderr.read()[-65536:].decode("utf-8", "replace")
+                    out_of_memory = limited.out_of_memory(proc.returncode, stderr_text)
+            p = subprocess.CompletedProcess(new_args, proc.returncode, stdout)
+        except (OSError, subprocess.SubprocessError) as e:
+            # SubprocessError also when `preexec_fn` failed.
+            if self._solving:
+                if isinstance(e, subprocess.TimeoutExpired):
+                    self._set_outcome("timeout")
+                else:
+                    self._set_outcome("failed")
+            self.logger.warning(
+                f"{e}: {new_args}",
+                extra=event(
+                    "run",
+                    solver=self.name,
+                    command=new_args,
+                    error=str(e),
+                    start=start,
+                    time=time.time() - start,
+                ),
             )
-        except (OSError, subprocess.TimeoutExpired) as e:
-            self.logger.warning(f"{e}: {new_args}")
             return None
 
+        log_event(
+            self.logger,
+            "run",
+            solver=self.name,
+            command=new_args,
+            returncode=p.returncode,
+            limited=limited_by,
+            out_of_memory=out_of_memory,
+            start=start,
+            time=time.time() - start,
+        )
+
+        if sampler is not None and sampler.peak > 0:
+            self._peak_memory = max(self._peak_memory or 0, sampler.peak)
+        if sampler is not None:
+            self._timeline.extend(sampler.samples)
+
+        if out_of_memory:
+            self._set_outcome("out_of_memory")
+            self.logger.warning(f"{new_args} ran out of memory: {p.returncode}")
+            return p
+
         if p.returncode != 0:
             self.logger.warning(f"{new_args} returned a non-zero code: {p.returncode}")
 
         return p
 
+    def _set_outcome(self, outcome: Outcome) -> None:
+        # Keep the first failure.
+        if self._outcome == "ok":
+            self._outcome = outcome
+
     DEFAULT_TIMEOUT = -1729
 
     def run(
@@ -249,44 +812,185 @@ class Solver:
 
         return hash_algorithm.hexdigest()
 
-    def download(self, url: str, sha256: str, path: Path) -> Optional[Path]:
-        """Download a file."""
-        if path.is_dir():
-            path = path / Path(url).name
+    @classmethod
+    def verify_sha256(cls, path: Path, sha256: str) -> bool:
+        """Return `True` if the given file has the given SHA256 hash value.
 
-        if path.exists():
-            if self.sha256(path) == sha256:
-                return path
+        The verified hash value is recorded in a stamp file next to the file, keyed
+        by the size and modification time, such that an unchanged file is not
+        hashed again.
+        """
+        stamp_file = path.with_name(path.name + ".sha256")
+        st = path.stat()
 
         try:
-            with urllib.request.urlopen(url) as f:  # noqa: S310
-                data = f.read()
-        except urllib.error.URLError as e:
-            self.logger.warning(f"{e}: {url}")
-            return None
+            stamp = json.loads(stamp_file.read_text())
+            if stamp["size"] == st.st_size and stamp["mtime_ns"] == st.st_mtime_ns:
+                return cast(bool, stamp["sha256"] == sha256)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        h = cls.sha256(path)
+        cls._write_sha256_stamp(path, h)
+        return h == sha256
+
+    @staticmethod
+    def _write_sha256_stamp(path: Path, sha256: str) -> None:
+        st = path.stat()
+        stamp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+        stamp_file = path.with_name(path.name + ".sha256")
+        temp_file = stamp_file.with_name(f"{stamp_file.name}.tmp{uuid.uuid4()}")
+        try:
+            temp_file.write_text(json.dumps(stamp))
+            os.replace(str(temp_file), str(stamp_file))  # str() for Python 3.6
+        except OSError:
+            pass  # The stamp is only an optimization.
+
+    def download(
+        self, url: str, sha256: str, path: Optional[Path] = None
+    ) -> Optional[Path]:
+        """Download a file.
+
+        The file is taken from the download cache or the mirrors if available there;
+        otherwise it is downloaded into the cache. The file is then copied to `path`
+        (a file or directory) if given; otherwise the path in the cache (or the
+        mirror) is returned.
+        """
+        filename = Path(urllib.parse.urlparse(url).path).name
+
+        if path is not None:
+            if path.is_dir():
+                path = path / filename
+            if path.exists() and self.verify_sha256(path, sha256):
+                return path
+
+        src = self._fetch(url, sha256, filename)
+
+        if src is None or path is None:
+            return src
 
         # Use the "write-new-then-rename" idiom.
 
         temp_filename = f"{path}.tmp{uuid.uuid4()}"
+        shutil.copy2(str(src), temp_filename)  # str() needed for Python 3.6
+        os.replace(temp_filename, path)
+        self._write_sha256_stamp(path, sha256)
 
-        with open(temp_filename, "wb") as f:
-            f.write(data)
+        return path
 
-        os.replace(temp_filename, path)
+    def _fetch(self, url: str, sha256: str, filename: str) -> Optional[Path]:
+        options = self._download_options
+
+        cache_dir = options.cache_dir
+        if cache_dir is None:
+            cache_dir = user_cache_dir() / "downloads"
+        cache_dir.mkdir(parents=True, exist_ok=True)
 
-        h = self.sha256(path)
+        cached_file = cache_dir / filename
 
-        if h == sha256:
-            return path
+        if cached_file.exists() and self.verify_sha256(cached_file, sha256):
+            return cached_file
+
+        urls = []
+
+        for mirror in options.mirrors:
+            if "://" in mirror:
+                urls.append(f"{mirror.rstrip('/')}/{filename}")
+            else:
+                # A local directory (e.g., for offline environments).
+                p = Path(mirror) / filename
+                if p.exists() and self.verify_sha256(p, sha256):
+                    return p
 
-        self.logger.warning(f"SHA256 mismatch: {url}, expected: {sha256}, actual: {h}")
+        if not options.offline:
+            urls.append(url)
+
+        for u in urls:
+            if self._download_to(u, sha256, cached_file):
+                return cached_file
+
+        if not urls:
+            self.logger.warning(f"not found in offline mirrors: {filename}")
 
         return None
 
+    def _download_to(self, url: str, sha256: str, path: Path) -> bool:
+        # Stream the file into a partial file, which is kept on failures such that
+        # the download can be resumed, and rename it when the hash value is correct.
+        part_file = path.with_name(path.name + ".part")
+
+        hash_algorithm = hashlib.sha256()
+        chunk_size = 2048 * hash_algorithm.block_size
+
+        offset = part_file.stat().st_size if part_file.exists() else 0
+
+        request = urllib.request.Request(url)  # noqa: S310
+        if offset > 0:
+            request.add_header("Range", f"bytes={offset}-")
+
+        self.logger.debug(f"download {url}" + (f" from {offset}" if offset else ""))
+
+        try:
+            with urllib.request.urlopen(request, timeout=60) as f:  # noqa: S310
+                if offset > 0 and f.getcode() == 206:
+                    # Resume: the existing part must be included in the hash value.
+                    with part_file.open("rb") as g:
+                        while True:
+                            chunk = g.read(chunk_size)
+                            if not chunk:
+                                break
+                            hash_algorithm.update(chunk)
+                    mode = "ab"
+                else:
+                    mode = "wb"
+
+                with part_file.open(mode) as g:
+                    while True:
+                        chunk = f.read(chunk_size)
+                        if not chunk:
+                            break
+                        hash_algorithm.update(chunk)
+                        g.write(chunk)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset > 0:
+                # Range Not Satisfiable: the partial file is unusable. Start over.
+                part_file.unlink()
+                return self._download_to(url, sha256, path)
+            self.logger.warning(f"{e}: {url}")
+            return False
+        except (urllib.error.URLError, OSError) as e:
+            self.logger.warning(f"{e}: {url}")
+            return False
+
+        h = hash_algorithm.hexdigest()
+
+        if h != sha256:
+            part_file.unlink()
+            self.logger.warning(
+                f"SHA256 mismatch: {url}, expected: {sha256}, actual: {h}"
+            )
+            return False
+
+        os.replace(str(part_file), str(path))  # str() for Python 3.6
+        self._write_sha256_stamp(path, h)
+
+        return True
+
+    # The manifest of the resource files for the solver `name` is precomputed as
+    # `polybench/solvers/{name}.manifest.json` (see
+    # scripts/update-resource-manifests.py), and a copy with the file status is
+    # kept in the destination directory as `RESOURCE_MANIFEST`.
+    RESOURCE_MANIFEST = ".polybench-manifest.json"
+
     def copy_resources(
         self, name: Optional[str] = None, dest_dir: Optional[Path] = None
     ) -> None:
-        """Copy resource files into the given directory."""
+        """Copy resource files into the given directory.
+
+        Only the files whose hash values differ from those recorded at the last copy
+        (or that have been modified since then) are copied. The timestamps are
+        preserved such that build tools can work incrementally.
+        """
         if name is None:
             name = self.name.lower()
         if dest_dir is None:
@@ -295,21 +999,63 @@ class Solver:
         resources = importlib_resources.files("polybench.solvers")
         for p in resources.iterdir():
             if p.is_dir() and p.name == name:
-                self._copy_resources_impl(p, dest_dir)
+                src_dir = Path(str(p))
+                manifest = get_resource_manifest(
+                    src_dir, src_dir.with_name(f"{name}.manifest.json")
+                )
+                self._copy_resources_impl(src_dir, dest_dir, manifest)
                 return
 
         raise RuntimeError(f"resources not found: {name}")
 
-    def _copy_resources_impl(self, src_dir: Path, dest_dir: Path) -> None:
-        for p in src_dir.iterdir():
-            q = dest_dir / p.name
-            if p.is_dir():
-                self._copy_resources_impl(p, q)
-            else:
-                if not q.exists() or not filecmp.cmp(p, q):
-                    self.logger.debug(f"copy {p.resolve()} -> {q.resolve()}")
-                    dest_dir.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(p, q)
+    def _copy_resources_impl(
+        self, src_dir: Path, dest_dir: Path, manifest: Mapping[str, str]
+    ) -> None:
+        dest_manifest_file = dest_dir / self.RESOURCE_MANIFEST
+
+        try:
+            old_entries = json.loads(dest_manifest_file.read_text())
+            if not isinstance(old_entries, dict):
+                old_entries = {}
+        except (OSError, ValueError):
+            old_entries = {}
+
+        new_entries = {}
+
+        for name, sha256 in manifest.items():
+            p = src_dir / name
+            q = dest_dir / name
+
+            entry = old_entries.get(name)
+
+            if isinstance(entry, dict) and entry.get("sha256") == sha256:
+                try:
+                    st = q.stat()
+                    if (
+                        entry.get("size") == st.st_size
+                        and entry.get("mtime_ns") == st.st_mtime_ns
+                    ):
+                        new_entries[name] = entry
+                        continue
+                except OSError:
+                    pass
+
+            self.logger.debug(f"copy {p.resolve()} -> {q.resolve()}")
+            q.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(str(p), str(q))  # str() needed for Python 3.6
+
+            st = q.stat()
+            new_entries[name] = {
+                "sha256": sha256,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+            }
+
+        if new_entries != old_entries:
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            dest_manifest_file.write_text(
+                json.dumps(new_entries, indent=2, sort_keys=True) + "\n"
+            )
 
     def remove_resources(
         self, names: Union[str, Sequence[str]], dest_dir: Optional[Path] = None
@@ -328,6 +1074,68 @@ class Solver:
                 else:
                     p.unlink()
 
+    # The file to which a driver writes the wall-clock time in the throughput mode.
+    THROUGHPUT_SUMMARY_FILE = "throughput.txt"
+
+    def throughput_args(self, problems: ProblemSet) -> Sequence[str]:
+        """Return the extra arguments for drivers in the throughput mode.
+
+        The arguments are the number of workers, the number of warm-ups and
+        the summary file in the output directory. Empty if not in the throughput
+        mode.
+        """
+        if self.workers == 0:
+            return []
+        return [
+            str(self.workers),
+            str(problems.n_warmups),
+            str(self.output_dir / self.THROUGHPUT_SUMMARY_FILE),
+        ]
+
+    def harness_args(self) -> Sequence[str]:
+        """Return the extra arguments for drivers in the harness mode.
+
+        The arguments are ``-wi`` and the number of warm-up iterations and ``-i``
+        and the number of measurement iterations, to be put before the other
+        arguments. Empty if not in the harness mode. Forks are separate runs of
+        the driver, whose outputs are combined by `parse_harness_logs`.
+        """
+        if self.harness is None:
+            return []
+        return ["-wi", str(self.harness.warmups), "-i", str(self.harness.iterations)]
+
+    @staticmethod
+    def modulus_args(problems: ProblemSet) -> Sequence[str]:
+        """Return the extra arguments for drivers to work over a prime field.
+
+        The arguments are ``-m`` and the modulus, to be put before the other
+        arguments. Empty for problems over the integers.
+        """
+        if problems.modulus is None:
+            return []
+        return ["-m", str(problems.modulus)]
+
+    @staticmethod
+    def degree_bound_args(problems: ProblemSet) -> Sequence[str]:
+        """Return the extra arguments to pass the degree bound to drivers.
+
+        The arguments are ``-d`` and `ProblemSet.degree_bound`, to be put before the
+        other arguments, for drivers that choose the width of packed exponents.
+        """
+        return ["-d", str(problems.degree_bound)]
+
+    def read_throughput_summary(self) -> bool:
+        """Read the wall-clock time written by the driver in the throughput mode."""
+        if self.workers == 0:
+            return True
+        summary_file = self.output_dir / self.THROUGHPUT_SUMMARY_FILE
+        try:
+            self._wall_time = float(summary_file.read_text().strip())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"failed to read the throughput summary: {e}")
+            return False
+        return True
+
     @property
     def cmake_command(self) -> Sequence[str]:
         """Return the CMake command."""
@@ -394,27 +1202,200 @@ class Solver:
         Each row must contain information of a result of a problem: the timing
         (in seconds, float) at the first column, and the answer in the rest of the row.
         For example, ``time,gcd`` for `gcd` problems and
-        ``time,factor1,factor2,...,factorN`` for `factor` problems.
+        ``time,factor1,factor2,...,factorN`` for `factor` problems. The first column
+        can also be ``time;parse_time;output_time`` to report the times for parsing
+        the input and writing the answer in addition to the computation.
+
+        Drivers following the unified timing protocol start the file with
+        metadata lines ``#wall_clock=<clock>`` and optionally
+        ``#cpu_clock=<clock>``, naming the monotonic clock for the wall-clock times
+        and the clock for the CPU times. Then the first column is given in integer
+        nanoseconds as ``wall;cpu`` or ``wall;cpu;parse;output``, where ``cpu`` is
+        empty if the CPU time is not available, and `time_scaling` is not used.
         """
         if not log_file.exists():
             return None
 
-        with log_file.open() as f:
-            lines = f.readlines()
+        with timed(self.logger, "phase", phase="parse_csv_log", solver=self.name):
+            with log_file.open() as f:
+                lines = f.readlines()
+
+            results = []
+
+            for line in lines:
+                if line.startswith("#"):
+                    key, _, value = line[1:].strip().partition("=")
+                    if key in ("wall_clock", "cpu_clock"):
+                        self._clocks[key] = value
+                    continue
+                a = line.split(",")
+                a = [x for x in a if x]
+                if len(a) < 2:
+                    return None
+                try:
+                    answer = [self._parse_answer(x) for x in a[1:]]
+                    if "wall_clock" in self._clocks:
+                        ns = [int(x) if x else None for x in a[0].split(";")]
+                        if len(ns) not in (2, 4) or ns[0] is None or None in ns[2:]:
+                            raise ValueError(f"unexpected timings: {a[0]}")
+                        wall, cpu, *rest = [None if x is None else x * 1e-9 for x in ns]
+                        parse_time, output_time = rest or (None, None)
+                        results.append(
+                            Result(
+                                cast(float, wall), answer, parse_time, output_time, cpu
+                            )
+                        )
+                    else:
+                        times = [float(x) * time_scaling for x in a[0].split(";")]
+                        if len(times) not in (1, 3):
+                            raise ValueError(f"unexpected timings: {a[0]}")
+                        results.append(Result(times[0], answer, *times[1:]))
+                except ValueError:
+                    self.logger.warning(f"failed to parse a row: {line}")
+                    return None
 
-        results = []
+        return tuple(results)
 
-        for line in lines:
-            a = line.split(",")
-            a = [x for x in a if x]
-            if len(a) < 2:
+    def parse_harness_logs(
+        self, log_files: Sequence[Path]
+    ) -> Optional[Sequence[Result]]:
+        """Parse results in the log files written by the forks in the harness mode.
+
+        Each log file must follow the unified timing protocol of `parse_csv_log`,
+        where each row is preceded by a metadata line ``#samples=<t1>;<t2>;...``
+        giving the wall-clock times of the measurement iterations in nanoseconds.
+        The samples of all the forks are pooled into the score and error of each
+        problem, which are also emitted as ``harness`` events. The answers and the
+        parse and output times are taken from the first fork, and the CPU time is
+        averaged over the forks.
+        """
+        runs: List[Sequence[Result]] = []
+        samples: List[List[float]] = []
+
+        for log_file in log_files:
+            results = self.parse_csv_log(log_file)
+            if results is None:
                 return None
+            fork_samples = []
             try:
-                results.append(
-                    Result(float(a[0]) * time_scaling, [Polynomial(x) for x in a[1:]])
-                )
+                with log_file.open() as f:
+                    for line in f:
+                        if line.startswith("#samples="):
+                            values = line[9:].strip().split(";")
+                            fork_samples.append([int(x) * 1e-9 for x in values])
             except ValueError:
-                self.logger.warning(f"failed to parse a row: {line}")
+                self.logger.warning(f"failed to parse samples in {log_file}")
                 return None
+            if len(fork_samples) != len(results) or (
+                runs and len(results) != len(runs[0])
+            ):
+                self.logger.warning(f"unexpected number of samples in {log_file}")
+                return None
+            if not samples:
+                samples = [[] for _ in results]
+            for pooled, xs in zip(samples, fork_samples):
+                pooled.extend(xs)
+            runs.append(results)
+
+        if not runs:
+            return None
+
+        merged = []
+
+        for i, r in enumerate(runs[0]):
+            score, error = score_and_error(samples[i])
+            cpu_times = [run[i].cpu_time for run in runs]
+            cpu_time: Optional[float] = None
+            if all(t is not None for t in cpu_times):
+                cpu_time = math.fsum(cast(List[float], cpu_times)) / len(cpu_times)
+            log_event(
+                self.logger,
+                "harness",
+                solver=self.name,
+                problem=i + 1,
+                score=score,
+                error=error,
+                samples=len(samples[i]),
+                forks=len(runs),
+            )
+            merged.append(r._replace(time=score, cpu_time=cpu_time, error=error))
+
+        return tuple(merged)
+
+    @staticmethod
+    def _parse_answer(s: str) -> Polynomial:
+        # Expanded polynomials are split into terms quickly, deferring the symbolic
+        # conversion (which is slow for large polynomials, e.g., products).
+        try:
+            return Polynomial.from_expanded(s)
+        except ValueError:
+            return Polynomial(s)
+
+
+class InProcessSolver(Solver):
+    """Abstract solver running inside the benchmark process.
+
+    Instead of spawning an external program, an in-process solver calls a Python
+    binding directly, which avoids the overhead of process creation and file I/O.
+    The computation is timed with `time.perf_counter_ns` (and the CPU time with
+    `time.process_time_ns`) with the garbage collector disabled; conversions from
+    and to `Polynomial` are reported as the parse and output times. Note that
+    neither the timeout nor the resource limits are applied to in-process solvers.
+    """
+
+    # Things that must be overridden in subclasses (in addition to `_prepare`).
+
+    def _load(self, problem: Problem, problems: ProblemSet) -> Callable[[], Any]:
+        # Convert the given problem into the native representation and return
+        # a function that performs the computation to be timed.
+        raise NotImplementedError
+
+    def _answer(self, result: Any) -> Sequence[Polynomial]:
+        # Convert the value returned by the function from `_load()` into
+        # the answer.
+        raise NotImplementedError
+
+    # Common implementation.
+
+    def _solve(self, problems: ProblemSet) -> Optional[Sequence[Result]]:
+        self._clocks = {
+            "wall_clock": "time.perf_counter_ns",
+            "cpu_clock": "time.process_time_ns",
+        }
+
+        results = []
+
+        for i, problem in enumerate(problems):
+            try:
+                t0 = perf_counter_ns()
+                task = self._load(problem, problems)
+
+                gc_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    c1 = process_time_ns()
+                    t1 = perf_counter_ns()
+                    r = task()
+                    t2 = perf_counter_ns()
+                    c2 = process_time_ns()
+                finally:
+                    if gc_enabled:
+                        gc.enable()
+
+                answer = self._answer(r)
+                t3 = perf_counter_ns()
+            except Exception as e:  # noqa: B902
+                self.logger.warning(f"problem {i + 1}: {type(e).__name__}: {e}")
+                return None
+
+            results.append(
+                Result(
+                    (t2 - t1) * 1e-9,
+                    answer,
+                    (t1 - t0) * 1e-9,
+                    (t3 - t2) * 1e-9,
+                    (c2 - c1) * 1e-9,
+                )
+            )
 
         return tuple(results)
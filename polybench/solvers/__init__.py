@@ -1,12 +1,19 @@
-"""Solver implementations."""
+"""Solver implementations.
 
-from importlib import import_module
-from pathlib import Path
-from pkgutil import iter_modules
+The modules are not imported here: each of them is loaded on demand by
+`Solver.load_solver_class` when the solver is selected.
+"""
 
-# Load all modules.
-
-for _, module_name, _ in iter_modules(  # type: ignore[assignment]
-    [str(Path(__file__).resolve().parent)]
-):
-    import_module(f"{__name__}.{module_name}")
+# Built-in solvers: pairs of the (lower-cased) solver name and the object
+# reference to the class, in the same format as entry points.
+BUILTIN_SOLVERS = (
+    ("fermat", "polybench.solvers.fer:FermatSolver"),
+    ("flint", "polybench.solvers.flint:FlintSolver"),
+    ("form", "polybench.solvers.form:FormSolver"),
+    ("mathematica", "polybench.solvers.mma:MathematicaSolver"),
+    ("python-flint", "polybench.solvers.pyflint:PythonFlintSolver"),
+    ("reform", "polybench.solvers.reform:ReformSolver"),
+    ("rings", "polybench.solvers.rings:RingsSolver"),
+    ("singular", "polybench.solvers.singular:SingularSolver"),
+    ("symbolica", "polybench.solvers.symbolica:SymbolicaSolver"),
+)
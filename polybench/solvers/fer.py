@@ -29,7 +29,7 @@ class FermatSolver(Solver):
         return shutil.which("fer64")
 
     def _prepare(self, problems: ProblemSet) -> Optional[str]:
-        if problems.problem_type not in ("gcd",):
+        if problems.problem_type not in ("gcd", "mul"):
             return None
 
         fermat = self._find_fermat()
@@ -57,7 +57,12 @@ class FermatSolver(Solver):
             def print2(s: str) -> None:
                 print(s, file=f)
 
-            if problems.problem_type == "gcd":
+            if problems.problem_type in ("gcd", "mul"):
+                if problems.problem_type == "gcd":
+                    op = "GCD(p, q)"
+                else:
+                    op = "p * q"
+
                 print2("start := &T;")
                 print2("&(S=output);")
                 print2("&(U=1);")
@@ -72,7 +77,7 @@ class FermatSolver(Solver):
                     print2(f"p := {p.p};")
                     print2(f"q := {p.q};")
                     print2("t1 := &T;")
-                    print2("r := GCD(p, q);")
+                    print2(f"r := {op};")
                     print2("t2 := &T;")
                     print2("t := t2 - t1;")
                     print2("@(p, q, t1, t2);")
@@ -159,7 +164,7 @@ class FermatSolver(Solver):
         except ValueError:
             return False
 
-        if mode == "gcd":
+        if mode in ("gcd", "mul"):
             with dest_path.open("w") as f:
                 for entry in entries[1:-1]:
                     if "t" not in entry or "r" not in entry:
@@ -11,6 +11,9 @@ class FlintSolver(Solver):
     """FLINT Solver."""
 
     _name = "FLINT"
+    _supports_threads = True
+    _supports_throughput = True
+    _supports_modulus = True
 
     def _find_executable(self) -> str:
         s = f"{self._build_dir}/build/polybench-flint"
@@ -20,7 +23,14 @@ class FlintSolver(Solver):
         return s
 
     def _prepare(self, problems: ProblemSet) -> Optional[str]:
-        if problems.problem_type not in ("gcd", "factor"):
+        if problems.problem_type not in (
+            "gcd",
+            "factor",
+            "mul",
+            "div",
+            "divisible",
+            "ratfun",
+        ):
             return None
 
         # Remove stale overlay port files.
@@ -55,9 +65,18 @@ class FlintSolver(Solver):
     def _solve(self, problems: ProblemSet) -> Optional[Sequence[Result]]:
         variables = ",".join(problems.variables)
         log_file = Path(".") / "output.csv"
-        args = [variables, str(self.problem_file), str(log_file)]
+        args = [
+            *self.modulus_args(problems),
+            variables,
+            str(self.problem_file),
+            str(log_file),
+            str(self.threads),
+            *self.throughput_args(problems),
+        ]
         if not self.run([self._find_executable(), *args]):
             return None
+        if not self.read_throughput_summary():
+            return None
         return self.parse_csv_log(log_file)
 
 
@@ -1,6 +1,12 @@
+#include <flint/flint.h>
 #include <flint/fmpz.h>
 #include <flint/fmpz_mpoly.h>
 #include <flint/fmpz_mpoly_factor.h>
+#include <flint/fmpz_mpoly_q.h>
+#include <flint/nmod_mpoly.h>
+#include <flint/nmod_mpoly_factor.h>
+#include <inttypes.h>
+#include <pthread.h>
 #include <stdint.h>
 #include <stdio.h>
 #include <stdlib.h>
@@ -9,6 +15,10 @@
 
 #include "version.h"
 
+// The modulus for problems over a prime field, or 0 for problems over the
+// integers.
+static ulong modulus = 0;
+
 void error(const char* msg) {
   fprintf(stderr, "error: %s\n", msg);
   exit(EXIT_FAILURE);
@@ -30,41 +40,71 @@ void* realloc2(void* ptr, size_t new_size) {
   return p;
 }
 
-int64_t get_nanoseconds(void) {
+// The clocks for the wall-clock time and the CPU time. The CPU time is for the
+// process, including the threads used by FLINT, except in the throughput mode,
+// where it is for the worker thread solving the problem.
+#define WALL_CLOCK CLOCK_MONOTONIC
+static clockid_t cpu_clock = CLOCK_PROCESS_CPUTIME_ID;
+
+int64_t get_clock_nanoseconds(clockid_t clock_id) {
   struct timespec ts;
-  timespec_get(&ts, TIME_UTC);
+  if (clock_gettime(clock_id, &ts)) {
+    error("failed to get the time");
+  }
   return (int64_t)ts.tv_sec * INT64_C(1000000000) + (int64_t)ts.tv_nsec;
 }
 
-int strsplit(const char* str, const char* delim, char** out_buf,
-             char*** out_array) {
-  char* buf = (char*)malloc2(sizeof(char) * (strlen(str) + 1));
-
-  strcpy(buf, str);  // NOLINT(runtime/printf)
+int64_t get_nanoseconds(void) { return get_clock_nanoseconds(WALL_CLOCK); }
+
+int64_t get_cpu_nanoseconds(void) { return get_clock_nanoseconds(cpu_clock); }
+
+// Timings of a problem in nanoseconds: parsing the input, the computation (the
+// wall-clock time and the CPU time) and writing the answer.
+typedef struct {
+  int64_t parse;
+  int64_t compute;
+  int64_t compute_cpu;
+  int64_t output;
+} timings_t;
+
+void set_timings(timings_t* timings, int64_t t0, int64_t t1, int64_t t2,
+                 int64_t t3, int64_t c1, int64_t c2) {
+  timings->parse = t1 - t0;
+  timings->compute = t2 - t1;
+  timings->compute_cpu = c2 - c1;
+  timings->output = t3 - t2;
+}
 
-  int n = 0;
-  char* p = strtok(buf, delim);  // NOLINT(runtime/threadsafe_fn)
-  for (;;) {
-    if (p) {
-      n++;
-      p = strtok(NULL, delim);  // NOLINT(runtime/threadsafe_fn)
-    } else {
-      break;
-    }
+int64_t parse_int(const char* str, int64_t min, int64_t max) {
+  char* end;
+  int64_t n = strtoll(str, &end, 10);
+  if (*end != '\0' || end == str || n < min || n > max) {
+    error("invalid integer argument");
   }
+  return n;
+}
 
-  char** array = (char**)malloc2(sizeof(char*) * (n > 0 ? n : 1));
+// Split the string by the delimiters, skipping empty tokens (like strtok, but
+// thread-safe).
+int strsplit(const char* str, const char* delim, char** out_buf,
+             char*** out_array) {
+  size_t len = strlen(str);
+  char* buf = (char*)malloc2(sizeof(char) * (len + 1));
+  char** array = (char**)malloc2(sizeof(char*) * (len / 2 + 1));
 
-  int i = 0;
-  strcpy(buf, str);        // NOLINT(runtime/printf)
-  p = strtok(buf, delim);  // NOLINT(runtime/threadsafe_fn)
-  for (;;) {
-    if (p) {
-      array[i] = p;
-      i++;
-      p = strtok(NULL, delim);  // NOLINT(runtime/threadsafe_fn)
+  int n = 0;
+  int in_token = 0;
+  for (size_t i = 0; i <= len; i++) {
+    char c = str[i];
+    if (c == '\0' || strchr(delim, c)) {
+      buf[i] = '\0';
+      in_token = 0;
     } else {
-      break;
+      buf[i] = c;
+      if (!in_token) {
+        array[n++] = &buf[i];
+        in_token = 1;
+      }
     }
   }
 
@@ -104,7 +144,7 @@ char* readline(FILE* file) {
 }
 
 void do_gcd(int n_variables, const char** variables, int n_polys,
-            const char** polys, FILE* out) {
+            const char** polys, FILE* out, timings_t* timings) {
   if (n_polys != 2) {
     error("npolys != 2");
   }
@@ -116,6 +156,7 @@ void do_gcd(int n_variables, const char** variables, int n_polys,
   fmpz_mpoly_init(p2, ctx);
   fmpz_mpoly_init(g, ctx);
 
+  int64_t t0 = get_nanoseconds();
   if (fmpz_mpoly_set_str_pretty(p1, polys[0], variables, ctx)) {
     error("failed to parse a polynomial");
   }
@@ -124,17 +165,20 @@ void do_gcd(int n_variables, const char** variables, int n_polys,
     error("failed to parse a polynomial");
   }
 
+  int64_t c1 = get_cpu_nanoseconds();
   int64_t t1 = get_nanoseconds();
   int result = fmpz_mpoly_gcd(g, p1, p2, ctx);
   int64_t t2 = get_nanoseconds();
+  int64_t c2 = get_cpu_nanoseconds();
 
-  fprintf(out, "%g,", (double)(t2 - t1) * 1.0e-9);
+  fprintf(out, ",");
   if (result) {
     fmpz_mpoly_fprint_pretty(out, g, variables, ctx);
   } else {
     fprintf(out, "FAILED");
   }
-  fprintf(out, "\n");
+  int64_t t3 = get_nanoseconds();
+  set_timings(timings, t0, t1, t2, t3, c1, c2);
 
   fmpz_mpoly_clear(p1, ctx);
   fmpz_mpoly_clear(p2, ctx);
@@ -142,8 +186,220 @@ void do_gcd(int n_variables, const char** variables, int n_polys,
   fmpz_mpoly_ctx_clear(ctx);
 }
 
+void do_gcd_nmod(int n_variables, const char** variables, int n_polys,
+                 const char** polys, FILE* out, timings_t* timings) {
+  if (n_polys != 2) {
+    error("npolys != 2");
+  }
+
+  nmod_mpoly_ctx_t ctx;
+  nmod_mpoly_t p1, p2, g;
+  nmod_mpoly_ctx_init(ctx, n_variables, ORD_LEX, modulus);
+  nmod_mpoly_init(p1, ctx);
+  nmod_mpoly_init(p2, ctx);
+  nmod_mpoly_init(g, ctx);
+
+  int64_t t0 = get_nanoseconds();
+  if (nmod_mpoly_set_str_pretty(p1, polys[0], variables, ctx)) {
+    error("failed to parse a polynomial");
+  }
+
+  if (nmod_mpoly_set_str_pretty(p2, polys[1], variables, ctx)) {
+    error("failed to parse a polynomial");
+  }
+
+  int64_t c1 = get_cpu_nanoseconds();
+  int64_t t1 = get_nanoseconds();
+  int result = nmod_mpoly_gcd(g, p1, p2, ctx);
+  int64_t t2 = get_nanoseconds();
+  int64_t c2 = get_cpu_nanoseconds();
+
+  fprintf(out, ",");
+  if (result) {
+    nmod_mpoly_fprint_pretty(out, g, variables, ctx);
+  } else {
+    fprintf(out, "FAILED");
+  }
+  int64_t t3 = get_nanoseconds();
+  set_timings(timings, t0, t1, t2, t3, c1, c2);
+
+  nmod_mpoly_clear(p1, ctx);
+  nmod_mpoly_clear(p2, ctx);
+  nmod_mpoly_clear(g, ctx);
+  nmod_mpoly_ctx_clear(ctx);
+}
+
+void do_mul(int n_variables, const char** variables, int n_polys,
+            const char** polys, FILE* out, timings_t* timings) {
+  if (n_polys != 2) {
+    error("npolys != 2");
+  }
+
+  fmpz_mpoly_ctx_t ctx;
+  fmpz_mpoly_t p1, p2, r;
+  fmpz_mpoly_ctx_init(ctx, n_variables, ORD_LEX);
+  fmpz_mpoly_init(p1, ctx);
+  fmpz_mpoly_init(p2, ctx);
+  fmpz_mpoly_init(r, ctx);
+
+  int64_t t0 = get_nanoseconds();
+  if (fmpz_mpoly_set_str_pretty(p1, polys[0], variables, ctx)) {
+    error("failed to parse a polynomial");
+  }
+
+  if (fmpz_mpoly_set_str_pretty(p2, polys[1], variables, ctx)) {
+    error("failed to parse a polynomial");
+  }
+
+  int64_t c1 = get_cpu_nanoseconds();
+  int64_t t1 = get_nanoseconds();
+  fmpz_mpoly_mul(r, p1, p2, ctx);
+  int64_t t2 = get_nanoseconds();
+  int64_t c2 = get_cpu_nanoseconds();
+
+  fprintf(out, ",");
+  fmpz_mpoly_fprint_pretty(out, r, variables, ctx);
+  int64_t t3 = get_nanoseconds();
+  set_timings(timings, t0, t1, t2, t3, c1, c2);
+
+  fmpz_mpoly_clear(p1, ctx);
+  fmpz_mpoly_clear(p2, ctx);
+  fmpz_mpoly_clear(r, ctx);
+  fmpz_mpoly_ctx_clear(ctx);
+}
+
+void do_div(int n_variables, const char** variables, int n_polys,
+            const char** polys, FILE* out, timings_t* timings) {
+  if (n_polys != 2) {
+    error("npolys != 2");
+  }
+
+  fmpz_mpoly_ctx_t ctx;
+  fmpz_mpoly_t p1, p2, r;
+  fmpz_mpoly_ctx_init(ctx, n_variables, ORD_LEX);
+  fmpz_mpoly_init(p1, ctx);
+  fmpz_mpoly_init(p2, ctx);
+  fmpz_mpoly_init(r, ctx);
+
+  int64_t t0 = get_nanoseconds();
+  if (fmpz_mpoly_set_str_pretty(p1, polys[0], variables, ctx)) {
+    error("failed to parse a polynomial");
+  }
+
+  if (fmpz_mpoly_set_str_pretty(p2, polys[1], variables, ctx)) {
+    error("failed to parse a polynomial");
+  }
+
+  int64_t c1 = get_cpu_nanoseconds();
+  int64_t t1 = get_nanoseconds();
+  int result = fmpz_mpoly_divides(r, p1, p2, ctx);
+  int64_t t2 = get_nanoseconds();
+  int64_t c2 = get_cpu_nanoseconds();
+
+  fprintf(out, ",");
+  if (result) {
+    fmpz_mpoly_fprint_pretty(out, r, variables, ctx);
+  } else {
+    fprintf(out, "FAILED");
+  }
+  int64_t t3 = get_nanoseconds();
+  set_timings(timings, t0, t1, t2, t3, c1, c2);
+
+  fmpz_mpoly_clear(p1, ctx);
+  fmpz_mpoly_clear(p2, ctx);
+  fmpz_mpoly_clear(r, ctx);
+  fmpz_mpoly_ctx_clear(ctx);
+}
+
+void do_divisible(int n_variables, const char** variables, int n_polys,
+                  const char** polys, FILE* out, timings_t* timings) {
+  if (n_polys != 2) {
+    error("npolys != 2");
+  }
+
+  fmpz_mpoly_ctx_t ctx;
+  fmpz_mpoly_t p1, p2, r;
+  fmpz_mpoly_ctx_init(ctx, n_variables, ORD_LEX);
+  fmpz_mpoly_init(p1, ctx);
+  fmpz_mpoly_init(p2, ctx);
+  fmpz_mpoly_init(r, ctx);
+
+  int64_t t0 = get_nanoseconds();
+  if (fmpz_mpoly_set_str_pretty(p1, polys[0], variables, ctx)) {
+    error("failed to parse a polynomial");
+  }
+
+  if (fmpz_mpoly_set_str_pretty(p2, polys[1], variables, ctx)) {
+    error("failed to parse a polynomial");
+  }
+
+  // The divisibility test stops as soon as a nonzero remainder is found.
+  int64_t c1 = get_cpu_nanoseconds();
+  int64_t t1 = get_nanoseconds();
+  int result = fmpz_mpoly_divides(r, p1, p2, ctx);
+  int64_t t2 = get_nanoseconds();
+  int64_t c2 = get_cpu_nanoseconds();
+
+  fprintf(out, ",%d", result ? 1 : 0);
+  int64_t t3 = get_nanoseconds();
+  set_timings(timings, t0, t1, t2, t3, c1, c2);
+
+  fmpz_mpoly_clear(p1, ctx);
+  fmpz_mpoly_clear(p2, ctx);
+  fmpz_mpoly_clear(r, ctx);
+  fmpz_mpoly_ctx_clear(ctx);
+}
+
+void do_ratfun(int n_variables, const char** variables, int n_polys,
+               const char** polys, FILE* out, timings_t* timings) {
+  if (n_polys != 4) {
+    error("npolys != 4");
+  }
+
+  fmpz_mpoly_ctx_t ctx;
+  fmpz_mpoly_q_t f1, f2, r;
+  fmpz_mpoly_ctx_init(ctx, n_variables, ORD_LEX);
+  fmpz_mpoly_q_init(f1, ctx);
+  fmpz_mpoly_q_init(f2, ctx);
+  fmpz_mpoly_q_init(r, ctx);
+
+  int64_t t0 = get_nanoseconds();
+  if (fmpz_mpoly_set_str_pretty(fmpz_mpoly_q_numref(f1), polys[0], variables,
+                                ctx) ||
+      fmpz_mpoly_set_str_pretty(fmpz_mpoly_q_denref(f1), polys[1], variables,
+                                ctx) ||
+      fmpz_mpoly_set_str_pretty(fmpz_mpoly_q_numref(f2), polys[2], variables,
+                                ctx) ||
+      fmpz_mpoly_set_str_pretty(fmpz_mpoly_q_denref(f2), polys[3], variables,
+                                ctx)) {
+    error("failed to parse a polynomial");
+  }
+
+  // The input fractions are not reduced; fmpz_mpoly_q_add needs canonical
+  // forms.
+  int64_t c1 = get_cpu_nanoseconds();
+  int64_t t1 = get_nanoseconds();
+  fmpz_mpoly_q_canonicalise(f1, ctx);
+  fmpz_mpoly_q_canonicalise(f2, ctx);
+  fmpz_mpoly_q_add(r, f1, f2, ctx);
+  int64_t t2 = get_nanoseconds();
+  int64_t c2 = get_cpu_nanoseconds();
+
+  fprintf(out, ",");
+  fmpz_mpoly_fprint_pretty(out, fmpz_mpoly_q_numref(r), variables, ctx);
+  fprintf(out, ",");
+  fmpz_mpoly_fprint_pretty(out, fmpz_mpoly_q_denref(r), variables, ctx);
+  int64_t t3 = get_nanoseconds();
+  set_timings(timings, t0, t1, t2, t3, c1, c2);
+
+  fmpz_mpoly_q_clear(f1, ctx);
+  fmpz_mpoly_q_clear(f2, ctx);
+  fmpz_mpoly_q_clear(r, ctx);
+  fmpz_mpoly_ctx_clear(ctx);
+}
+
 void do_factor(int n_variables, const char** variables, int n_polys,
-               const char** polys, FILE* out) {
+               const char** polys, FILE* out, timings_t* timings) {
   if (n_polys != 1) {
     error("npolys != 1");
   }
@@ -158,15 +414,17 @@ void do_factor(int n_variables, const char** variables, int n_polys,
   fmpz_mpoly_factor_init(f, ctx);
   fmpz_init(c);
 
+  int64_t t0 = get_nanoseconds();
   if (fmpz_mpoly_set_str_pretty(p, polys[0], variables, ctx)) {
     error("failed to parse a polynomial");
   }
 
+  int64_t c1 = get_cpu_nanoseconds();
   int64_t t1 = get_nanoseconds();
   int result = fmpz_mpoly_factor(f, p, ctx);
   int64_t t2 = get_nanoseconds();
+  int64_t c2 = get_cpu_nanoseconds();
 
-  fprintf(out, "%g", (double)(t2 - t1) * 1.0e-9);
   if (result) {
     slong n = fmpz_mpoly_factor_length(f, ctx);
     fmpz_mpoly_factor_get_constant_fmpz(c, f, ctx);
@@ -189,7 +447,8 @@ void do_factor(int n_variables, const char** variables, int n_polys,
   } else {
     fprintf(out, ",FAILED");
   }
-  fprintf(out, "\n");
+  int64_t t3 = get_nanoseconds();
+  set_timings(timings, t0, t1, t2, t3, c1, c2);
 
   fmpz_mpoly_clear(p, ctx);
   fmpz_mpoly_factor_clear(f, ctx);
@@ -197,26 +456,276 @@ void do_factor(int n_variables, const char** variables, int n_polys,
   fmpz_clear(c);
 }
 
-void solve(void (*f)(int, const char**, int, const char**, FILE*),
+void do_factor_nmod(int n_variables, const char** variables, int n_polys,
+                    const char** polys, FILE* out, timings_t* timings) {
+  if (n_polys != 1) {
+    error("npolys != 1");
+  }
+
+  nmod_mpoly_ctx_t ctx;
+  nmod_mpoly_t p;
+  nmod_mpoly_factor_t f;
+
+  nmod_mpoly_ctx_init(ctx, n_variables, ORD_LEX, modulus);
+  nmod_mpoly_init(p, ctx);
+  nmod_mpoly_factor_init(f, ctx);
+
+  int64_t t0 = get_nanoseconds();
+  if (nmod_mpoly_set_str_pretty(p, polys[0], variables, ctx)) {
+    error("failed to parse a polynomial");
+  }
+
+  int64_t c1 = get_cpu_nanoseconds();
+  int64_t t1 = get_nanoseconds();
+  int result = nmod_mpoly_factor(f, p, ctx);
+  int64_t t2 = get_nanoseconds();
+  int64_t c2 = get_cpu_nanoseconds();
+
+  if (result) {
+    slong n = nmod_mpoly_factor_length(f, ctx);
+    ulong c = nmod_mpoly_factor_get_constant_ui(f, ctx);
+    if (c != 1 || n == 0) {
+      flint_fprintf(out, ",%wu", c);
+    }
+    for (slong i = 0; i < n; i++) {
+      nmod_mpoly_factor_get_base(p, f, i, ctx);
+      slong k = nmod_mpoly_factor_get_exp_si(f, i, ctx);
+      fprintf(out, ",(");
+      nmod_mpoly_fprint_pretty(out, p, variables, ctx);
+      fprintf(out, ")^");
+      flint_fprintf(out, "%wd", k);
+    }
+  } else {
+    fprintf(out, ",FAILED");
+  }
+  int64_t t3 = get_nanoseconds();
+  set_timings(timings, t0, t1, t2, t3, c1, c2);
+
+  nmod_mpoly_clear(p, ctx);
+  nmod_mpoly_factor_clear(f, ctx);
+  nmod_mpoly_ctx_clear(ctx);
+}
+
+// Copy the contents of a file from the beginning to another file.
+void copy_file(FILE* from, FILE* to) {
+  char buf[4096];
+  size_t n;
+  rewind(from);
+  while ((n = fread(buf, 1, sizeof(buf), from)) > 0) {
+    if (fwrite(buf, 1, n, to) != n) {
+      error("failed to write a file");
+    }
+  }
+}
+
+void solve(void (*f)(int, const char**, int, const char**, FILE*, timings_t*),
            const char* s, int n_variables, const char** variables, FILE* out) {
   char* polys_str;
   char** polys;
   int n_polys = strsplit(s, ",", &polys_str, &polys);
 
-  f(n_variables, variables, n_polys, (const char**)polys, out);
+  // The answer is written into a temporary file first because the timings,
+  // including that for writing the answer, come first in the line.
+  FILE* tmp = tmpfile();
+  if (!tmp) {
+    error("failed to create a temporary file");
+  }
+
+  timings_t timings;
+  f(n_variables, variables, n_polys, (const char**)polys, tmp, &timings);
 
+  fprintf(out, "%" PRId64 ";%" PRId64 ";%" PRId64 ";%" PRId64, timings.compute,
+          timings.compute_cpu, timings.parse, timings.output);
+  copy_file(tmp, out);
+  fprintf(out, "\n");
+
+  fclose(tmp);
   free(polys_str);
   free(polys);
 }
 
+void solve_problem(char* line, int n_variables, const char** variables,
+                   FILE* out) {
+  char last_char = line[strlen(line) - 1];
+
+  if (strncmp(line, "gcd(", 4) == 0 && last_char == ')') {
+    char* s = &line[4];
+    s[strlen(s) - 1] = '\0';
+    solve(modulus ? do_gcd_nmod : do_gcd, s, n_variables, variables, out);
+  } else if (strncmp(line, "factor(", 7) == 0 && last_char == ')') {
+    char* s = &line[7];
+    s[strlen(s) - 1] = '\0';
+    solve(modulus ? do_factor_nmod : do_factor, s, n_variables, variables, out);
+  } else if (strncmp(line, "mul(", 4) == 0 && last_char == ')') {
+    char* s = &line[4];
+    s[strlen(s) - 1] = '\0';
+    solve(do_mul, s, n_variables, variables, out);
+  } else if (strncmp(line, "ratfun(", 7) == 0 && last_char == ')') {
+    char* s = &line[7];
+    s[strlen(s) - 1] = '\0';
+    solve(do_ratfun, s, n_variables, variables, out);
+  } else if (strncmp(line, "div(", 4) == 0 && last_char == ')') {
+    char* s = &line[4];
+    s[strlen(s) - 1] = '\0';
+    solve(do_div, s, n_variables, variables, out);
+  } else if (strncmp(line, "divisible(", 10) == 0 && last_char == ')') {
+    char* s = &line[10];
+    s[strlen(s) - 1] = '\0';
+    solve(do_divisible, s, n_variables, variables, out);
+  } else {
+    error("unsupported problem type");
+  }
+}
+
+// Throughput mode: problems are solved concurrently by a pool of worker
+// threads, taking the next unsolved problem one by one. The answers are kept in
+// memory and written in the original order.
+
+typedef struct {
+  char** lines;
+  char** answers;
+  int n_variables;
+  const char** variables;
+  int next;
+  int end;
+  pthread_mutex_t mutex;
+} job_queue_t;
+
+void* worker(void* arg) {
+  job_queue_t* q = (job_queue_t*)arg;
+
+  // Each worker writes answers into its own temporary file first.
+  FILE* tmp = tmpfile();
+  if (!tmp) {
+    error("failed to create a temporary file");
+  }
+
+  for (;;) {
+    pthread_mutex_lock(&q->mutex);
+    int i = q->next < q->end ? q->next++ : -1;
+    pthread_mutex_unlock(&q->mutex);
+    if (i < 0) {
+      break;
+    }
+
+    rewind(tmp);
+    solve_problem(q->lines[i], q->n_variables, q->variables, tmp);
+    int64_t size = ftell(tmp);
+    if (size < 0) {
+      error("failed to write a temporary file");
+    }
+    rewind(tmp);
+    char* answer = (char*)malloc2(sizeof(char) * (size + 1));
+    if (fread(answer, 1, size, tmp) != (size_t)size) {
+      error("failed to read a temporary file");
+    }
+    answer[size] = '\0';
+    q->answers[i] = answer;
+  }
+
+  fclose(tmp);
+  flint_cleanup();  // thread-local caches
+  return NULL;
+}
+
+void run_workers(job_queue_t* q, int begin, int end, int n_workers) {
+  q->next = begin;
+  q->end = end;
+
+  pthread_t* threads = (pthread_t*)malloc2(sizeof(pthread_t) * n_workers);
+
+  for (int i = 0; i < n_workers; i++) {
+    if (pthread_create(&threads[i], NULL, worker, q)) {
+      error("failed to create a thread");
+    }
+  }
+
+  for (int i = 0; i < n_workers; i++) {
+    pthread_join(threads[i], NULL);
+  }
+
+  free(threads);
+}
+
+void solve_concurrently(FILE* infile, FILE* outfile, FILE* summary_file,
+                        int n_variables, const char** variables, int n_workers,
+                        int n_warmups) {
+  int capacity = 16;
+  int n = 0;
+  char** lines = (char**)malloc2(sizeof(char*) * capacity);
+
+  for (;;) {
+    char* line = readline(infile);
+    if (!line) {
+      break;
+    }
+    if (n >= capacity) {
+      capacity *= 2;
+      lines = (char**)realloc2(lines, sizeof(char*) * capacity);
+    }
+    lines[n++] = line;
+  }
+
+  job_queue_t q;
+  q.lines = lines;
+  q.answers = (char**)malloc2(sizeof(char*) * (n > 0 ? n : 1));
+  q.n_variables = n_variables;
+  q.variables = variables;
+  pthread_mutex_init(&q.mutex, NULL);
+
+  if (n_warmups > n) {
+    n_warmups = n;
+  }
+
+  run_workers(&q, 0, n_warmups, n_workers);
+
+  int64_t t1 = get_nanoseconds();
+  run_workers(&q, n_warmups, n, n_workers);
+  int64_t t2 = get_nanoseconds();
+
+  pthread_mutex_destroy(&q.mutex);
+
+  for (int i = 0; i < n; i++) {
+    fputs(q.answers[i], outfile);
+    free(q.answers[i]);
+    free(lines[i]);
+  }
+
+  // The wall-clock time for the problems excluding the warm-ups.
+  fprintf(summary_file, "%g\n", (double)(t2 - t1) * 1.0e-9);
+
+  free(q.answers);
+  free(lines);
+}
+
 int main(int argc, char* argv[]) {
   if (argc == 2 && strcmp(argv[1], "-v") == 0) {
     printf("flint %s, %s\n", FLINT_VERSION, COMPILER_VERSION);
     exit(EXIT_SUCCESS);
   }
 
-  if (argc != 4) {
-    error("argc != 4");
+  // Usage: polybench-flint [-m modulus] variables input_file output_file
+  //            [n_threads [n_workers n_warmups summary_file]]
+  if (argc >= 3 && strcmp(argv[1], "-m") == 0) {
+    modulus = (ulong)parse_int(argv[2], 2, INT64_MAX);
+    argc -= 2;
+    argv += 2;
+  }
+
+  if (argc != 4 && argc != 5 && argc != 8) {
+    error("argc != 4 && argc != 5 && argc != 8");
+  }
+
+  if (argc >= 5) {
+    flint_set_num_threads((int)parse_int(argv[4], 1, 65536));
+  }
+
+  int n_workers = 0;
+  int n_warmups = 0;
+
+  if (argc == 8) {
+    n_workers = (int)parse_int(argv[5], 1, 65536);
+    n_warmups = (int)parse_int(argv[6], 0, INT32_MAX);
   }
 
   char* variables_str;
@@ -239,26 +748,35 @@ int main(int argc, char* argv[]) {
     error("cannot open the output file");
   }
 
-  for (;;) {
-    char* line = readline(infile);
-    if (!line) {
-      break;
+  // Metadata for the timings, which are written in nanoseconds.
+  const char* cpu_clock_name = "CLOCK_PROCESS_CPUTIME_ID";
+  if (n_workers > 0) {
+    cpu_clock = CLOCK_THREAD_CPUTIME_ID;
+    cpu_clock_name = "CLOCK_THREAD_CPUTIME_ID";
+  }
+  fprintf(outfile, "#wall_clock=CLOCK_MONOTONIC\n#cpu_clock=%s\n",
+          cpu_clock_name);
+
+  if (n_workers > 0) {
+    FILE* summary_file = fopen(argv[7], "w");
+
+    if (!summary_file) {
+      error("cannot open the summary file");
     }
 
-    char last_char = line[strlen(line) - 1];
+    solve_concurrently(infile, outfile, summary_file, n_variables,
+                       (const char**)variables, n_workers, n_warmups);
 
-    if (strncmp(line, "gcd(", 4) == 0 && last_char == ')') {
-      char* s = &line[4];
-      s[strlen(s) - 1] = '\0';
-      solve(do_gcd, s, n_variables, (const char**)variables, outfile);
-    } else if (strncmp(line, "factor(", 7) == 0 && last_char == ')') {
-      char* s = &line[7];
-      s[strlen(s) - 1] = '\0';
-      solve(do_factor, s, n_variables, (const char**)variables, outfile);
-    } else {
-      error("unsupported problem type");
+    fclose(summary_file);
+  } else {
+    for (;;) {
+      char* line = readline(infile);
+      if (!line) {
+        break;
+      }
+      solve_problem(line, n_variables, (const char**)variables, outfile);
+      free(line);
     }
-    free(line);
   }
 
   fclose(infile);
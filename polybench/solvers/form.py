@@ -4,7 +4,7 @@ import os
 import platform
 import shutil
 from pathlib import Path
-from typing import Optional, Sequence, cast
+from typing import List, Optional, Sequence, Union, cast
 
 from ..prob import ProblemSet
 from ..solver import Result, Solver, SolverSetupError
@@ -15,6 +15,32 @@ class FormSolver(Solver):
 
     _name = "FORM"
     _env_var = "FORM_COMMAND"
+    _supports_threads = True  # with TFORM
+
+    def _find_tform(self) -> Optional[str]:
+        # TFORM, the multi-threaded version, is looked for in the same way as FORM,
+        # or next to the FORM executable (as in the released binaries).
+        if "TFORM_COMMAND" in os.environ:
+            return shutil.which(os.environ["TFORM_COMMAND"])
+
+        tform = shutil.which("tform")
+
+        if tform:
+            return tform
+
+        form = self._find_form()
+
+        if form:
+            tform = str(Path(form).with_name("tform"))
+            if shutil.which(tform):
+                return tform
+
+        return None
+
+    def _find_executable(self) -> Optional[str]:
+        if self.threads > 1:
+            return self._find_tform()
+        return self._find_form()
 
     def _find_form(self) -> Optional[str]:
         env_cmd = self._env_var
@@ -53,7 +79,7 @@ class FormSolver(Solver):
         formpath = self.build_dir / distname / "form"
 
         if not formpath.exists():
-            tarpath = self.download(url, sha256, self.build_dir)
+            tarpath = self.download(url, sha256)  # in the download cache
 
             if not tarpath:
                 return None
@@ -68,12 +94,21 @@ class FormSolver(Solver):
         return str(formpath)
 
     def _prepare(self, problems: ProblemSet) -> Optional[str]:
-        if problems.problem_type not in ("gcd", "factor"):
+        if problems.problem_type not in (
+            "gcd",
+            "factor",
+            "mul",
+            "div",
+            "divisible",
+            "ratfun",
+        ):
             return None
 
-        form = self._find_form()
+        form = self._find_executable()
 
         if not form:
+            if self.threads > 1:
+                raise SolverSetupError("tform executable not found")
             raise SolverSetupError("executable not found")
 
         output = self.get_output([form, "-v"])
@@ -97,6 +132,9 @@ class FormSolver(Solver):
 
             print2("#-")
             print2(f"S {','.join(problems.variables)};")
+            if problems.problem_type == "ratfun":
+                print2("CF rat;")
+                print2("PolyRatFun rat;")
 
             for p in problems:
                 if p.problem_type == "gcd":
@@ -108,6 +146,45 @@ class FormSolver(Solver):
                     print2('#write "`TIMER_\'"')
                     print2("#message")
                     print2('#write "`$r\'"')
+                elif p.problem_type == "mul":
+                    print2(f"#$p = {p.p};")
+                    print2(f"#$q = {p.q};")
+                    print2("#message")
+                    print2("#reset timer")
+                    print2("#$r = $p * $q;")
+                    print2('#write "`TIMER_\'"')
+                    print2("#message")
+                    print2('#write "`$r\'"')
+                elif p.problem_type == "div":
+                    print2(f"#$p = {p.p};")
+                    print2(f"#$q = {p.q};")
+                    print2("#message")
+                    print2("#reset timer")
+                    print2("#$r = div_($p, $q);")
+                    print2('#write "`TIMER_\'"')
+                    print2("#message")
+                    print2('#write "`$r\'"')
+                elif p.problem_type == "divisible":
+                    # The remainder is written, which is converted to 1 or 0 later.
+                    print2(f"#$p = {p.p};")
+                    print2(f"#$q = {p.q};")
+                    print2("#message")
+                    print2("#reset timer")
+                    print2("#$r = rem_($p, $q);")
+                    print2('#write "`TIMER_\'"')
+                    print2("#message")
+                    print2('#write "`$r\'"')
+                elif p.problem_type == "ratfun":
+                    # The sum is normalized in a module; the result is rat(num,den).
+                    print2("#message")
+                    print2("#reset timer")
+                    print2(f"L F = rat({p.p},{p.q}) + rat({p.r},{p.s});")
+                    print2(".sort")
+                    print2('#write "`TIMER_\'"')
+                    print2("#message")
+                    print2('#write "%E", F')
+                    print2("Drop F;")
+                    print2(".sort")
                 elif p.problem_type == "factor":
                     print2(f"#$p = {p.p};")
                     print2("#message")
@@ -129,12 +206,16 @@ class FormSolver(Solver):
 
         # Run FORM.
 
-        form = self._find_form()
+        form = self._find_executable()
 
         if not form:
             return None
 
-        if not self.run([form, "-l", form_file]):
+        args: List[Union[str, Path, int]] = [form, "-l", form_file]
+        if self.threads > 1:
+            args[1:1] = ["-w", self.threads]
+
+        if not self.run(args):
             return None
 
         # Parse the log file.
@@ -170,13 +251,21 @@ class FormSolver(Solver):
         if get_next_entry() is None:
             return False
 
-        if mode == "gcd":
+        if mode in ("gcd", "mul", "div", "divisible", "ratfun"):
             with dest_path.open("w") as f:
                 while True:
                     t = get_next_entry()
                     a = get_next_entry()
                     if t is None or a is None or not t.isdigit():
                         break
+                    if mode == "divisible":
+                        a = "1" if a == "0" else "0"
+                    elif mode == "ratfun":
+                        # "rat(num,den)" -> "num,den"
+                        if a == "0":
+                            a = "0,1"
+                        elif a.startswith("rat(") and a.endswith(")"):
+                            a = a[4:-1]
                     print(f"{max(int(t), 1) / 1000},{a}", file=f)
         elif mode == "factor":
             with dest_path.open("w") as f:
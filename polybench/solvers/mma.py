@@ -14,6 +14,7 @@ class MathematicaSolver(Solver):
 
     _name = "Mathematica"
     _env_var = "WOLFRAMSCRIPT_COMMAND"
+    _supports_modulus = True
 
     def _find_wolframscript(self) -> Optional[str]:
         env_cmd = self._env_var
@@ -24,7 +25,14 @@ class MathematicaSolver(Solver):
         return shutil.which("wolframscript")
 
     def _prepare(self, problems: ProblemSet) -> Optional[str]:
-        if problems.problem_type not in ("gcd", "factor"):
+        if problems.problem_type not in (
+            "gcd",
+            "factor",
+            "mul",
+            "div",
+            "divisible",
+            "ratfun",
+        ):
             return None
 
         wolframscript = self._find_wolframscript()
@@ -49,47 +57,140 @@ class MathematicaSolver(Solver):
             def print2(s: str) -> None:
                 print(s, file=f)
 
+            if problems.modulus is not None:
+                print2(f"opts = {{Modulus -> {problems.modulus}}};")
+            else:
+                print2("opts = {};")
+
+            # Results with the wall-clock time (tw) and the CPU time (tc) for the
+            # computation, and the wall-clock times for the evaluation of the input
+            # (tp) and the conversion of the answer into a string (to), in
+            # nanoseconds.
+            print2("""
+                    SetAttributes[Measure, HoldFirst];
+                    Measure[x_] := Module[{tw, r},
+                        {tw, r} = AbsoluteTiming[Timing[x]];
+                        {tw, r[[1]], r[[2]]}
+                    ];
+                    Ns[x_] := ToString[Round[10^9 x]];
+                    WriteResult[tw_, tc_, to_, a_] := WriteLine[
+                        s,
+                        Ns[tw] <> ";" <> Ns[tc] <> ";" <> Ns[tp] <> ";" <> Ns[to]
+                        <> "," <> a
+                    ];
+                """)
+
+            print2('s = OpenWrite["output.csv"];')
+            print2('WriteLine[s, "#wall_clock=AbsoluteTiming"];')
+            print2('WriteLine[s, "#cpu_clock=Timing"];')
+
             if problems.problem_type == "gcd":
-                print2('s = OpenWrite["output.csv"];')
                 print2("""
-                        DoGCD[p_, q_] := Module[{r, t, a},
-                            r = Timing[PolynomialGCD[p, q]];
-                            t = r[[1]] // ToString;
-                            a = r[[2]] // InputForm // ToString;
-                            a = StringReplace[a, " " -> ""];
-                            WriteLine[s, t <> "," <> a];
+                        DoGCD[p_, q_] := Module[{r, tw, tc, a, to},
+                            {tw, tc, r} = Measure[
+                                PolynomialGCD[p, q, Sequence @@ opts]
+                            ];
+                            to = First[AbsoluteTiming[
+                                a = r // InputForm // ToString;
+                                a = StringReplace[a, " " -> ""];
+                            ]];
+                            WriteResult[tw, tc, to, a];
                         ];
                     """)
 
                 for p in problems:
-                    print2(f"p = {p.p};")
-                    print2(f"q = {p.q};")
+                    print2(f"tp = First[AbsoluteTiming[p = {p.p}; q = {p.q};]];")
                     print2("DoGCD[p, q];")
-
-                print2("Close[s];")
             elif problems.problem_type == "factor":
-                print2('s = OpenWrite["output.csv"];')
                 print2("""
-                        DoFactor[p_] := Module[{r, t, a, x1, x2},
-                            r = Timing[Factor[p]];
-                            t = r[[1]] // ToString;
-                            a = DeleteCases[List @@ (r[[2]] * x1 * x2), x1 | x2];
-                            a = a // InputForm // ToString;
-                            a = StringReplace[a, " " -> ""];
-                            a = StringReplace[a, "{" -> ""];
-                            a = StringReplace[a, "}" -> ""];
-                            WriteLine[s, t <> "," <> a];
+                        DoFactor[p_] := Module[{r, tw, tc, a, to, x1, x2},
+                            {tw, tc, r} = Measure[Factor[p, Sequence @@ opts]];
+                            to = First[AbsoluteTiming[
+                                a = DeleteCases[List @@ (r * x1 * x2), x1 | x2];
+                                a = a // InputForm // ToString;
+                                a = StringReplace[a, " " -> ""];
+                                a = StringReplace[a, "{" -> ""];
+                                a = StringReplace[a, "}" -> ""];
+                            ]];
+                            WriteResult[tw, tc, to, a];
                         ];
                     """)
 
                 for p in problems:
-                    print2(f"p = {p.p};")
+                    print2(f"tp = First[AbsoluteTiming[p = {p.p};]];")
                     print2("DoFactor[p];")
+            elif problems.problem_type == "mul":
+                print2("""
+                        DoMul[p_, q_] := Module[{r, tw, tc, a, to},
+                            {tw, tc, r} = Measure[Expand[p * q]];
+                            to = First[AbsoluteTiming[
+                                a = r // InputForm // ToString;
+                                a = StringReplace[a, " " -> ""];
+                            ]];
+                            WriteResult[tw, tc, to, a];
+                        ];
+                    """)
 
-                print2("Close[s];")
+                for p in problems:
+                    print2(f"tp = First[AbsoluteTiming[p = {p.p}; q = {p.q};]];")
+                    print2("DoMul[p, q];")
+            elif problems.problem_type == "ratfun":
+                print2("""
+                        DoRatfun[n1_, d1_, n2_, d2_] := Module[{r, tw, tc, a, to},
+                            {tw, tc, r} = Measure[Together[n1 / d1 + n2 / d2]];
+                            to = First[AbsoluteTiming[
+                                a = {Numerator[r], Denominator[r]};
+                                a = a // InputForm // ToString;
+                                a = StringReplace[a, " " -> ""];
+                                a = StringReplace[a, "{" -> ""];
+                                a = StringReplace[a, "}" -> ""];
+                            ]];
+                            WriteResult[tw, tc, to, a];
+                        ];
+                    """)
+
+                for p in problems:
+                    print2(
+                        f"tp = First[AbsoluteTiming[n1 = {p.p}; d1 = {p.q};"
+                        f" n2 = {p.r}; d2 = {p.s};]];"
+                    )
+                    print2("DoRatfun[n1, d1, n2, d2];")
+            elif problems.problem_type == "div":
+                print2(f"vars = {{{', '.join(problems.variables)}}};")
+                print2("""
+                        DoDiv[p_, q_] := Module[{r, tw, tc, a, to},
+                            {tw, tc, r} = Measure[PolynomialReduce[p, {q}, vars]];
+                            to = First[AbsoluteTiming[
+                                a = r[[1, 1]] // InputForm // ToString;
+                                a = StringReplace[a, " " -> ""];
+                            ]];
+                            WriteResult[tw, tc, to, a];
+                        ];
+                    """)
+
+                for p in problems:
+                    print2(f"tp = First[AbsoluteTiming[p = {p.p}; q = {p.q};]];")
+                    print2("DoDiv[p, q];")
+            elif problems.problem_type == "divisible":
+                print2(f"vars = {{{', '.join(problems.variables)}}};")
+                print2("""
+                        DoDivisible[p_, q_] := Module[{r, tw, tc, a, to},
+                            {tw, tc, r} = Measure[PolynomialReduce[p, {q}, vars]];
+                            to = First[AbsoluteTiming[
+                                a = If[r[[2]] === 0, "1", "0"];
+                            ]];
+                            WriteResult[tw, tc, to, a];
+                        ];
+                    """)
+
+                for p in problems:
+                    print2(f"tp = First[AbsoluteTiming[p = {p.p}; q = {p.q};]];")
+                    print2("DoDivisible[p, q];")
             else:
                 raise ValueError(f"unsupported problem type: {problems.problem_type}")
 
+            print2("Close[s];")
+
         # Run Mathematica.
 
         wolframscript = self._find_wolframscript()
@@ -0,0 +1,123 @@
+"""python-flint Solver."""
+
+from typing import Any, Callable, List, Optional, Sequence
+
+from ..poly import Polynomial
+from ..prob import Problem, ProblemSet
+from ..solver import InProcessSolver, Solver, SolverSetupError
+
+
+def _add_fractions(a: Any, b: Any, c: Any, d: Any) -> List[Any]:
+    # Return the canonical numerator and denominator of a/b + c/d, as done for
+    # fmpz_mpoly_q in FLINT: the fractions are reduced, and then added such that
+    # only the GCD of the denominators can remain as a common factor.
+    g = a.gcd(b)
+    a, b = a / g, b / g
+    g = c.gcd(d)
+    c, d = c / g, d / g
+    g = b.gcd(d)
+    b1 = b / g
+    t = a * (d / g) + c * b1
+    h = t.gcd(g)
+    num = t / h
+    den = b1 * (d / h)
+    if den.leading_coefficient() < 0:
+        num, den = -num, -den
+    return [num, den]
+
+
+class PythonFlintSolver(InProcessSolver):
+    """python-flint Solver (in-process, optional)."""
+
+    _name = "python-flint"
+    _supports_threads = True
+    _supports_modulus = True
+
+    def _prepare(self, problems: ProblemSet) -> Optional[str]:
+        if problems.problem_type not in (
+            "gcd",
+            "factor",
+            "mul",
+            "div",
+            "divisible",
+            "ratfun",
+        ):
+            return None
+
+        try:
+            import flint
+        except ImportError:
+            raise SolverSetupError("module not found (pip install python-flint)")
+
+        self._flint = flint
+        self._ctx: Any
+        if problems.modulus is not None:
+            self._ctx = flint.nmod_mpoly_ctx.get(
+                tuple(problems.variables), ordering="lex", modulus=problems.modulus
+            )
+        else:
+            self._ctx = flint.fmpz_mpoly_ctx.get(tuple(problems.variables), "lex")
+
+        return f"python-flint {flint.__version__}"
+
+    def _load(self, problem: Problem, problems: ProblemSet) -> Callable[[], Any]:
+        ctx = self._ctx
+        variables = problems.variables
+
+        # The number of threads is a global setting of FLINT.
+        self._flint.ctx.threads = self.threads
+
+        if problem.problem_type == "gcd":
+            p = ctx.from_dict(problem.p.to_dict(variables))
+            q = ctx.from_dict(problem.q.to_dict(variables))
+            return lambda: p.gcd(q)
+        elif problem.problem_type == "mul":
+            p = ctx.from_dict(problem.p.to_dict(variables))
+            q = ctx.from_dict(problem.q.to_dict(variables))
+            return lambda: p * q
+        elif problem.problem_type == "div":
+            p = ctx.from_dict(problem.p.to_dict(variables))
+            q = ctx.from_dict(problem.q.to_dict(variables))
+            return lambda: p / q  # exact division
+        elif problem.problem_type == "divisible":
+            p = ctx.from_dict(problem.p.to_dict(variables))
+            q = ctx.from_dict(problem.q.to_dict(variables))
+
+            def divisible() -> int:
+                try:
+                    p / q
+                except self._flint.utils.flint_exceptions.DomainError:
+                    return 0
+                return 1
+
+            return divisible
+        elif problem.problem_type == "ratfun":
+            p, q, r, s = (
+                ctx.from_dict(a.to_dict(variables))
+                for a in (problem.p, problem.q, problem.r, problem.s)
+            )
+            return lambda: _add_fractions(p, q, r, s)
+        elif problem.problem_type == "factor":
+            p = ctx.from_dict(problem.p.to_dict(variables))
+            return lambda: p.factor()
+
+        raise ValueError(f"unsupported problem type: {problem.problem_type}")
+
+    def _answer(self, result: Any) -> Sequence[Polynomial]:
+        if isinstance(result, tuple):
+            # factor: (content, [(factor, exponent), ...])
+            c, factors = result
+            answer = [Polynomial(str(c))]
+            for f, k in factors:
+                answer.append(Polynomial(f"({f})^{k}"))
+            return answer
+        if isinstance(result, list):
+            # ratfun: [numerator, denominator]
+            return [Polynomial.from_expanded(str(a)) for a in result]
+        if isinstance(result, int):
+            # divisible
+            return [Polynomial(result)]
+        return [Polynomial.from_expanded(str(result))]
+
+
+Solver.register_solver(PythonFlintSolver)
@@ -13,7 +13,7 @@ class ReformSolver(Solver):
     _name = "reFORM"
 
     def _prepare(self, problems: ProblemSet) -> Optional[str]:
-        if problems.problem_type not in ("gcd",):
+        if problems.problem_type not in ("gcd", "mul"):
             return None
 
         # Cargo build.
@@ -3,7 +3,7 @@ use std::fs::File;
 use std::io::Write;
 use std::io::{BufRead, BufReader, LineWriter};
 use std::str::FromStr;
-use std::time::Instant;
+use std::time::{Duration, Instant};
 
 use reform::poly::polynomial::{PolyPrinter, Polynomial};
 use reform::structure::{Element, VarInfo};
@@ -28,6 +28,12 @@ fn main() {
 
     let mut output = LineWriter::new(output_file);
 
+    // Metadata for the timings, which are written in nanoseconds.
+    writeln!(&mut output, "#wall_clock=std::time::Instant").unwrap();
+    if let Some(clock) = CPU_CLOCK {
+        writeln!(&mut output, "#cpu_clock={}", clock).unwrap();
+    }
+
     for line in BufReader::new(input_file).lines() {
         let mut line = line.unwrap();
 
@@ -40,22 +46,51 @@ fn main() {
             let mut poly2 = get_poly(polys[1], &mut var_info);
 
             // Compute the GCD.
+            let cpu_time = thread_cpu_time();
             let instant = Instant::now();
             let gcd = poly1.gcd(&mut poly2);
             let elapsed = instant.elapsed();
+            let cpu_elapsed = elapsed_since(cpu_time);
 
             // Write the elapsed time and result.
             writeln!(
                 &mut output,
-                "{}.{:06},{}",
-                elapsed.as_secs(),
-                elapsed.subsec_micros(),
+                "{};{},{}",
+                elapsed.as_nanos(),
+                cpu_elapsed.map_or(String::new(), |t| t.as_nanos().to_string()),
                 PolyPrinter {
                     poly: &gcd,
                     var_info: &var_info.global_info
                 }
             )
             .unwrap();
+        } else if line.starts_with("mul") {
+            // The format is "mul(poly1,poly2)". Extract poly1 and poly2.
+            line.pop();
+            let line = &line[4..];
+            let polys: Vec<_> = line.split(',').collect();
+            let poly1 = get_poly(polys[0], &mut var_info);
+            let poly2 = get_poly(polys[1], &mut var_info);
+
+            // Compute the product.
+            let cpu_time = thread_cpu_time();
+            let instant = Instant::now();
+            let product = poly1 * poly2;
+            let elapsed = instant.elapsed();
+            let cpu_elapsed = elapsed_since(cpu_time);
+
+            // Write the elapsed time and result.
+            writeln!(
+                &mut output,
+                "{};{},{}",
+                elapsed.as_nanos(),
+                cpu_elapsed.map_or(String::new(), |t| t.as_nanos().to_string()),
+                PolyPrinter {
+                    poly: &product,
+                    var_info: &var_info.global_info
+                }
+            )
+            .unwrap();
         } else {
             panic!("unsupported problem type");
         }
@@ -68,3 +103,33 @@ fn get_poly(expr: &str, var_info: &mut VarInfo) -> Polynomial {
     ne.normalize_inplace(&var_info.global_info);
     Polynomial::from(&ne).unwrap()
 }
+
+#[cfg(unix)]
+const CPU_CLOCK: Option<&str> = Some("CLOCK_THREAD_CPUTIME_ID");
+
+#[cfg(not(unix))]
+const CPU_CLOCK: Option<&str> = None;
+
+// Return the CPU time of the current thread, if available.
+#[cfg(unix)]
+fn thread_cpu_time() -> Option<Duration> {
+    // SAFETY: timespec is a plain C struct, and the pointer is valid.
+    let mut ts: libc::timespec = unsafe { std::mem::zeroed() };
+    if unsafe { libc::clock_gettime(libc::CLOCK_THREAD_CPUTIME_ID, &mut ts) } != 0 {
+        return None;
+    }
+    Some(Duration::new(ts.tv_sec as u64, ts.tv_nsec as u32))
+}
+
+#[cfg(not(unix))]
+fn thread_cpu_time() -> Option<Duration> {
+    None
+}
+
+// Return the CPU time elapsed since the given one.
+fn elapsed_since(cpu_time: Option<Duration>) -> Option<Duration> {
+    match (thread_cpu_time(), cpu_time) {
+        (Some(t2), Some(t1)) => Some(t2 - t1),
+        _ => None,
+    }
+}
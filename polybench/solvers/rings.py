@@ -1,6 +1,7 @@
 """Rings Solver."""
 
 import re
+from pathlib import Path
 from typing import Optional, Sequence
 
 from ..prob import ProblemSet
@@ -11,9 +12,19 @@ class RingsSolver(Solver):
     """Rings Solver."""
 
     _name = "Rings"
+    _supports_throughput = True
+    _supports_modulus = True
+    _supports_harness = True
 
     def _prepare(self, problems: ProblemSet) -> Optional[str]:
-        if problems.problem_type not in ("gcd", "factor"):
+        if problems.problem_type not in (
+            "gcd",
+            "factor",
+            "mul",
+            "div",
+            "divisible",
+            "ratfun",
+        ):
             return None
 
         # Gradle build.
@@ -39,12 +50,34 @@ class RingsSolver(Solver):
 
     def _solve(self, problems: ProblemSet) -> Optional[Sequence[Result]]:
         variables = ",".join(problems.variables)
+        if self.harness is not None:
+            # Each fork runs in a separate JVM.
+            log_files = [
+                self.output_dir / f"output.fork{k + 1}.csv"
+                for k in range(self.harness.forks)
+            ]
+            for log_file in log_files:
+                if not self._run_driver(problems, variables, log_file):
+                    return None
+            return self.parse_harness_logs(log_files)
         log_file = self.output_dir / "output.csv"  # Path(".") doesn't work
-        args = [variables, str(self.problem_file), str(log_file)]
-        args_as_one = " ".join(f'"{a}"' for a in args)
-        if not self.run([*self.gradlew_command, "run", "--args", args_as_one]):
+        if not self._run_driver(problems, variables, log_file):
+            return None
+        if not self.read_throughput_summary():
             return None
         return self.parse_csv_log(log_file)
 
+    def _run_driver(self, problems: ProblemSet, variables: str, log_file: Path) -> bool:
+        args = [
+            *self.harness_args(),
+            *self.modulus_args(problems),
+            variables,
+            str(self.problem_file),
+            str(log_file),
+            *self.throughput_args(problems),
+        ]
+        args_as_one = " ".join(f'"{a}"' for a in args)
+        return self.run([*self.gradlew_command, "run", "--args", args_as_one])
+
 
 Solver.register_solver(RingsSolver)
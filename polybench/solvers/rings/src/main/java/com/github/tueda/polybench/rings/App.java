@@ -1,74 +1,404 @@
 package com.github.tueda.polybench.rings;
 
+import cc.redberry.rings.Rational;
+import cc.redberry.rings.Rationals;
+import cc.redberry.rings.Ring;
+import cc.redberry.rings.Rings;
 import cc.redberry.rings.bigint.BigInteger;
+import cc.redberry.rings.poly.MultivariateRing;
 import cc.redberry.rings.poly.PolynomialFactorDecomposition;
+import cc.redberry.rings.poly.multivar.MultivariateDivision;
 import cc.redberry.rings.poly.multivar.MultivariateFactorization;
 import cc.redberry.rings.poly.multivar.MultivariateGCD;
 import cc.redberry.rings.poly.multivar.MultivariatePolynomial;
 import java.io.BufferedReader;
 import java.io.IOException;
 import java.io.PrintWriter;
+import java.lang.management.ManagementFactory;
+import java.lang.management.MemoryMXBean;
+import java.lang.management.ThreadMXBean;
 import java.nio.file.Files;
 import java.nio.file.Path;
 import java.nio.file.Paths;
+import java.util.Arrays;
+import java.util.List;
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.AtomicReference;
+import java.util.function.Function;
+import java.util.function.Supplier;
 
 /** Main application class. */
 @SuppressWarnings("PMD.UseUtilityClass")
 public class App {
-  /** Entry point. */
-  public static void main(final String[] args) throws IOException {
+  /** The bean for the CPU time of the current thread, which solves the problem. */
+  private static final ThreadMXBean THREAD_MX_BEAN = ManagementFactory.getThreadMXBean();
+
+  /** The bean for explicit garbage collections in the harness mode. */
+  private static final MemoryMXBean MEMORY_MX_BEAN = ManagementFactory.getMemoryMXBean();
+
+  /** The sink for the results in the harness mode (see {@link #consume}). */
+  @SuppressWarnings("PMD.AvoidUsingVolatile")
+  private static volatile int sink;
+
+  /**
+   * Entry point.
+   *
+   * <p>Usage: [-m modulus] [-wi n_warmup_iterations -i n_iterations] variables input_file
+   * output_file [n_workers n_warmups summary_file]
+   *
+   * <p>With "-i", the problems are solved in the harness mode (see {@link Task#measure}).
+   */
+  public static void main(final String[] argv) throws IOException, InterruptedException {
+    // The coefficient ring: a prime field if "-m modulus" is given, otherwise the integers.
+    Ring<BigInteger> ring = Rings.Z;
+    int nWarmupIterations = 0;
+    int nIterations = 0; // the harness mode if positive
+    String[] args = argv;
+    while (args.length >= 2 && args[0].startsWith("-")) {
+      if ("-m".equals(args[0])) {
+        ring = Rings.Zp(new BigInteger(args[1]));
+      } else if ("-wi".equals(args[0])) {
+        nWarmupIterations = Integer.parseInt(args[1]);
+      } else if ("-i".equals(args[0])) {
+        nIterations = Integer.parseInt(args[1]);
+      } else {
+        throw new IllegalArgumentException("unknown option: " + args[0]);
+      }
+      args = Arrays.copyOfRange(args, 2, args.length);
+    }
+
+    if (args.length != 3 && args.length != 6) {
+      throw new IllegalArgumentException("wrong number of arguments");
+    }
+    if (nIterations > 0 && args.length != 3) {
+      throw new IllegalArgumentException("harness mode not available in throughput mode");
+    }
+
     String[] variables = args[0].split(",");
     final Path inputFile = Paths.get(args[1]);
     final Path outputFile = Paths.get(args[2]);
 
+    if (args.length == 6) {
+      final int nWorkers = Integer.parseInt(args[3]);
+      final int nWarmups = Integer.parseInt(args[4]);
+      final Path summaryFile = Paths.get(args[5]);
+      if (nWorkers < 1) {
+        throw new IllegalArgumentException("n_workers must be positive");
+      }
+      final List<String> lines = Files.readAllLines(inputFile);
+      final String[] answers = new String[lines.size()];
+      final long elapsed = solveConcurrently(lines, answers, ring, variables, nWorkers, nWarmups);
+      try (PrintWriter out = new PrintWriter(Files.newBufferedWriter(outputFile))) {
+        printTimingMetadata(out);
+        for (String answer : answers) {
+          out.println(answer);
+        }
+      }
+      // The wall-clock time for the problems excluding the warm-ups.
+      try (PrintWriter out = new PrintWriter(Files.newBufferedWriter(summaryFile))) {
+        out.println(elapsed / 1.0e9);
+      }
+      return;
+    }
+
     try (BufferedReader in = Files.newBufferedReader(inputFile);
         PrintWriter out = new PrintWriter(Files.newBufferedWriter(outputFile))) {
+      printTimingMetadata(out);
       while (true) {
         final String line = in.readLine();
         if (line == null) {
           break;
         }
-        String answer;
-        if (line.startsWith("gcd")) {
-          answer = doGcd(line, variables);
-        } else if (line.startsWith("factor")) {
-          answer = doFactor(line, variables);
+        if (nIterations > 0) {
+          out.println(measureProblem(line, ring, nWarmupIterations, nIterations, variables));
         } else {
-          String problemType = line.length() > 8 ? line.substring(0, 8) + "..." : line;
-          throw new IllegalArgumentException("unknown problem type: " + problemType);
+          out.println(solveProblem(line, ring, variables));
         }
-        out.println(answer);
       }
     }
   }
 
-  private static String doGcd(final String line, final String... variables) {
+  /**
+   * Solves the problems concurrently by a pool of worker threads (throughput mode) and returns
+   * the elapsed time in nanoseconds excluding the warm-ups.
+   */
+  private static long solveConcurrently(
+      final List<String> lines,
+      final String[] answers,
+      final Ring<BigInteger> ring,
+      final String[] variables,
+      final int nWorkers,
+      final int nWarmups)
+      throws InterruptedException {
+    final int warmupEnd = Math.min(nWarmups, lines.size());
+    runWorkers(lines, answers, ring, variables, nWorkers, 0, warmupEnd);
+    final long t1 = System.nanoTime();
+    runWorkers(lines, answers, ring, variables, nWorkers, warmupEnd, lines.size());
+    final long t2 = System.nanoTime();
+    return t2 - t1;
+  }
+
+  private static void runWorkers(
+      final List<String> lines,
+      final String[] answers,
+      final Ring<BigInteger> ring,
+      final String[] variables,
+      final int nWorkers,
+      final int begin,
+      final int end)
+      throws InterruptedException {
+    final AtomicInteger next = new AtomicInteger(begin);
+    final AtomicReference<RuntimeException> failure = new AtomicReference<>();
+    final Thread[] workers = new Thread[nWorkers];
+    for (int k = 0; k < nWorkers; k++) {
+      workers[k] =
+          new Thread(
+              () -> {
+                try {
+                  while (true) {
+                    final int i = next.getAndIncrement();
+                    if (i >= end) {
+                      break;
+                    }
+                    answers[i] = solveProblem(lines.get(i), ring, variables);
+                  }
+                } catch (RuntimeException e) {
+                  failure.compareAndSet(null, e);
+                }
+              });
+      workers[k].start();
+    }
+    for (Thread worker : workers) {
+      worker.join(); // happens-before: the answers are visible after join
+    }
+    if (failure.get() != null) {
+      throw failure.get();
+    }
+  }
+
+  private static String solveProblem(
+      final String line, final Ring<BigInteger> ring, final String... variables) {
+    final long t0 = System.nanoTime();
+    return parseProblem(line, ring, variables).solve(t0);
+  }
+
+  private static String measureProblem(
+      final String line,
+      final Ring<BigInteger> ring,
+      final int nWarmups,
+      final int nIterations,
+      final String... variables) {
+    final long t0 = System.nanoTime();
+    return parseProblem(line, ring, variables).measure(t0, nWarmups, nIterations);
+  }
+
+  private static Task<?> parseProblem(
+      final String line, final Ring<BigInteger> ring, final String... variables) {
+    if (line.startsWith("gcd")) {
+      return parseGcd(line, ring, variables);
+    } else if (line.startsWith("factor")) {
+      return parseFactor(line, ring, variables);
+    } else if (line.startsWith("mul")) {
+      return parseMul(line, ring, variables);
+    } else if (line.startsWith("ratfun")) {
+      return parseRatfun(line, ring, variables);
+    } else if (line.startsWith("divisible(")) {
+      return parseDivisible(line, ring, variables);
+    } else if (line.startsWith("div(")) {
+      return parseDiv(line, ring, variables);
+    } else {
+      String problemType = line.length() > 8 ? line.substring(0, 8) + "..." : line;
+      throw new IllegalArgumentException("unknown problem type: " + problemType);
+    }
+  }
+
+  private static Task<MultivariatePolynomial<BigInteger>> parseGcd(
+      final String line, final Ring<BigInteger> ring, final String... variables) {
     String s = line.substring(4, line.length() - 1); // "gcd(p1,p2)"
     String[] input = s.split(",");
-    MultivariatePolynomial<BigInteger> p1 = MultivariatePolynomial.parse(input[0], variables);
-    MultivariatePolynomial<BigInteger> p2 = MultivariatePolynomial.parse(input[1], variables);
-    long t1 = System.nanoTime();
-    MultivariatePolynomial<BigInteger> gcd = MultivariateGCD.PolynomialGCD(p1, p2);
-    long t2 = System.nanoTime();
-    return (t2 - t1) / 1.0e9 + "," + gcd.toString(variables);
+    MultivariatePolynomial<BigInteger> p1 =
+        MultivariatePolynomial.parse(input[0], ring, variables);
+    MultivariatePolynomial<BigInteger> p2 =
+        MultivariatePolynomial.parse(input[1], ring, variables);
+    return new Task<>(() -> MultivariateGCD.PolynomialGCD(p1, p2), gcd -> gcd.toString(variables));
+  }
+
+  private static Task<MultivariatePolynomial<BigInteger>> parseMul(
+      final String line, final Ring<BigInteger> ring, final String... variables) {
+    String s = line.substring(4, line.length() - 1); // "mul(p1,p2)"
+    String[] input = s.split(",");
+    MultivariatePolynomial<BigInteger> p1 =
+        MultivariatePolynomial.parse(input[0], ring, variables);
+    MultivariatePolynomial<BigInteger> p2 =
+        MultivariatePolynomial.parse(input[1], ring, variables);
+    // multiply() works in place, so a copy is needed for repeated computations in the harness
+    // mode; it takes a negligible time compared to the multiplication.
+    return new Task<>(() -> p1.copy().multiply(p2), product -> product.toString(variables));
+  }
+
+  private static Task<MultivariatePolynomial<BigInteger>> parseDiv(
+      final String line, final Ring<BigInteger> ring, final String... variables) {
+    String s = line.substring(4, line.length() - 1); // "div(p1,p2)"
+    String[] input = s.split(",");
+    MultivariatePolynomial<BigInteger> p1 =
+        MultivariatePolynomial.parse(input[0], ring, variables);
+    MultivariatePolynomial<BigInteger> p2 =
+        MultivariatePolynomial.parse(input[1], ring, variables);
+    return new Task<>(
+        () -> MultivariateDivision.divideOrNull(p1, p2),
+        quotient -> quotient != null ? quotient.toString(variables) : "FAILED");
+  }
+
+  private static Task<Boolean> parseDivisible(
+      final String line, final Ring<BigInteger> ring, final String... variables) {
+    String s = line.substring(10, line.length() - 1); // "divisible(p1,p2)"
+    String[] input = s.split(",");
+    MultivariatePolynomial<BigInteger> p1 =
+        MultivariatePolynomial.parse(input[0], ring, variables);
+    MultivariatePolynomial<BigInteger> p2 =
+        MultivariatePolynomial.parse(input[1], ring, variables);
+    return new Task<>(
+        () -> MultivariateDivision.divideOrNull(p1, p2) != null,
+        divisible -> divisible ? "1" : "0");
   }
 
-  private static String doFactor(final String line, final String... variables) {
+  private static Task<Rational<MultivariatePolynomial<BigInteger>>> parseRatfun(
+      final String line, final Ring<BigInteger> ring, final String... variables) {
+    String s = line.substring(7, line.length() - 1); // "ratfun(n1,d1,n2,d2)"
+    String[] input = s.split(",");
+    MultivariatePolynomial<BigInteger> n1 =
+        MultivariatePolynomial.parse(input[0], ring, variables);
+    MultivariatePolynomial<BigInteger> d1 =
+        MultivariatePolynomial.parse(input[1], ring, variables);
+    MultivariatePolynomial<BigInteger> n2 =
+        MultivariatePolynomial.parse(input[2], ring, variables);
+    MultivariatePolynomial<BigInteger> d2 =
+        MultivariatePolynomial.parse(input[3], ring, variables);
+    MultivariateRing<MultivariatePolynomial<BigInteger>> polyRing =
+        Rings.MultivariateRing(variables.length, ring);
+    Rationals<MultivariatePolynomial<BigInteger>> field = Rings.Frac(polyRing);
+    // The constructor reduces the fraction.
+    return new Task<>(
+        () -> field.add(new Rational<>(polyRing, n1, d1), new Rational<>(polyRing, n2, d2)),
+        sum -> sum.numerator().toString(variables) + "," + sum.denominator().toString(variables));
+  }
+
+  private static Task<PolynomialFactorDecomposition<MultivariatePolynomial<BigInteger>>>
+      parseFactor(final String line, final Ring<BigInteger> ring, final String... variables) {
     String s = line.substring(7, line.length() - 1); // "factor(p)
-    MultivariatePolynomial<BigInteger> p = MultivariatePolynomial.parse(s, variables);
-    long t1 = System.nanoTime();
-    PolynomialFactorDecomposition<MultivariatePolynomial<BigInteger>> factors =
-        MultivariateFactorization.Factor(p);
-    long t2 = System.nanoTime();
-    StringBuilder result = new StringBuilder();
-    result.append((t2 - t1) / 1.0e9).append(',').append(factors.unit);
-    for (int i = 0; i < factors.size(); i++) {
-      result
-          .append(",(")
-          .append(factors.get(i).toString(variables))
-          .append(")^")
-          .append(factors.getExponent(i));
+    MultivariatePolynomial<BigInteger> p = MultivariatePolynomial.parse(s, ring, variables);
+    return new Task<>(
+        () -> MultivariateFactorization.Factor(p),
+        factors -> {
+          StringBuilder answer = new StringBuilder();
+          answer.append(factors.unit);
+          for (int i = 0; i < factors.size(); i++) {
+            answer
+                .append(",(")
+                .append(factors.get(i).toString(variables))
+                .append(")^")
+                .append(factors.getExponent(i));
+          }
+          return answer.toString();
+        });
+  }
+
+  /** A parsed problem: the computation to be timed and the conversion of its result. */
+  private static final class Task<T> {
+    private final Supplier<T> computation;
+    private final Function<T, String> formatter;
+
+    Task(final Supplier<T> computation, final Function<T, String> formatter) {
+      this.computation = computation;
+      this.formatter = formatter;
+    }
+
+    /** Solves the problem once and returns the result line; t0 is when the parsing started. */
+    String solve(final long t0) {
+      final long c1 = cpuTime();
+      final long t1 = System.nanoTime();
+      final T result = computation.get();
+      final long t2 = System.nanoTime();
+      final long c2 = cpuTime();
+      final String answer = formatter.apply(result);
+      final long t3 = System.nanoTime();
+      final long cpu = c1 < 0 || c2 < 0 ? -1 : c2 - c1;
+      return formatResult(t2 - t1, cpu, t1 - t0, t3 - t2, answer);
+    }
+
+    /**
+     * Solves the problem in the harness mode and returns the "#samples=" metadata line, giving
+     * the wall-clock times of the measurement iterations, and the result line with their mean.
+     *
+     * <p>The computation is run nWarmups times without measurement and then nIterations times
+     * with measurement, each preceded by a garbage collection so that garbage from the previous
+     * runs is not collected in the middle. Every result is consumed by {@link App#consume}
+     * against dead-code elimination.
+     */
+    String measure(final long t0, final int nWarmups, final int nIterations) {
+      final long t1 = System.nanoTime();
+      for (int i = 0; i < nWarmups; i++) {
+        consume(computation.get());
+      }
+      final StringBuilder samples = new StringBuilder("#samples=");
+      long wallTotal = 0;
+      long cpuTotal = 0;
+      T result = null;
+      for (int i = 0; i < nIterations; i++) {
+        MEMORY_MX_BEAN.gc(); // the same as System.gc()
+        final long c1 = cpuTime();
+        final long s1 = System.nanoTime();
+        result = computation.get();
+        final long s2 = System.nanoTime();
+        final long c2 = cpuTime();
+        consume(result);
+        samples.append(i > 0 ? ";" : "").append(s2 - s1);
+        wallTotal += s2 - s1;
+        cpuTotal = cpuTotal < 0 || c1 < 0 || c2 < 0 ? -1 : cpuTotal + c2 - c1;
+      }
+      final long t2 = System.nanoTime();
+      final String answer = formatter.apply(result);
+      final long t3 = System.nanoTime();
+      final long cpu = cpuTotal < 0 ? -1 : cpuTotal / nIterations;
+      return samples
+          + System.lineSeparator()
+          + formatResult(wallTotal / nIterations, cpu, t1 - t0, t3 - t2, answer);
     }
-    return result.toString();
+  }
+
+  /** Consumes a result in the harness mode such that the computation cannot be eliminated. */
+  private static void consume(final Object result) {
+    sink ^= System.identityHashCode(result); // volatile read and write
+  }
+
+  /** Writes the metadata lines for the timings, which are given in nanoseconds. */
+  private static void printTimingMetadata(final PrintWriter out) {
+    out.println("#wall_clock=System.nanoTime");
+    if (THREAD_MX_BEAN.isCurrentThreadCpuTimeSupported()) {
+      out.println("#cpu_clock=ThreadMXBean.getCurrentThreadCpuTime");
+    }
+  }
+
+  /** Returns the CPU time of the current thread in nanoseconds, or -1 if not available. */
+  private static long cpuTime() {
+    if (!THREAD_MX_BEAN.isCurrentThreadCpuTimeSupported()) {
+      return -1;
+    }
+    return THREAD_MX_BEAN.getCurrentThreadCpuTime();
+  }
+
+  /**
+   * Returns the result line: the elapsed times in nanoseconds for the computation (the
+   * wall-clock time and the CPU time, or -1 if not available), parsing the input and writing the
+   * answer, and the answer.
+   */
+  private static String formatResult(
+      final long compute,
+      final long cpu,
+      final long parse,
+      final long output,
+      final String answer) {
+    final String cpuString = cpu < 0 ? "" : String.valueOf(cpu);
+    return compute + ";" + cpuString + ";" + parse + ";" + output + "," + answer;
   }
 }
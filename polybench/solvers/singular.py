@@ -14,6 +14,7 @@ class SingularSolver(Solver):
 
     _name = "Singular"
     _env_var = "SINGULAR_COMMAND"
+    _supports_modulus = True
 
     def _find_singular(self) -> Optional[str]:
         env_cmd = self._env_var
@@ -24,9 +25,12 @@ class SingularSolver(Solver):
         return shutil.which("Singular")
 
     def _prepare(self, problems: ProblemSet) -> Optional[str]:
-        if problems.problem_type not in ("gcd", "factor"):
+        if problems.problem_type not in ("gcd", "factor", "mul", "div", "divisible"):
             return None
 
+        if problems.modulus is not None and problems.modulus > 2147483647:
+            return None  # Singular supports prime characteristics up to 2^31-1
+
         singular = self._find_singular()
 
         if not singular:
@@ -53,30 +57,69 @@ class SingularSolver(Solver):
             print2('LIB "poly.lib";')
             print2('LIB "polylib.lib";')
             print2("short=0;")
-            print2('system("--ticks-per-sec",1000);')
-            print2(f"ring R = 0, ({', '.join(problems.variables)}), dp;")
+            # The timers count in microseconds: rtimer for the wall-clock time and
+            # timer for the CPU time. The timings are written in nanoseconds.
+            print2('system("--ticks-per-sec",1000000);')
+            characteristic = problems.modulus if problems.modulus is not None else 0
+            print2(f"ring R = {characteristic}, ({', '.join(problems.variables)}), dp;")
             print2('link f = ":w output.csv";')
+            print2('fprintf(f, "#wall_clock=rtimer");')
+            print2('fprintf(f, "#cpu_clock=timer");')
+
+            def start_timer() -> None:
+                print2("int c1 = timer;")
+                print2("int t1 = rtimer;")
+
+            def stop_timer() -> None:
+                print2("int t2 = rtimer;")
+                print2("int c2 = timer;")
+                print2("bigint t = bigint(t2 - t1) * 1000;")
+                print2("bigint c = bigint(c2 - c1) * 1000;")
 
             for p in problems:
                 if p.problem_type == "gcd":
                     print2(f"poly p = {p.p};")
                     print2(f"poly q = {p.q};")
-                    print2("int t1 = timer;")
-                    print2("poly r = gcd(p, q) * gcd(content(p), content(q)));")
-                    print2("int t2 = timer;")
-                    print2("int t = t2 - t1;")
-                    print2('fprintf(f, "%s,%s", t, r);')
+                    start_timer()
+                    if problems.modulus is not None:
+                        print2("poly r = gcd(p, q);")
+                    else:
+                        print2("poly r = gcd(p, q) * gcd(content(p), content(q)));")
+                    stop_timer()
+                    print2('fprintf(f, "%s;%s,%s", t, c, r);')
+                elif p.problem_type == "mul":
+                    print2(f"poly p = {p.p};")
+                    print2(f"poly q = {p.q};")
+                    start_timer()
+                    print2("poly r = p * q;")
+                    stop_timer()
+                    print2('fprintf(f, "%s;%s,%s", t, c, r);')
+                elif p.problem_type == "div":
+                    print2(f"poly p = {p.p};")
+                    print2(f"poly q = {p.q};")
+                    start_timer()
+                    print2("list l = division(p, ideal(q));")
+                    stop_timer()
+                    print2("poly r = l[1][1, 1];")
+                    print2('fprintf(f, "%s;%s,%s", t, c, r);')
+                elif p.problem_type == "divisible":
+                    print2(f"poly p = {p.p};")
+                    print2(f"poly q = {p.q};")
+                    start_timer()
+                    print2("list l = division(p, ideal(q));")
+                    stop_timer()
+                    print2("int r = (l[2][1] == 0);")
+                    print2('fprintf(f, "%s;%s,%s", t, c, r);')
                 elif p.problem_type == "factor":
                     print2(f"poly p = {p.p};")
-                    print2("int t1 = timer;")
+                    start_timer()
                     print2("list l = factorize(p);")
-                    print2("int t2 = timer;")
-                    print2("int t = t2 - t1;")
+                    stop_timer()
                     print2('string s = "";')
                     print2("for (int i = 1; i <= size(l[1]); i++) {")
                     print2('  s = s + sprintf(",(%s)^%s", l[1][i], l[2][i]);')
                     print2("}")
-                    print2('fprintf(f, "%s%s", t, s);')
+                    print2('fprintf(f, "%s;%s%s", t, c, s);')
                 else:
                     raise ValueError(
                         f"unsupported problem type: {problems.problem_type}"
@@ -98,7 +141,7 @@ class SingularSolver(Solver):
 
         log_file = Path(".") / "output.csv"
 
-        return self.parse_csv_log(log_file, time_scaling=0.001)
+        return self.parse_csv_log(log_file)
 
 
 Solver.register_solver(SingularSolver)
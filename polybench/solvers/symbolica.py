@@ -13,11 +13,23 @@ class SymbolicaSolver(Solver):
     """Symbolica Solver."""
 
     _name = "Symbolica"
+    _supports_throughput = True
+    _supports_modulus = True
 
     def _prepare(self, problems: ProblemSet) -> Optional[str]:
-        if problems.problem_type not in ("gcd", "factor"):
+        if problems.problem_type not in (
+            "gcd",
+            "factor",
+            "mul",
+            "div",
+            "divisible",
+            "ratfun",
+        ):
             return None
 
+        if problems.modulus == 2:
+            return None  # the driver uses Zp64, which requires an odd prime
+
         # Cargo build.
 
         self.copy_resources()
@@ -35,7 +47,14 @@ class SymbolicaSolver(Solver):
     def _solve(self, problems: ProblemSet) -> Optional[Sequence[Result]]:
         variables = ",".join(problems.variables)
         log_file = Path(".") / "output.csv"
-        args = [variables, str(self.problem_file), str(log_file)]
+        args = [
+            *self.modulus_args(problems),
+            *self.degree_bound_args(problems),
+            variables,
+            str(self.problem_file),
+            str(log_file),
+            *self.throughput_args(problems),
+        ]
         if not self.run(
             [
                 f"{self._build_dir}/target/release/polybench-symbolica",
@@ -43,6 +62,8 @@ class SymbolicaSolver(Solver):
             ]
         ):
             return None
+        if not self.read_throughput_summary():
+            return None
         return self.parse_csv_log(log_file)
 
 
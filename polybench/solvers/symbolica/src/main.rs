@@ -1,17 +1,55 @@
 use std::env;
+use std::fmt::Write as _;
 use std::fs::File;
 use std::io::{BufRead, BufReader, LineWriter, Write};
 use std::sync::Arc;
-use std::time::Instant;
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::thread;
+use std::time::{Duration, Instant};
 use symbolica::atom::AtomCore;
+use symbolica::domains::Ring;
+use symbolica::domains::finite_field::Zp64;
 use symbolica::domains::integer::Z;
-use symbolica::poly::PolyVariable;
+use symbolica::domains::rational_polynomial::{FromNumeratorAndDenominator, RationalPolynomial};
 use symbolica::poly::factor::Factorize;
 use symbolica::poly::polynomial::MultivariatePolynomial;
+use symbolica::poly::{PolyVariable, PositiveExponent};
 use symbolica::{parse, symbol};
 
+// Usage: polybench-symbolica [-m modulus] [-d degree_bound] variables input_file
+//            output_file [n_workers n_warmups summary_file]
 fn main() {
-    let args: Vec<_> = env::args().collect();
+    let mut args: Vec<_> = env::args().collect();
+
+    // The prime field for problems over a prime field, or None for problems over the
+    // integers, and the upper bound on the exponents of the variables.
+    let mut field = None;
+    let mut degree_bound: u64 = 0;
+    while args.len() >= 3 && args[1].starts_with('-') {
+        match args[1].as_str() {
+            "-m" => field = Some(Zp64::new(args[2].parse().unwrap())),
+            "-d" => degree_bound = args[2].parse().unwrap(),
+            option => panic!("unknown option: {option}"),
+        }
+        args.drain(1..3);
+    }
+
+    // Use the narrowest exponents that can hold the degree bound.
+    if degree_bound <= u8::MAX.into() {
+        run::<u8>(&args, field.as_ref());
+    } else if degree_bound <= u16::MAX.into() {
+        run::<u16>(&args, field.as_ref());
+    } else if degree_bound <= u32::MAX.into() {
+        run::<u32>(&args, field.as_ref());
+    } else {
+        panic!("degree bound too large: {degree_bound}");
+    }
+}
+
+fn run<E: PositiveExponent>(args: &[String], field: Option<&Zp64>) {
+    if args.len() != 4 && args.len() != 7 {
+        panic!("wrong number of arguments");
+    }
 
     let variables: Vec<_> = args[1].split(',').collect();
     let input_filename = &args[2];
@@ -22,77 +60,391 @@ fn main() {
 
     let mut output = LineWriter::new(output_file);
 
+    // Metadata for the timings, which are written in nanoseconds.
+    writeln!(&mut output, "#wall_clock=std::time::Instant").unwrap();
+    if let Some(clock) = CPU_CLOCK {
+        writeln!(&mut output, "#cpu_clock={clock}").unwrap();
+    }
+
     let var_map: Arc<Vec<PolyVariable>> =
         Arc::new(variables.iter().map(|x| symbol!(x).into()).collect());
 
-    for line in BufReader::new(input_file).lines() {
-        let line = line.unwrap();
-
-        if line.starts_with("gcd") {
-            // The format is "gcd(poly1,poly2)". Extract poly1 and poly2.
-            let line = &line[4..line.len() - 1];
-            let poly_strs: Vec<_> = line.split(',').collect();
-            let poly1 = get_poly(poly_strs[0], &var_map);
-            let poly2 = get_poly(poly_strs[1], &var_map);
-
-            // Compute the GCD.
-            let instant = Instant::now();
-            let gcd = poly1.gcd(&poly2);
-            let elapsed = instant.elapsed();
-
-            // Write the elapsed time and result.
-            writeln!(
-                &mut output,
-                "{}.{:06},{}",
-                elapsed.as_secs(),
-                elapsed.subsec_micros(),
-                gcd
-            )
-            .unwrap();
-        } else if line.starts_with("factor") {
-            // The format is "factor(poly)". Extract poly.
-            let line = &line[7..line.len() - 1];
-            let poly_str = line;
-            let poly = get_poly(poly_str, &var_map);
-
-            // Perform factorization.
-            let instant = Instant::now();
-            let factors = poly.factor();
-            let elapsed = instant.elapsed();
-
-            // Write the elapsed time and result.
-            let mut monomial_factor = poly.one();
-            for (f, p) in &factors {
-                if f.nterms() == 1 {
-                    monomial_factor = monomial_factor * &f.pow(*p);
-                }
-            }
-            write!(
-                &mut output,
-                "{}.{:06}",
-                elapsed.as_secs(),
-                elapsed.subsec_micros()
-            )
+    if args.len() == 7 {
+        let n_workers: usize = args[4].parse().unwrap();
+        let n_warmups: usize = args[5].parse().unwrap();
+        let summary_filename = &args[6];
+
+        assert!(n_workers >= 1, "n_workers must be positive");
+
+        let lines: Vec<_> = BufReader::new(input_file)
+            .lines()
+            .collect::<Result<_, _>>()
             .unwrap();
-            if !monomial_factor.is_one() {
-                write!(&mut output, ",{monomial_factor}").unwrap();
-            }
-            for (f, p) in factors {
-                if f.nterms() != 1 {
-                    if p == 1 {
-                        write!(&mut output, ",{f}").unwrap();
-                    } else {
-                        write!(&mut output, ",({f})^{p}").unwrap();
-                    }
-                }
+
+        let (answers, elapsed) =
+            solve_concurrently::<E>(&lines, &var_map, field, n_workers, n_warmups);
+
+        for answer in answers {
+            writeln!(&mut output, "{answer}").unwrap();
+        }
+
+        // The wall-clock time for the problems excluding the warm-ups.
+        let mut summary_file = File::create(summary_filename).unwrap();
+        writeln!(
+            &mut summary_file,
+            "{}.{:06}",
+            elapsed.as_secs(),
+            elapsed.subsec_micros()
+        )
+        .unwrap();
+    } else {
+        for line in BufReader::new(input_file).lines() {
+            let line = line.unwrap();
+            let answer = solve_problem::<E>(&line, &var_map, field);
+            writeln!(&mut output, "{answer}").unwrap();
+        }
+    }
+}
+
+// Throughput mode: problems are solved concurrently by a pool of worker threads,
+// taking the next unsolved problem one by one. The answers are returned in the
+// original order, together with the elapsed time excluding the warm-ups.
+fn solve_concurrently<E: PositiveExponent>(
+    lines: &[String],
+    var_map: &Arc<Vec<PolyVariable>>,
+    field: Option<&Zp64>,
+    n_workers: usize,
+    n_warmups: usize,
+) -> (Vec<String>, std::time::Duration) {
+    let n_warmups = n_warmups.min(lines.len());
+
+    let mut answers = vec![String::new(); lines.len()];
+
+    let mut run_workers = |begin: usize, end: usize| {
+        let next = AtomicUsize::new(begin);
+        let results: Vec<Vec<(usize, String)>> = thread::scope(|s| {
+            let handles: Vec<_> = (0..n_workers)
+                .map(|_| {
+                    s.spawn(|| {
+                        let mut results = Vec::new();
+                        loop {
+                            let i = next.fetch_add(1, Ordering::Relaxed);
+                            if i >= end {
+                                break;
+                            }
+                            results.push((i, solve_problem::<E>(&lines[i], var_map, field)));
+                        }
+                        results
+                    })
+                })
+                .collect();
+            handles.into_iter().map(|h| h.join().unwrap()).collect()
+        });
+        for (i, answer) in results.into_iter().flatten() {
+            answers[i] = answer;
+        }
+    };
+
+    run_workers(0, n_warmups);
+
+    let instant = Instant::now();
+    run_workers(n_warmups, lines.len());
+    let elapsed = instant.elapsed();
+
+    (answers, elapsed)
+}
+
+// Solve the given problem and return the result line: the elapsed times (for the
+// computation, parsing the input and writing the answer) and answer.
+fn solve_problem<E: PositiveExponent>(
+    line: &str,
+    var_map: &Arc<Vec<PolyVariable>>,
+    field: Option<&Zp64>,
+) -> String {
+    if let Some(field) = field {
+        return solve_problem_zp::<E>(line, var_map, field);
+    }
+
+    let mut answer = String::new();
+    let parse_time;
+    let compute_time;
+    let output_time;
+
+    if line.starts_with("gcd") {
+        // The format is "gcd(poly1,poly2)". Extract poly1 and poly2.
+        let instant = Instant::now();
+        let line = &line[4..line.len() - 1];
+        let poly_strs: Vec<_> = line.split(',').collect();
+        let poly1 = get_poly::<E>(poly_strs[0], var_map);
+        let poly2 = get_poly::<E>(poly_strs[1], var_map);
+        parse_time = instant.elapsed();
+
+        // Compute the GCD.
+        let timer = Timer::start();
+        let gcd = poly1.gcd(&poly2);
+        compute_time = timer.elapsed();
+
+        // Write the result.
+        let instant = Instant::now();
+        write!(&mut answer, ",{gcd}").unwrap();
+        output_time = instant.elapsed();
+    } else if line.starts_with("mul") {
+        // The format is "mul(poly1,poly2)". Extract poly1 and poly2.
+        let instant = Instant::now();
+        let line = &line[4..line.len() - 1];
+        let poly_strs: Vec<_> = line.split(',').collect();
+        let poly1 = get_poly::<E>(poly_strs[0], var_map);
+        let poly2 = get_poly::<E>(poly_strs[1], var_map);
+        parse_time = instant.elapsed();
+
+        // Compute the product.
+        let timer = Timer::start();
+        let product = &poly1 * &poly2;
+        compute_time = timer.elapsed();
+
+        // Write the result.
+        let instant = Instant::now();
+        write!(&mut answer, ",{product}").unwrap();
+        output_time = instant.elapsed();
+    } else if line.starts_with("ratfun") {
+        // The format is "ratfun(num1,den1,num2,den2)". Extract the polynomials.
+        let instant = Instant::now();
+        let line = &line[7..line.len() - 1];
+        let poly_strs: Vec<_> = line.split(',').collect();
+        let num1 = get_poly::<E>(poly_strs[0], var_map);
+        let den1 = get_poly::<E>(poly_strs[1], var_map);
+        let num2 = get_poly::<E>(poly_strs[2], var_map);
+        let den2 = get_poly::<E>(poly_strs[3], var_map);
+        parse_time = instant.elapsed();
+
+        // Normalize the sum of the rational functions.
+        let timer = Timer::start();
+        let f1: RationalPolynomial<_, E> = RationalPolynomial::from_num_den(num1, den1, &Z, true);
+        let f2: RationalPolynomial<_, E> = RationalPolynomial::from_num_den(num2, den2, &Z, true);
+        let sum = &f1 + &f2;
+        compute_time = timer.elapsed();
+
+        // Write the result.
+        let instant = Instant::now();
+        write!(&mut answer, ",{},{}", sum.numerator, sum.denominator).unwrap();
+        output_time = instant.elapsed();
+    } else if line.starts_with("divisible(") {
+        // The format is "divisible(poly1,poly2)". Extract poly1 and poly2.
+        let instant = Instant::now();
+        let line = &line[10..line.len() - 1];
+        let poly_strs: Vec<_> = line.split(',').collect();
+        let poly1 = get_poly::<E>(poly_strs[0], var_map);
+        let poly2 = get_poly::<E>(poly_strs[1], var_map);
+        parse_time = instant.elapsed();
+
+        // Test the divisibility.
+        let timer = Timer::start();
+        let divisible = poly1.divides(&poly2).is_some();
+        compute_time = timer.elapsed();
+
+        // Write the result.
+        let instant = Instant::now();
+        write!(&mut answer, ",{}", if divisible { 1 } else { 0 }).unwrap();
+        output_time = instant.elapsed();
+    } else if line.starts_with("div(") {
+        // The format is "div(poly1,poly2)". Extract poly1 and poly2.
+        let instant = Instant::now();
+        let line = &line[4..line.len() - 1];
+        let poly_strs: Vec<_> = line.split(',').collect();
+        let poly1 = get_poly::<E>(poly_strs[0], var_map);
+        let poly2 = get_poly::<E>(poly_strs[1], var_map);
+        parse_time = instant.elapsed();
+
+        // Compute the exact quotient.
+        let timer = Timer::start();
+        let quotient = poly1.divides(&poly2);
+        compute_time = timer.elapsed();
+
+        // Write the result.
+        let instant = Instant::now();
+        match quotient {
+            Some(q) => write!(&mut answer, ",{q}").unwrap(),
+            None => write!(&mut answer, ",FAILED").unwrap(),
+        }
+        output_time = instant.elapsed();
+    } else if line.starts_with("factor") {
+        // The format is "factor(poly)". Extract poly.
+        let instant = Instant::now();
+        let line = &line[7..line.len() - 1];
+        let poly_str = line;
+        let poly = get_poly::<E>(poly_str, var_map);
+        parse_time = instant.elapsed();
+
+        // Perform factorization.
+        let timer = Timer::start();
+        let factors = poly.factor();
+        compute_time = timer.elapsed();
+
+        // Write the result.
+        let instant = Instant::now();
+        write_factors(&mut answer, poly.one(), factors);
+        output_time = instant.elapsed();
+    } else {
+        panic!("unsupported problem type");
+    }
+
+    format_result(parse_time, compute_time, output_time, &answer)
+}
+
+// Solve the given problem over the prime field and return the result line.
+fn solve_problem_zp<E: PositiveExponent>(
+    line: &str,
+    var_map: &Arc<Vec<PolyVariable>>,
+    field: &Zp64,
+) -> String {
+    let mut answer = String::new();
+    let parse_time;
+    let compute_time;
+    let output_time;
+
+    if line.starts_with("gcd") {
+        // The format is "gcd(poly1,poly2)". Extract poly1 and poly2.
+        let instant = Instant::now();
+        let line = &line[4..line.len() - 1];
+        let poly_strs: Vec<_> = line.split(',').collect();
+        let poly1 = get_poly_zp::<E>(poly_strs[0], var_map, field);
+        let poly2 = get_poly_zp::<E>(poly_strs[1], var_map, field);
+        parse_time = instant.elapsed();
+
+        // Compute the GCD.
+        let timer = Timer::start();
+        let gcd = poly1.gcd(&poly2);
+        compute_time = timer.elapsed();
+
+        // Write the result.
+        let instant = Instant::now();
+        write!(&mut answer, ",{gcd}").unwrap();
+        output_time = instant.elapsed();
+    } else if line.starts_with("factor") {
+        // The format is "factor(poly)". Extract poly.
+        let instant = Instant::now();
+        let line = &line[7..line.len() - 1];
+        let poly_str = line;
+        let poly = get_poly_zp::<E>(poly_str, var_map, field);
+        parse_time = instant.elapsed();
+
+        // Perform factorization.
+        let timer = Timer::start();
+        let factors = poly.factor();
+        compute_time = timer.elapsed();
+
+        // Write the result.
+        let instant = Instant::now();
+        write_factors(&mut answer, poly.one(), factors);
+        output_time = instant.elapsed();
+    } else {
+        panic!("unsupported problem type over a prime field");
+    }
+
+    format_result(parse_time, compute_time, output_time, &answer)
+}
+
+// Write the factors, with the monomial factors collected into one factor.
+fn write_factors<R: Ring, E: PositiveExponent>(
+    output: &mut String,
+    one: MultivariatePolynomial<R, E>,
+    factors: Vec<(MultivariatePolynomial<R, E>, usize)>,
+) {
+    let mut monomial_factor = one;
+    for (f, p) in &factors {
+        if f.nterms() == 1 {
+            monomial_factor = monomial_factor * &f.pow(*p);
+        }
+    }
+    if !monomial_factor.is_one() {
+        write!(output, ",{monomial_factor}").unwrap();
+    }
+    for (f, p) in factors {
+        if f.nterms() != 1 {
+            if p == 1 {
+                write!(output, ",{f}").unwrap();
+            } else {
+                write!(output, ",({f})^{p}").unwrap();
             }
-            writeln!(&mut output).unwrap();
-        } else {
-            panic!("unsupported problem type");
         }
     }
 }
 
-fn get_poly(expr: &str, var_map: &Arc<Vec<PolyVariable>>) -> MultivariatePolynomial<Z, u8> {
+// Return the result line: the elapsed times in nanoseconds (the wall-clock time
+// and CPU time for the computation, parsing the input and writing the answer)
+// followed by the answer, which starts with a comma.
+fn format_result(
+    parse_time: Duration,
+    compute_time: (Duration, Option<Duration>),
+    output_time: Duration,
+    answer: &str,
+) -> String {
+    let (wall_time, cpu_time) = compute_time;
+    format!(
+        "{};{};{};{}{answer}",
+        wall_time.as_nanos(),
+        cpu_time.map_or(String::new(), |t| t.as_nanos().to_string()),
+        parse_time.as_nanos(),
+        output_time.as_nanos()
+    )
+}
+
+// Timer for the wall-clock time (monotonic) and the CPU time of the current
+// thread, which solves the problem also in the throughput mode.
+struct Timer {
+    instant: Instant,
+    cpu_time: Option<Duration>,
+}
+
+impl Timer {
+    fn start() -> Self {
+        let cpu_time = thread_cpu_time();
+        Timer {
+            instant: Instant::now(),
+            cpu_time,
+        }
+    }
+
+    // Return the elapsed wall-clock time and CPU time (if available).
+    fn elapsed(&self) -> (Duration, Option<Duration>) {
+        let wall_time = self.instant.elapsed();
+        let cpu_time = thread_cpu_time().zip(self.cpu_time).map(|(t2, t1)| t2 - t1);
+        (wall_time, cpu_time)
+    }
+}
+
+const CPU_CLOCK: Option<&str> = if cfg!(unix) {
+    Some("CLOCK_THREAD_CPUTIME_ID")
+} else {
+    None
+};
+
+#[cfg(unix)]
+fn thread_cpu_time() -> Option<Duration> {
+    // SAFETY: timespec is a plain C struct, and the pointer is valid.
+    let mut ts: libc::timespec = unsafe { std::mem::zeroed() };
+    if unsafe { libc::clock_gettime(libc::CLOCK_THREAD_CPUTIME_ID, &mut ts) } != 0 {
+        return None;
+    }
+    Some(Duration::new(ts.tv_sec as u64, ts.tv_nsec as u32))
+}
+
+#[cfg(not(unix))]
+fn thread_cpu_time() -> Option<Duration> {
+    None
+}
+
+fn get_poly_zp<E: PositiveExponent>(
+    expr: &str,
+    var_map: &Arc<Vec<PolyVariable>>,
+    field: &Zp64,
+) -> MultivariatePolynomial<Zp64, E> {
+    parse!(expr).to_polynomial(field, Some(Arc::clone(var_map)))
+}
+
+fn get_poly<E: PositiveExponent>(
+    expr: &str,
+    var_map: &Arc<Vec<PolyVariable>>,
+) -> MultivariatePolynomial<Z, E> {
     parse!(expr).to_polynomial(&Z, Some(Arc::clone(var_map)))
 }
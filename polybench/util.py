@@ -2,8 +2,13 @@
 
 import contextlib
 import os
+import sys
+import threading
+import time
 from pathlib import Path
-from typing import Iterator, Union
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+import psutil
 
 
 def bytes2human(n: int) -> str:
@@ -26,6 +31,47 @@ def bytes2human(n: int) -> str:
     return "%sB" % n
 
 
+def human2bytes(s: str) -> int:
+    """Convert a human readable string into the number of bytes.
+
+    The suffixes are binary as in `bytes2human`; an optional trailing ``B`` is
+    ignored.
+
+    >>> human2bytes("512")
+    512
+    >>> human2bytes("1.5K")
+    1536
+    >>> human2bytes("4GB")
+    4294967296
+    """
+    symbols = "KMGTPEZY"
+    t = s.strip().upper()
+    if t.endswith("B"):
+        t = t[:-1]
+    scale = 1
+    if t and t[-1] in symbols:
+        scale = 1 << (symbols.index(t[-1]) + 1) * 10
+        t = t[:-1]
+    try:
+        value = float(t)
+    except ValueError:
+        raise ValueError(f"invalid size: {s}") from None
+    if value < 0:
+        raise ValueError(f"invalid size: {s}")
+    return int(value * scale)
+
+
+def user_cache_dir() -> Path:
+    """Return the user-level cache directory for this package."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = str(Path.home() / "Library" / "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "polybench"
+
+
 @contextlib.contextmanager
 def pushd(new_dir: Union[Path, str]) -> Iterator[None]:
     """Pushd/popd context."""
@@ -36,3 +82,196 @@ def pushd(new_dir: Union[Path, str]) -> Iterator[None]:
         yield
     finally:
         os.chdir(previous_dir)
+
+
+def perf_counter_ns() -> int:
+    """Return the value of the performance counter in nanoseconds.
+
+    This is `time.perf_counter_ns` with a fallback for Python 3.6.
+    """
+    if hasattr(time, "perf_counter_ns"):
+        return time.perf_counter_ns()
+    return int(time.perf_counter() * 1e9)  # pragma: no cover
+
+
+def process_time_ns() -> int:
+    """Return the CPU time of the current process in nanoseconds.
+
+    This is `time.process_time_ns` with a fallback for Python 3.6.
+    """
+    if hasattr(time, "process_time_ns"):
+        return time.process_time_ns()
+    return int(time.process_time() * 1e9)  # pragma: no cover
+
+
+def kill_descendants(pid: int) -> None:
+    """Kill the descendants of the process with the given pid."""
+    try:
+        children = psutil.Process(pid).children(recursive=True)
+    except psutil.Error:
+        return
+    for c in children:
+        try:
+            c.kill()
+        except psutil.Error:
+            pass
+
+
+class PeakMemorySampler:
+    """Sample the peak memory usage of a process and its descendants.
+
+    The total resident set size is sampled periodically in a background thread
+    while in the context, so a short peak between two samples can be missed.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.02) -> None:
+        """Construct a sampler for the process with the given pid."""
+        self._pid = pid
+        self._interval = interval
+        self._peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self) -> "PeakMemorySampler":
+        """Start sampling."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak(self) -> int:
+        """Return the peak resident set size in bytes (0 if never sampled)."""
+        return self._peak
+
+    def _sample(self) -> None:
+        try:
+            process = psutil.Process(self._pid)
+        except psutil.Error:
+            return
+        while True:
+            try:
+                processes = [process, *process.children(recursive=True)]
+            except psutil.Error:
+                break  # the process has gone
+            rss = 0
+            for p in processes:
+                try:
+                    rss += p.memory_info().rss
+                except psutil.Error:
+                    pass
+            self._peak = max(self._peak, rss)
+            self._record(processes, rss)
+            if self._stop.wait(self._interval):
+                break
+
+    def _record(self, processes: Sequence[psutil.Process], rss: int) -> None:
+        # Called for each sample with the processes and their total RSS.
+        pass
+
+
+class ProgressCounter:
+    """Count the rows (except ``#`` lines) written into a file by a solver.
+
+    The file is read incrementally, so the count can be updated frequently while
+    a driver writes the results one by one.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Construct a counter for the given file."""
+        self._path = path
+        self._offset = 0
+        self._count = 0
+
+    def count(self) -> int:
+        """Return the number of complete rows written so far."""
+        try:
+            with self._path.open("rb") as f:
+                if f.seek(0, os.SEEK_END) < self._offset:
+                    self._offset = 0  # rewritten
+                    self._count = 0
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return self._count  # not written yet
+        end = data.rfind(b"\n") + 1
+        self._count += sum(
+            1 for line in data[:end].splitlines() if line and not line.startswith(b"#")
+        )
+        self._offset += end
+        return self._count
+
+
+class ResourceSample(NamedTuple):
+    """Sample of the resource usage of a process and its descendants."""
+
+    time: float  # in seconds since the origin
+    rss: int  # total resident set size in bytes
+    cpu_percent: float  # since the previous sample (100 for a fully used CPU)
+    threads: int
+    results: Optional[int]  # rows written into the progress file so far
+
+
+class ResourceSampler(PeakMemorySampler):
+    """Sample the memory, CPU usage and threads of a process and its descendants.
+
+    In addition to the peak memory usage, the samples are recorded as a timeline,
+    with the time measured from `origin` (in seconds since the epoch). If
+    `progress_file` is given, the number of rows (except ``#`` lines) written into
+    it so far is also recorded, which gives the boundaries between the problems
+    for drivers writing the results one by one.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        interval: float = 0.02,
+        *,
+        origin: float = 0.0,
+        progress_file: Optional[Path] = None,
+    ) -> None:
+        """Construct a sampler for the process with the given pid."""
+        super().__init__(pid, interval)
+        self._origin = origin
+        self._progress = ProgressCounter(progress_file) if progress_file else None
+        self._samples: List[ResourceSample] = []
+        self._cpu_times: Dict[int, float] = {}
+        self._last_time: Optional[float] = None
+
+    @property
+    def samples(self) -> Sequence[ResourceSample]:
+        """Return the samples."""
+        return tuple(self._samples)
+
+    def _record(self, processes: Sequence[psutil.Process], rss: int) -> None:
+        if rss == 0:
+            return  # the process has exited but not been reaped yet
+        now = time.time()
+        cpu_times = {}
+        threads = 0
+        for p in processes:
+            try:
+                with p.oneshot():
+                    t = p.cpu_times()
+                    cpu_times[p.pid] = t.user + t.system
+                    threads += p.num_threads()
+            except psutil.Error:
+                pass
+        cpu_percent = 0.0
+        if self._last_time is not None and now > self._last_time:
+            used = sum(t - self._cpu_times.get(i, 0.0) for i, t in cpu_times.items())
+            cpu_percent = max(used, 0.0) / (now - self._last_time) * 100
+        self._cpu_times = cpu_times
+        self._last_time = now
+        self._samples.append(
+            ResourceSample(
+                now - self._origin,
+                rss,
+                cpu_percent,
+                threads,
+                self._progress.count() if self._progress else None,
+            )
+        )
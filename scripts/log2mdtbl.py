@@ -1,8 +1,9 @@
-"""Generate a Markdown table from a log file."""
+"""Generate a Markdown table from a log file or an event log (JSON lines)."""
 
 from __future__ import annotations
 
 import fileinput
+import json
 from typing import Sequence
 
 
@@ -12,6 +13,18 @@ def extract_rows(file_input: fileinput.FileInput[str]) -> list[tuple[str, str]]:
     tools = set()
 
     for line in file_input:
+        if line.startswith("{"):
+            # JSON lines from the event log.
+            obj = json.loads(line)
+            if obj["event"] == "environment":
+                for k, v in obj.items():
+                    if k not in ("timestamp", "event", "logger"):
+                        rows.append((k, str(v)))
+            elif obj["event"] == "prepare" and obj.get("version"):
+                if obj["solver"] not in tools:
+                    tools.add(obj["solver"])
+                    rows.append((obj["solver"], obj["version"]))
+            continue
         a = line.split("[", 1)
         s = a[1].strip()
         a = s.split("]", 1)
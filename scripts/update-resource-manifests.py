@@ -0,0 +1,62 @@
+"""Update the manifests of the solver resource files.
+
+The manifests `polybench/solvers/{name}.manifest.json` record the SHA-256 hash of
+each file (tracked by Git) in the resource directories. They are used to copy
+only the changed files into the build directories.
+
+Usage: python scripts/update-resource-manifests.py [--check]
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parent.parent
+SOLVERS_DIR = ROOT / "polybench" / "solvers"
+
+sys.path.insert(0, str(ROOT))
+
+from polybench.solver import Solver  # noqa: E402
+
+
+def make_manifest(src_dir: Path) -> Dict[str, str]:
+    """Return the manifest of the tracked files in the given directory."""
+    output = subprocess.check_output(  # noqa: S603,S607
+        ["git", "ls-files", "-z", "--", "."],
+        cwd=str(src_dir),
+        universal_newlines=True,
+    )
+    result = {}
+    for name in sorted(s for s in output.split("\0") if s):
+        p = src_dir / name
+        if p.is_file():
+            result[Path(name).as_posix()] = Solver.sha256(p)
+    return result
+
+
+def main() -> int:
+    """Entry point."""
+    check = "--check" in sys.argv[1:]
+    outdated = []
+
+    for src_dir in sorted(SOLVERS_DIR.iterdir()):
+        if not src_dir.is_dir() or src_dir.name == "__pycache__":
+            continue
+        manifest_file = SOLVERS_DIR / f"{src_dir.name}.manifest.json"
+        text = json.dumps(make_manifest(src_dir), indent=2, sort_keys=True) + "\n"
+        if manifest_file.is_file() and manifest_file.read_text() == text:
+            continue
+        outdated.append(manifest_file)
+        if not check:
+            manifest_file.write_text(text)
+
+    for f in outdated:
+        print(f"{'outdated' if check else 'updated'}: {f.relative_to(ROOT)}")
+
+    return 1 if check and outdated else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,544 @@
+import json
+import logging
+import os
+import random
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import pytest
+
+from polybench import Config, ResultTable, run
+from polybench.api import (
+    PerfStats,
+    Scaling,
+    SolverResult,
+    check_results,
+    detect_warmup,
+    find_outliers,
+    run_solvers,
+)
+from polybench.events import EVENT, ChromeTraceHandler, JsonLinesHandler, timed
+from polybench.poly import Polynomial
+from polybench.prob import ProblemSet
+from polybench.profiler import PhaseProfiler, profile_phase, set_active_profiler
+from polybench.solver import Result, Solver
+
+
+def test_config_resolved() -> None:
+    config = Config(max_n_terms=8, max_degree=20, max_coeff=100).resolved()
+
+    assert config.min_n_terms == 6
+    assert config.min_degree == 15
+    assert config.min_coeff == -100
+    assert config.build_dir == (Path(".") / "build").resolve()
+    assert config.output_dir is None
+
+    config = Config(exp_dist="sharp").resolved()
+
+    assert config.min_degree == 0
+
+
+def test_make_problems_keeps_global_random_state() -> None:
+    config = Config(n_problems=2, n_warmups=1, max_n_terms=3, max_degree=3)
+
+    state = random.getstate()
+    problems1 = config.make_problems()
+    assert random.getstate() == state
+
+    problems2 = config.make_problems()
+
+    assert len(problems1) == 3
+    assert [str(p) for p in problems1] == [str(p) for p in problems2]
+
+
+def test_result_table() -> None:
+    problems = Config(
+        n_problems=2, n_warmups=1, max_n_terms=3, max_degree=3
+    ).make_problems()
+    answer = [Polynomial(1)]
+    table = ResultTable(
+        problems,
+        {"A": [Result(3.0, answer), Result(1.0, answer), Result(2.0, answer)]},
+        versions={"A": "1.0"},
+    )
+
+    assert len(table) == 1
+    assert list(table) == ["A"]
+    assert table.names == ("A",)
+    assert table.versions == {"A": "1.0"}
+    assert not table.wrong
+    assert table.times("A") == (1.0, 2.0)
+    assert table.times("A", include_warmups=True) == (3.0, 1.0, 2.0)
+
+
+def test_result_table_scaling() -> None:
+    problems = Config(
+        n_problems=2, n_warmups=1, max_n_terms=3, max_degree=3
+    ).make_problems()
+    answer = [Polynomial(1)]
+
+    def results(t: float) -> List[Result]:
+        return [Result(t, answer)] * 3
+
+    table = ResultTable(
+        problems,
+        {"A": results(4.0), "A-4t": results(2.0), "B": results(1.0)},
+        threads={"A": ("A", 1), "A-4t": ("A", 4), "B": ("B", 1)},
+    )
+
+    assert table.scaling() == (
+        Scaling("A", 1, 8.0, 1.0, 1.0),
+        Scaling("A", 4, 4.0, 2.0, 0.5),
+    )
+
+
+def test_result_table_throughput() -> None:
+    problems = Config(
+        n_problems=5, n_warmups=1, max_n_terms=3, max_degree=3
+    ).make_problems()
+    answer = [Polynomial(1)]
+
+    table = ResultTable(
+        problems,
+        {"A-2w": [Result(t, answer) for t in (9.0, 5.0, 1.0, 4.0, 2.0, 3.0)]},
+        throughput={"A-2w": ("A", 2, 10.0)},
+    )
+
+    (tp,) = table.throughput()
+
+    assert (tp.solver, tp.workers, tp.time) == ("A", 2, 10.0)
+    assert tp.problems_per_sec == 0.5
+    assert tp.latency_mean == 3.0
+    assert tp.latency_p50 == 3.0
+    assert tp.latency_p90 == pytest.approx(4.6)
+    assert tp.latency_max == 5.0
+
+
+def test_run_without_solvers() -> None:
+    with pytest.raises(ValueError, match="no solvers"):
+        run(Config())
+
+
+def test_run_in_process() -> None:
+    pytest.importorskip("flint")
+
+    config = Config(solvers=["python-flint"], n_problems=3, n_warmups=1, max_n_terms=5)
+    table = run(config)
+
+    assert table.names == ("python-flint",)
+    assert not table.wrong
+    assert len(table.times("python-flint")) == 3
+    assert all(t > 0 for t in table.times("python-flint"))
+    assert all(r.parse_time is not None for r in table["python-flint"])
+    assert all(r.output_time is not None for r in table["python-flint"])
+    assert all(r.cpu_time is not None for r in table["python-flint"])
+
+
+def test_run_in_process_mul() -> None:
+    pytest.importorskip("flint")
+
+    config = Config(
+        solvers=["python-flint"],
+        problem_type="sparse-mul",
+        n_problems=2,
+        n_warmups=1,
+        max_n_terms=10,
+    )
+    table = run(config)
+
+    assert table.names == ("python-flint",)
+    assert not table.wrong
+    assert table.terms_per_second("python-flint") > 0
+
+
+@pytest.mark.parametrize("problem_type", ["division", "divisibility"])
+def test_run_in_process_division(problem_type: str) -> None:
+    pytest.importorskip("flint")
+
+    config = Config(
+        solvers=["python-flint"],
+        problem_type=problem_type,  # type: ignore[arg-type]
+        n_problems=4,
+        n_warmups=0,
+        max_n_terms=10,
+    )
+    table = run(config)
+
+    assert table.names == ("python-flint",)
+    assert not table.wrong
+
+
+@pytest.mark.parametrize("problem_type", ["nontrivial-gcd", "nontrivial-factor"])
+def test_run_in_process_mod_prime(problem_type: str) -> None:
+    pytest.importorskip("flint")
+
+    config = Config(
+        solvers=["python-flint"],
+        problem_type=problem_type,  # type: ignore[arg-type]
+        n_problems=3,
+        n_warmups=0,
+        max_n_terms=5,
+        modulus=65537,
+    )
+    table = run(config)
+
+    assert table.names == ("python-flint",)
+    assert not table.wrong
+
+
+def test_run_in_process_ratfun() -> None:
+    pytest.importorskip("flint")
+
+    config = Config(
+        solvers=["python-flint"],
+        problem_type="ratfun",
+        n_problems=3,
+        n_warmups=0,
+        max_n_terms=5,
+        max_degree=5,
+    )
+    table = run(config)
+
+    assert table.names == ("python-flint",)
+    assert not table.wrong
+
+
+def test_check_results_ratfun() -> None:
+    config = Config(
+        problem_type="ratfun", n_problems=1, n_warmups=0, max_n_terms=3, max_degree=3
+    )
+    problems = config.make_problems()
+    p = problems[0]
+    # Correct (though not reduced) and wrong answers.
+    num = p.p * p.s + p.r * p.q
+    den = p.q * p.s
+    logger = logging.getLogger("test")
+
+    ok = SolverResult("ok", [Result(1.0, [num, den])], Path("."))
+    wrong = SolverResult("wrong", [Result(1.0, [num, den + den])], Path("."))
+
+    assert check_results([ok], problems, logger) == set()
+    assert "wrong" in check_results([ok, wrong], problems, logger)
+
+
+def test_run_in_process_threads() -> None:
+    pytest.importorskip("flint")
+
+    config = Config(solvers=["python-flint"], n_problems=2, n_warmups=0, threads=(1, 2))
+    table = run(config)
+
+    assert table.names == ("python-flint", "python-flint-2t")
+    assert not table.wrong
+    assert [(sc.solver, sc.threads) for sc in table.scaling()] == [
+        ("python-flint", 1),
+        ("python-flint", 2),
+    ]
+
+
+def test_event_log(tmp_path: Path) -> None:
+    pytest.importorskip("flint")
+
+    logger = logging.getLogger("test_event_log")
+    logger.setLevel(EVENT)
+    handler = JsonLinesHandler(tmp_path / "events.jsonl")
+    logger.addHandler(handler)
+    try:
+        config = Config(solvers=["python-flint"], n_problems=2, n_warmups=1)
+        run(config, logger=logger)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    with (tmp_path / "events.jsonl").open() as f:
+        events = [json.loads(line) for line in f]
+
+    names = [e["event"] for e in events]
+    assert names.count("prepare") == 1
+    assert names.count("result") == 3
+    assert names.count("solve") == 1
+    assert {"event": "check", "solver": "python-flint", "wrong": False}.items() <= (
+        events[names.index("check")].items()
+    )
+
+    results = [e for e in events if e["event"] == "result"]
+    assert [e["problem"] for e in results] == [1, 2, 3]
+    assert [e["warmup"] for e in results] == [True, False, False]
+
+
+def test_chrome_trace(tmp_path: Path) -> None:
+    pytest.importorskip("flint")
+
+    logger = logging.getLogger("test_chrome_trace")
+    logger.setLevel(EVENT)
+    handler = ChromeTraceHandler(tmp_path / "trace.json")
+    logger.addHandler(handler)
+    try:
+        config = Config(solvers=["python-flint"], n_problems=2, n_warmups=1)
+        run(config, logger=logger)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    with (tmp_path / "trace.json").open() as f:
+        trace_events = json.load(f)["traceEvents"]
+
+    spans = {e["name"]: e for e in trace_events if e["ph"] == "X"}
+    assert "make_problems" in spans
+    assert "check" in spans
+    solve = spans["solve (python-flint)"]
+    for name in ("Prob. 1", "Prob. 2", "Prob. 3"):
+        assert spans[name]["tid"] != solve["tid"]
+        assert solve["ts"] <= spans[name]["ts"] <= solve["ts"] + solve["dur"]
+
+
+def test_phase_profiler(tmp_path: Path) -> None:
+    profiler = PhaseProfiler()
+    set_active_profiler(profiler)
+    try:
+        for _ in range(2):
+            with timed(logging.getLogger("test"), "phase", phase="sum"):
+                sum(range(1000))
+        # Blocks running solvers are not profiled, but the phases inside them are.
+        with timed(logging.getLogger("test"), "solver_phase", phase="solve"):
+            with timed(logging.getLogger("test"), "phase", phase="parse"):
+                pass
+    finally:
+        set_active_profiler(None)
+
+    assert [(pp.phase, pp.calls) for pp in profiler.summary()] == [
+        ("sum", 2),
+        ("parse", 1),
+    ]
+
+    with profile_phase("ignored"):  # no active profiler
+        pass
+
+    profiler.write(tmp_path)
+    assert (tmp_path / "summary.csv").exists()
+    assert (tmp_path / "sum.pstats").exists()
+
+
+def test_detect_warmup() -> None:
+    steady = [1.0, 1.1, 0.9, 1.0, 1.05, 0.95] * 3
+    assert detect_warmup(steady) == 0
+    assert detect_warmup([10.0, 8.0, 5.0, 3.0, 2.0, 1.5] + steady) == 6
+    assert detect_warmup([10.0, 9.0, 8.0, 7.0, 6.0, 5.0, 4.0, 3.0, 2.0, 1.0]) is None
+    assert detect_warmup([1.0, 1.0, 1.0]) is None  # too few runs
+
+
+def test_find_outliers() -> None:
+    times = [1.0, 1.1, 0.9, 1.0, 1.05, 0.95]
+    assert find_outliers(times) == ()
+    assert find_outliers(times + [10.0]) == (6,)
+    assert find_outliers(times + [0.1]) == ()  # only slow ones
+    assert find_outliers([1.0, 1.0, 1.0, 10.0]) == ()  # no spread
+    assert find_outliers([0.0, 1.0, 10.0]) == ()  # too few
+
+
+def test_run_adaptive_warmups() -> None:
+    pytest.importorskip("flint")
+
+    config = Config(
+        solvers=["python-flint"],
+        n_problems=2,
+        n_warmups=10,
+        adaptive_warmups=True,
+        max_n_terms=5,
+    )
+    table = run(config)
+
+    assert table.problems.adaptive_warmups
+    assert len(table.times("python-flint")) == 2
+    warmups = table.warmups("python-flint")
+    assert warmups is None or 0 <= warmups <= 5
+
+
+class EchoSolver(Solver):
+    """Solver running a Python script that answers 1 for each problem."""
+
+    _name = "Echo"
+
+    def _prepare(self, problems: ProblemSet) -> Optional[str]:
+        return "0"
+
+    def _solve(self, problems: ProblemSet) -> Optional[Sequence[Result]]:
+        log_file = self.output_dir / "output.csv"
+        script = (
+            "import sys\n"
+            "n = len(open(sys.argv[1]).readlines())\n"
+            "open(sys.argv[2], 'w').write('0.001,1\\n' * n)\n"
+        )
+        if not self.run(
+            [sys.executable, "-c", script, str(self.problem_file), str(log_file)]
+        ):
+            return None
+        return self.parse_csv_log(log_file)
+
+
+def test_run_cold_start(tmp_path: Path) -> None:
+    problems = Config(n_problems=2, n_warmups=1, max_n_terms=3).make_problems()
+    logger = logging.getLogger("test")
+    solver = EchoSolver("0001", tmp_path / "build", tmp_path, logger, 10)
+
+    table = run_solvers(
+        [solver],
+        problems,
+        job_id="0001",
+        output_dir=tmp_path,
+        logger=logger,
+        keep_temp=True,
+        cold_start=True,
+    )
+
+    cold = table.cold_start()
+    assert [(c.solver, c.problem) for c in cold] == [("Echo", 2), ("Echo", 3)]
+    assert all(c.cold_time == c.warm_time == 0.001 for c in cold)
+    assert all(0 < c.startup < c.wall_time for c in cold)
+    assert (tmp_path / "0001.echo" / "output.csv").read_text().count("\n") == 3
+    assert (tmp_path / "0001.echo.cold" / "problems.log").read_text() == (
+        f"{problems[2]}\n"
+    )
+
+
+class SlowOnceSolver(EchoSolver):
+    """Solver answering 1 with a slow timing of Prob. 5 only in the first run."""
+
+    _name = "SlowOnce"
+
+    def _solve(self, problems: ProblemSet) -> Optional[Sequence[Result]]:
+        log_file = self.output_dir / "output.csv"
+        script = (
+            "import sys\n"
+            "n = len(open(sys.argv[1]).readlines())\n"
+            "first = not sys.argv[2].endswith('.rerun/output.csv')\n"
+            "with open(sys.argv[2], 'w') as f:\n"
+            "    for i in range(n):\n"
+            "        t = 1.0 if first and i == 4 else 0.001 * (1 + 0.1 * (i % 3))\n"
+            "        f.write(f'{t},1\\n')\n"
+        )
+        if not self.run(
+            [sys.executable, "-c", script, str(self.problem_file), str(log_file)]
+        ):
+            return None
+        return self.parse_csv_log(log_file)
+
+
+def test_run_rerun_outliers(tmp_path: Path) -> None:
+    problems = Config(n_problems=6, n_warmups=1, max_n_terms=3).make_problems()
+    logger = logging.getLogger("test")
+    solver = SlowOnceSolver("0001", tmp_path / "build", tmp_path, logger, 10)
+
+    table = run_solvers(
+        [solver],
+        problems,
+        job_id="0001",
+        output_dir=tmp_path,
+        logger=logger,
+        keep_temp=True,
+        rerun_outliers=True,
+    )
+
+    env = table.environment("SlowOnce")
+    assert env is not None and env.load >= 0
+    assert table["SlowOnce"][4].time == 1.0  # the first timing is kept
+    reruns = {r.problem: r for r in table.reruns()}
+    assert "outlier" in reruns[5].reason
+    assert reruns[5].time == 1.0
+    assert reruns[5].rerun_time < 0.01
+    # The warm-ups are solved again before the re-run problems.
+    # (Others may also be re-run if the test machine is busy.)
+    lines = (tmp_path / "0001.slowonce.rerun" / "problems.log").read_text()
+    assert lines.splitlines() == [str(problems[0])] + [
+        str(problems[k - 1]) for k in sorted(reruns)
+    ]
+
+
+def test_run_interleaved(tmp_path: Path) -> None:
+    problems = Config(n_problems=5, n_warmups=1, max_n_terms=3).make_problems()
+    logger = logging.getLogger("test")
+
+    class OtherEchoSolver(EchoSolver):
+        _name = "OtherEcho"
+
+    solvers = [
+        EchoSolver("0001", tmp_path / "build", tmp_path, logger, 10),
+        OtherEchoSolver("0001", tmp_path / "build", tmp_path, logger, 10),
+    ]
+
+    def run_interleaved() -> ResultTable:
+        return run_solvers(
+            solvers,
+            problems,
+            job_id="0001",
+            output_dir=tmp_path,
+            logger=logger,
+            interleave=2,
+        )
+
+    table = run_interleaved()
+
+    assert list(table) == ["Echo", "OtherEcho"]
+    assert all(len(table[name]) == 6 for name in table)
+    order = table.order()
+    assert [s.step for s in order] == [1, 2, 3, 4, 5, 6]
+    assert sorted((s.solver, s.first_problem, s.last_problem) for s in order) == [
+        (name, first, last)
+        for name in ("Echo", "OtherEcho")
+        for first, last in ((2, 3), (4, 5), (6, 6))
+    ]
+    assert all(a.start < b.start for a, b in zip(order, order[1:]))
+    # The order is reproducible.
+    order2 = run_interleaved().order()
+    assert [(s.solver, s.first_problem) for s in order2] == [
+        (s.solver, s.first_problem) for s in order
+    ]
+
+    with pytest.raises(ValueError, match="chunk size"):
+        run_solvers(
+            solvers,
+            problems,
+            job_id="0001",
+            output_dir=tmp_path,
+            logger=logger,
+            interleave=0,
+        )
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs an executable script")
+def test_run_perf_counters(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # A fake `perf` running the command and writing fixed counts.
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    perf = bin_dir / "perf"
+    perf.write_text(
+        f"#!{sys.executable}\n"
+        "import subprocess, sys\n"
+        "args = sys.argv[1:]\n"
+        "i = args.index('--')\n"
+        "rc = subprocess.call(args[i + 1 :])\n"
+        "if '-o' in args[:i]:\n"
+        "    with open(args[args.index('-o') + 1], 'w') as f:\n"
+        "        f.write('1000,,instructions:u,1,100.00,,\\n')\n"
+        "        f.write('500,,cycles:u,1,100.00,,\\n')\n"
+        "        f.write('30,,cache-misses:u,1,100.00,,\\n')\n"
+        "        f.write('<not counted>,,branch-misses:u,0,0.00,,\\n')\n"
+        "sys.exit(rc)\n"
+    )
+    perf.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    problems = Config(n_problems=2, n_warmups=1, max_n_terms=3).make_problems()
+    logger = logging.getLogger("test")
+    solver = EchoSolver(
+        "0001", tmp_path / "build", tmp_path, logger, 10, perf_counters=True
+    )
+
+    table = run_solvers(
+        [solver], problems, job_id="0001", output_dir=tmp_path, logger=logger
+    )
+
+    # The answers have 3 terms in total.
+    assert table.perf_counters() == (
+        PerfStats("Echo", 1000, 500, 30, None, 2.0, 10.0, None),
+    )
@@ -60,3 +60,63 @@ def test_poly_as_commutative_ring() -> None:
 
     assert a.equals_without_unit(a)
     assert a.equals_without_unit(-a)
+
+
+def test_poly_to_dict() -> None:
+    xx = ("x", "y")
+
+    assert Polynomial().to_dict(xx) == {}
+    assert Polynomial(-4).to_dict(xx) == {(0, 0): -4}
+    assert Polynomial("3*x^2*y-5*y+7").to_dict(xx) == {
+        (2, 1): 3,
+        (0, 1): -5,
+        (0, 0): 7,
+    }
+
+
+def test_poly_from_expanded() -> None:
+    xx = ("x", "y")
+
+    a = Polynomial.from_expanded("3*x^2*y - 5*y + 7 + y*2")
+
+    assert len(a) == 3
+    assert a.to_dict(xx) == {(2, 1): 3, (0, 1): -3, (0, 0): 7}
+    assert a == Polynomial("3*x^2*y-3*y+7")
+    assert not Polynomial.from_expanded("x-x")
+    assert Polynomial.from_expanded("-1").is_unit
+
+    with pytest.raises(ValueError, match="not a sum of monomials"):
+        Polynomial.from_expanded("(1+x)^2")
+
+
+def test_poly_fingerprint() -> None:
+    xx = ("x", "y")
+    point = (3, 5)
+    modulus = 101
+
+    a = Polynomial("1+x-2*y")
+    b = Polynomial("x^3-y+4")
+
+    fa = a.fingerprint(xx, point, modulus)
+    fb = b.fingerprint(xx, point, modulus)
+
+    assert fa == (1 + 3 - 10) % modulus
+    assert (a * b).fingerprint(xx, point, modulus) == fa * fb % modulus
+    assert Polynomial.from_expanded(str(a * b)).fingerprint(xx, point, modulus) == (
+        fa * fb % modulus
+    )
+
+
+def test_poly_mod() -> None:
+    a = Polynomial("3*x^2*y-5*y+7")
+
+    assert a.reduce_mod(5) == Polynomial("3*x^2*y+2")
+    assert Polynomial.from_expanded("10*x-5").reduce_mod(5) == 0
+    assert a.monic_mod(5) == (a * Polynomial(3)).monic_mod(5)
+    assert a.monic_mod(5) != Polynomial("x+1").monic_mod(5)
+
+
+def test_poly_max_exponent() -> None:
+    assert Polynomial("3*x^2*y-5*y^4+7").max_exponent == 4
+    assert Polynomial.from_expanded("x^300*y+z").max_exponent == 300
+    assert Polynomial(7).max_exponent == 0
@@ -0,0 +1,247 @@
+import random
+from typing import Any, Dict
+
+import pytest
+
+from polybench.prob import ProblemSet, dense_polynomial, is_prime
+
+
+def test_dense_polynomial() -> None:
+    p = dense_polynomial(
+        n_vars=3,
+        min_n_terms=20,
+        max_n_terms=20,
+        max_degree=10,
+        min_coeff=1,
+        max_coeff=9,
+        rng=random.Random(1),
+    )
+
+    # All the 20 monomials up to degree 3 in 3 variables.
+    assert len(p) == 20
+
+
+@pytest.mark.parametrize("problem_type", ["dense-mul", "sparse-mul"])
+def test_mul_problems(problem_type: str) -> None:
+    problems = ProblemSet(
+        problem_type=problem_type,  # type: ignore[arg-type]
+        n_warmups=1,
+        n_problems=2,
+        seed=1,
+        exp_dist="uniform",
+        n_vars=3,
+        min_n_terms=5,
+        max_n_terms=10,
+        min_degree=2,
+        max_degree=5,
+        min_coeff=-10,
+        max_coeff=10,
+    )
+
+    assert problems.problem_type == "mul"
+    assert len(problems) == 3
+    for p in problems:
+        assert str(p) == f"mul({p.p},{p.q})"
+
+
+def test_division_problems() -> None:
+    problems = ProblemSet(
+        problem_type="division",
+        n_warmups=0,
+        n_problems=3,
+        seed=1,
+        exp_dist="uniform",
+        n_vars=3,
+        min_n_terms=2,
+        max_n_terms=5,
+        min_degree=1,
+        max_degree=4,
+        min_coeff=-10,
+        max_coeff=10,
+    )
+
+    assert problems.problem_type == "div"
+    for p in problems:
+        assert str(p) == f"div({p.p},{p.q})"
+        assert p.quotient is not None
+        assert p.p == p.quotient * p.q
+
+
+def test_divisibility_problems() -> None:
+    problems = ProblemSet(
+        problem_type="divisibility",
+        n_warmups=0,
+        n_problems=20,
+        seed=1,
+        exp_dist="uniform",
+        n_vars=3,
+        min_n_terms=2,
+        max_n_terms=5,
+        min_degree=1,
+        max_degree=4,
+        min_coeff=-10,
+        max_coeff=10,
+    )
+
+    assert problems.problem_type == "divisible"
+    # Both answers must appear (with a fixed seed).
+    assert {p.divisible for p in problems} == {True, False}
+    for p in problems:
+        assert str(p) == f"divisible({p.p},{p.q})"
+        assert not p.q.is_constant
+
+
+def test_is_prime() -> None:
+    primes = [n for n in range(100) if is_prime(n)]
+
+    assert len(primes) == 25
+    assert primes[-1] == 97
+    assert is_prime(2**61 - 1)
+    assert not is_prime(3215031751)  # a strong pseudoprime to bases 2, 3, 5 and 7
+
+
+@pytest.mark.parametrize("problem_type", ["nontrivial-gcd", "nontrivial-factor"])
+def test_problems_mod_prime(problem_type: str) -> None:
+    problems = ProblemSet(
+        problem_type=problem_type,  # type: ignore[arg-type]
+        n_warmups=0,
+        n_problems=3,
+        seed=1,
+        modulus=7,
+        exp_dist="uniform",
+        n_vars=3,
+        min_n_terms=2,
+        max_n_terms=5,
+        min_degree=1,
+        max_degree=4,
+        min_coeff=-10,
+        max_coeff=10,
+    )
+
+    assert problems.modulus == 7
+    for p in problems:
+        assert all(0 < c < 7 for c in p.p.to_dict(problems.variables).values())
+
+
+def test_problems_mod_prime_errors() -> None:
+    kwargs: Dict[str, Any] = {
+        "n_warmups": 0,
+        "n_problems": 1,
+        "seed": 1,
+        "exp_dist": "uniform",
+        "n_vars": 3,
+        "min_n_terms": 2,
+        "max_n_terms": 5,
+        "min_degree": 1,
+        "max_degree": 4,
+        "min_coeff": -10,
+        "max_coeff": 10,
+    }
+
+    with pytest.raises(ValueError, match="prime"):
+        ProblemSet(problem_type="nontrivial-gcd", modulus=9, **kwargs)
+    with pytest.raises(ValueError, match="not supported"):
+        ProblemSet(problem_type="sparse-mul", modulus=7, **kwargs)
+
+
+def test_ratfun_problems() -> None:
+    problems = ProblemSet(
+        problem_type="ratfun",
+        n_warmups=0,
+        n_problems=2,
+        seed=1,
+        exp_dist="uniform",
+        n_vars=3,
+        min_n_terms=2,
+        max_n_terms=5,
+        min_degree=1,
+        max_degree=4,
+        min_coeff=-10,
+        max_coeff=10,
+    )
+
+    assert problems.problem_type == "ratfun"
+    for p in problems:
+        assert str(p) == f"ratfun({p.p},{p.q},{p.r},{p.s})"
+
+
+def test_degree_bound() -> None:
+    kwargs: Dict[str, Any] = {
+        "n_warmups": 0,
+        "n_problems": 3,
+        "seed": 1,
+        "exp_dist": "uniform",
+        "n_vars": 3,
+        "min_n_terms": 2,
+        "max_n_terms": 5,
+        "min_degree": 500,
+        "max_degree": 600,
+        "min_coeff": -10,
+        "max_coeff": 10,
+    }
+
+    problems = ProblemSet(problem_type="sparse-mul", **kwargs)
+    for p in problems:
+        assert p.degree_bound == p.p.max_exponent + p.q.max_exponent
+        assert (p.p * p.q).max_exponent <= p.degree_bound
+    assert problems.degree_bound == max(p.degree_bound for p in problems)
+
+    problems = ProblemSet(problem_type="nontrivial-gcd", **kwargs)
+    assert problems.degree_bound > 255  # beyond 8-bit exponents
+
+
+def test_adaptive_warmups() -> None:
+    kwargs: Dict[str, Any] = {
+        "problem_type": "nontrivial-gcd",
+        "n_warmups": 4,
+        "n_problems": 3,
+        "seed": 1,
+        "exp_dist": "uniform",
+        "n_vars": 3,
+        "min_n_terms": 2,
+        "max_n_terms": 5,
+        "min_degree": 1,
+        "max_degree": 4,
+        "min_coeff": -10,
+        "max_coeff": 10,
+    }
+
+    fixed = ProblemSet(**kwargs)
+    adaptive = ProblemSet(adaptive_warmups=True, **kwargs)
+
+    assert not fixed.adaptive_warmups
+    assert adaptive.adaptive_warmups
+    assert [str(p) for p in adaptive][:4] == [str(fixed[0])] * 4
+    assert [str(p) for p in adaptive][4:] == [str(p) for p in fixed][4:]
+
+
+def test_select() -> None:
+    problems = ProblemSet(
+        problem_type="nontrivial-gcd",
+        n_warmups=2,
+        n_problems=3,
+        seed=1,
+        exp_dist="uniform",
+        n_vars=3,
+        min_n_terms=2,
+        max_n_terms=5,
+        min_degree=1,
+        max_degree=4,
+        min_coeff=-10,
+        max_coeff=10,
+    )
+    selected = problems.select(3)
+
+    assert len(selected) == 1
+    assert selected.n_warmups == 0
+    assert str(selected[0]) == str(problems[3])
+    assert selected.degree_bound == problems.degree_bound
+    assert len(problems) == 5
+
+    subset = problems.subset([4, 2])
+
+    assert len(subset) == 4
+    assert subset.n_warmups == 2
+    assert subset.n_problems == 2
+    assert [str(p) for p in subset] == [str(problems[i]) for i in (0, 1, 4, 2)]
+    assert subset.degree_bound == problems.degree_bound
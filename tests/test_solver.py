@@ -0,0 +1,369 @@
+import hashlib
+import logging
+import math
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Tuple
+
+import pytest
+
+from polybench.limits import ResourceLimits
+from polybench.solver import DownloadOptions, Solver, score_and_error
+
+
+def test_solver_names() -> None:
+    names = Solver.get_solver_names()
+
+    assert "flint" in names
+    assert "form" in names
+    assert len(set(names)) == len(names)
+
+
+def test_load_solver_class() -> None:
+    c = Solver.load_solver_class("FORM")
+
+    assert c._name == "FORM"
+    assert Solver.load_solver_class("form") is c
+
+    with pytest.raises(ValueError, match="unknown solver"):
+        Solver.load_solver_class("no-such-solver")
+
+
+def test_create_solvers_with_threads(tmp_path: Path) -> None:
+    solvers = Solver.create_solvers(
+        job_id="0001",
+        build_dir=tmp_path / "build",
+        output_dir=tmp_path / "output",
+        logger=logging.getLogger("test"),
+        timeout=10,
+        names=["flint", "singular"],
+        threads=[4, 1],
+        workers=[2],
+    )
+
+    assert [(s.name, s.base_name, s.threads, s.workers) for s in solvers] == [
+        ("FLINT", "FLINT", 1, 0),
+        ("FLINT-4t", "FLINT", 4, 0),
+        ("FLINT-2w", "FLINT", 1, 2),
+        ("Singular", "Singular", 1, 0),
+    ]
+    assert solvers[0].build_dir == solvers[1].build_dir
+    assert solvers[0].output_dir != solvers[1].output_dir
+
+
+def make_solver(tmp_path: Path, **kwargs: Any) -> Solver:
+    logger = logging.getLogger("test")
+    return Solver("0001", tmp_path / "build", tmp_path / "output", logger, 10, **kwargs)
+
+
+def test_download(tmp_path: Path) -> None:
+    src = tmp_path / "src" / "data.tar.gz"
+    src.parent.mkdir()
+    src.write_bytes(b"0123456789" * 10000)
+    sha256 = hashlib.sha256(src.read_bytes()).hexdigest()
+    url = src.as_uri()
+
+    cache_dir = tmp_path / "cache"
+    s = make_solver(tmp_path, download_options=DownloadOptions(cache_dir=cache_dir))
+
+    # A stale partial file must not break the download.
+    cache_dir.mkdir()
+    (cache_dir / "data.tar.gz.part").write_bytes(b"garbage")
+
+    path = s.download(url, sha256)
+    assert path == cache_dir / "data.tar.gz"
+    assert path.read_bytes() == src.read_bytes()
+    assert (cache_dir / "data.tar.gz.sha256").exists()
+    assert not (cache_dir / "data.tar.gz.part").exists()
+
+    # Copied into the given directory.
+    dest_dir = tmp_path / "dest"
+    dest_dir.mkdir()
+    path = s.download(url, sha256, dest_dir)
+    assert path == dest_dir / "data.tar.gz"
+    assert path.read_bytes() == src.read_bytes()
+
+    # The cached file is used even if the original URL is not available.
+    src.unlink()
+    assert s.download(url, sha256) == cache_dir / "data.tar.gz"
+
+    # Wrong hash value.
+    assert s.download(url, "0" * 64) is None
+
+
+def test_download_mirror(tmp_path: Path) -> None:
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    (mirror / "data.zip").write_bytes(b"abc")
+    sha256 = hashlib.sha256(b"abc").hexdigest()
+
+    s = make_solver(
+        tmp_path,
+        download_options=DownloadOptions(
+            cache_dir=tmp_path / "cache", mirrors=[str(mirror)], offline=True
+        ),
+    )
+
+    assert s.download("https://example.com/data.zip", sha256) == mirror / "data.zip"
+    assert s.download("https://example.com/other.zip", sha256) is None
+
+
+def test_verify_sha256(tmp_path: Path) -> None:
+    f = tmp_path / "file"
+    f.write_bytes(b"abc")
+    sha256 = hashlib.sha256(b"abc").hexdigest()
+
+    assert Solver.verify_sha256(f, sha256)
+    assert (tmp_path / "file.sha256").exists()
+    assert Solver.verify_sha256(f, sha256)  # from the stamp
+    assert not Solver.verify_sha256(f, "0" * 64)
+
+    f.write_bytes(b"abcd")  # the size is changed
+    assert not Solver.verify_sha256(f, sha256)
+
+
+def test_copy_resources(tmp_path: Path) -> None:
+    solver = make_solver(tmp_path)
+    dest = tmp_path / "flint"
+
+    solver.copy_resources("flint", dest)
+
+    src = Path(__file__).resolve().parent.parent / "polybench" / "solvers" / "flint"
+    assert (dest / "main.c").read_bytes() == (src / "main.c").read_bytes()
+    assert (dest / "cmake" / "init-vcpkg.cmake").is_file()
+    assert (dest / Solver.RESOURCE_MANIFEST).is_file()
+
+    # Unchanged files are not copied again.
+    mtime_ns = (dest / "main.c").stat().st_mtime_ns
+    (dest / "CMakeLists.txt").write_text("modified")
+    solver.copy_resources("flint", dest)
+    assert (dest / "main.c").stat().st_mtime_ns == mtime_ns
+    assert (dest / "CMakeLists.txt").read_bytes() == (
+        src / "CMakeLists.txt"
+    ).read_bytes()
+
+    with pytest.raises(RuntimeError, match="resources not found"):
+        solver.copy_resources("no-such-resources", dest)
+
+
+def test_resource_manifests_up_to_date() -> None:
+    root = Path(__file__).resolve().parent.parent
+    if not (root / ".git").exists():
+        pytest.skip("not in a Git repository")
+
+    script = root / "scripts" / "update-resource-manifests.py"
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, str(script), "--check"],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    assert result.returncode == 0, result.stdout
+
+
+def test_peak_memory(tmp_path: Path) -> None:
+    class MemoryHungrySolver(Solver):
+        _name = "memory-hungry"
+
+        def _solve(self, problems: Any) -> Any:
+            code = "import time; b = bytearray(100 * 1024 * 1024); time.sleep(0.5)"
+            self.run([sys.executable, "-c", code])
+            return ()
+
+    logger = logging.getLogger("test")
+
+    # Not sampled by default.
+    s = MemoryHungrySolver("0001", tmp_path, tmp_path, logger, 10)
+    s.solve(None)  # type: ignore[arg-type]
+    assert s.peak_memory is None
+
+    s = MemoryHungrySolver("0001", tmp_path, tmp_path, logger, 10, sample_interval=0.02)
+    assert s.peak_memory is None
+    s.solve(None)  # type: ignore[arg-type]
+    assert s.peak_memory is not None
+    assert s.peak_memory >= 100 * 1024 * 1024
+
+
+def test_timeline(tmp_path: Path) -> None:
+    class ProgressSolver(Solver):
+        _name = "progress"
+
+        def _solve(self, problems: Any) -> Any:
+            code = (
+                "import time\n"
+                "f = open('output.csv', 'w')\n"
+                "for i in range(3):\n"
+                "    time.sleep(0.2)\n"
+                "    f.write(f'{i},1\\n')\n"
+                "    f.flush()\n"
+                "time.sleep(0.2)\n"
+            )
+            self.run([sys.executable, "-c", code])
+            return ()
+
+    logger = logging.getLogger("test")
+    s = ProgressSolver("0001", tmp_path, tmp_path, logger, 10, sample_interval=0.02)
+
+    assert not s.timeline
+    s.solve(None)  # type: ignore[arg-type]
+    timeline = s.timeline
+    assert len(timeline) >= 10
+    assert all(a.time < b.time for a, b in zip(timeline, timeline[1:]))
+    results = [t.results for t in timeline]
+    assert results[0] == 0
+    assert results[-1] == 3
+    assert results == sorted(results)  # type: ignore[type-var]
+    assert all(t.rss > 0 and t.threads >= 1 for t in timeline)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="resource limits need POSIX")
+def test_outcomes(tmp_path: Path) -> None:
+    class CommandSolver(Solver):
+        _name = "command"
+        code = ""
+
+        def _solve(self, problems: Any) -> Any:
+            return () if self.run([sys.executable, "-c", self.code]) else None
+
+    logger = logging.getLogger("test")
+    limits = ResourceLimits(max_memory=256 * 1024 * 1024)
+    s = CommandSolver("0001", tmp_path, tmp_path, logger, 1, limits=limits)
+
+    def solve(code: str) -> Tuple[Any, str]:
+        s.code = code
+        return s.solve(None), s.outcome  # type: ignore[arg-type]
+
+    assert solve("b = bytearray(1024 * 1024 * 1024)") == (None, "out_of_memory")
+    code = "import sys; sys.stderr.write('error: failed to allocate memory\\n'); "
+    assert solve(code + "raise SystemExit(1)") == (None, "out_of_memory")
+    code = "import os, sys; sys.stderr.write('Unable to allocate memory (1024).\\n'); "
+    assert solve(code + "sys.stderr.flush(); os.abort()") == (None, "out_of_memory")
+    assert solve("raise SystemExit(1)") == (None, "failed")
+    assert solve("import time; time.sleep(10)") == (None, "timeout")
+    assert solve("b = bytearray(1024 * 1024)") == ((), "ok")
+
+
+@pytest.mark.skipif(os.name != "posix", reason="resource limits need POSIX")
+def test_outcomes_preexec(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import resource
+
+    import polybench.limits
+
+    class CommandSolver(Solver):
+        _name = "command"
+
+        def _solve(self, problems: Any) -> Any:
+            return () if self.run([sys.executable, "-c", "pass"]) else None
+
+    logger = logging.getLogger("test")
+    limits = ResourceLimits(max_memory=1024 * 1024 * 1024)
+    s = CommandSolver("0001", tmp_path, tmp_path, logger, 1, limits=limits)
+
+    # Without cgroups, the memory limit is clamped to the hard limit.
+    monkeypatch.setattr(polybench.limits, "_cgroup_dir", lambda: None)
+    monkeypatch.setattr(
+        resource, "getrlimit", lambda _: (resource.RLIM_INFINITY, 512 * 1024 * 1024)
+    )
+    assert (s.solve(None), s.outcome) == ((), "ok")  # type: ignore[arg-type]
+
+    def fail() -> None:
+        raise ValueError("failure")
+
+    monkeypatch.setattr(
+        polybench.limits.LimitedRun, "preexec_fn", property(lambda self: fail)
+    )
+    assert (s.solve(None), s.outcome) == (None, "failed")  # type: ignore[arg-type]
+
+
+def test_parse_csv_log_timings(tmp_path: Path) -> None:
+    s = Solver("0001", tmp_path, tmp_path, logging.getLogger("test"), 10)
+
+    log_file = tmp_path / "output.csv"
+    log_file.write_text("0.5,x+1\n0.1;0.2;0.3,x-1\n")
+    results = s.parse_csv_log(log_file)
+
+    assert results is not None
+    assert results[0].time == 0.5
+    assert results[0].parse_time is None
+    assert results[0].output_time is None
+    assert results[1].time == 0.1
+    assert results[1].parse_time == 0.2
+    assert results[1].output_time == 0.3
+
+    log_file.write_text("0.1;0.2,x+1\n")
+    assert s.parse_csv_log(log_file) is None
+
+
+def test_parse_csv_log_nanoseconds(tmp_path: Path) -> None:
+    s = Solver("0001", tmp_path, tmp_path, logging.getLogger("test"), 10)
+
+    log_file = tmp_path / "output.csv"
+    log_file.write_text(
+        "#wall_clock=CLOCK_MONOTONIC\n"
+        "#cpu_clock=CLOCK_PROCESS_CPUTIME_ID\n"
+        "1500;1200,x+1\n"
+        "2000;;300;400,x-1\n"
+    )
+    results = s.parse_csv_log(log_file)
+
+    assert s.clocks == {
+        "wall_clock": "CLOCK_MONOTONIC",
+        "cpu_clock": "CLOCK_PROCESS_CPUTIME_ID",
+    }
+    assert results is not None
+    assert results[0].time == pytest.approx(1.5e-6)
+    assert results[0].cpu_time == pytest.approx(1.2e-6)
+    assert results[0].parse_time is None
+    assert results[1].time == pytest.approx(2.0e-6)
+    assert results[1].cpu_time is None
+    assert results[1].parse_time == pytest.approx(3.0e-7)
+    assert results[1].output_time == pytest.approx(4.0e-7)
+
+    log_file.write_text("#wall_clock=CLOCK_MONOTONIC\n0.5,x+1\n")
+    assert s.parse_csv_log(log_file) is None
+
+
+def test_score_and_error() -> None:
+    score, error = score_and_error([1.0, 2.0, 3.0, 4.0, 5.0])
+    assert score == 3.0
+    # t(0.9995, 4) * sqrt(2.5 / 5) = 8.610 * 0.7071
+    assert error == pytest.approx(6.088, rel=0.02)
+
+    score, error = score_and_error([2.0])
+    assert score == 2.0
+    assert math.isnan(error)
+
+
+def test_parse_harness_logs(tmp_path: Path) -> None:
+    s = Solver("0001", tmp_path, tmp_path, logging.getLogger("test"), 10)
+
+    log_files = [tmp_path / "output.fork1.csv", tmp_path / "output.fork2.csv"]
+    log_files[0].write_text(
+        "#wall_clock=System.nanoTime\n"
+        "#samples=1000;3000\n"
+        "2000;1000;300;400,x+1\n"
+        "#samples=10;10\n"
+        "10;;1;1,1\n"
+    )
+    log_files[1].write_text(
+        "#wall_clock=System.nanoTime\n"
+        "#samples=2000;2000\n"
+        "2000;3000;500;600,x+1\n"
+        "#samples=10;10\n"
+        "10;;2;2,1\n"
+    )
+    results = s.parse_harness_logs(log_files)
+
+    assert results is not None
+    assert len(results) == 2
+    assert results[0].time == pytest.approx(2.0e-6)
+    assert results[0].error is not None and results[0].error > 0
+    assert results[0].cpu_time == pytest.approx(2.0e-6)
+    assert results[0].parse_time == pytest.approx(3.0e-7)
+    assert results[1].time == pytest.approx(1.0e-8)
+    assert results[1].error == pytest.approx(0)
+    assert results[1].cpu_time is None
+
+    log_files[1].write_text("#wall_clock=System.nanoTime\n2000;;500;600,x+1\n")
+    assert s.parse_harness_logs(log_files) is None